@@ -0,0 +1,206 @@
+'''
+Measures the throughput and latency of the clients' hot paths offline, against a local stub of the WB, IMF and WTO APIs
+serving catalogs and data of the live sizes (see benchmarks.fixtures and benchmarks.stub_server).
+
+Usage:
+    python -m benchmarks.client_throughput [--repeat N] [--latency SECONDS] [--scenario NAME ...] [--output FILE]
+                                           [--compare FILE] [--recordings DIR [--record]]
+
+Scenarios:
+    wb_indicators    WBClient.indicators, the full paged indicator catalog.
+    wb_data          WBClient.data of 16 indicators for every economy over 2000-2023, as objects and as columns.
+    imf_data         IMFClient.data of one indicator and IMFClient.data_many of 24, for every country.
+    wto_data         WTOClient.data of one indicator for every reporter over 1960-2024, paginated.
+    gdi_economies    GlobalDataInterface.economies, fetching and merging the economies of the three sources.
+    parse_to_global  Parsing catalog records into client objects and converting them with to_global, without requests.
+
+Each scenario is run --repeat times after a warm-up run. Prints, or writes to --output, a JSON report with the
+min/median/p95/mean wall time, records per second, requests and response bytes per run and the clients' request
+latencies of each scenario. --compare prints the change of each median against an earlier report.
+
+By default responses are synthetic. With --recordings, responses recorded in DIR are replayed instead, and with
+--record as well, requests without a recording are forwarded to the live APIs and recorded.
+'''
+from typing import Callable, Dict, List
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import sys
+import time
+
+from benchmarks.fixtures import FixtureSet, Recordings
+from benchmarks.stub_server import StubServer
+from global_data_interface import IMFClient, WBClient, WTOClient
+from global_data_interface.global_data_interface import GlobalDataInterface
+
+# Clients are not rate limited against the stub, so the scenarios measure the clients rather than the limiter.
+UNLIMITED = {'rate': None, 'burst': None, 'max_concurrency': None}
+WB_DATA_INDICATORS = 16
+IMF_DATA_INDICATORS = 24
+
+
+def make_clients(stub: StubServer) -> Dict[str, object]:
+    clients = {
+        'wb': WBClient(rate_limit=UNLIMITED),
+        'imf': IMFClient(rate_limit=UNLIMITED),
+        'wto': WTOClient(rate_limit=UNLIMITED),
+    }
+    for source, client in clients.items():
+        client.BASE_URL = stub.url(source)
+    return clients
+
+
+def scenarios(stub: StubServer, clients: Dict[str, object]) -> Dict[str, Dict[str, Callable[[], int]]]:
+    '''Returns each scenario's cases, mapped to a function which runs the case once and returns the number of records.'''
+    fixtures = stub.fixtures
+    wb, imf, wto = clients['wb'], clients['imf'], clients['wto']
+    wb_economies = [economy['id'] for economy in fixtures.wb_economies]
+    wb_indicators = [indicator['id'] for indicator in fixtures.wb_indicators[:WB_DATA_INDICATORS]]
+    imf_indicators = list(fixtures.imf_indicators)[:IMF_DATA_INDICATORS]
+    imf_years = list(range(2000, 2030))
+
+    gdi = GlobalDataInterface()
+    gdi.wb, gdi.imf, gdi.wto = wb, imf, wto
+
+    def gdi_economies() -> int:
+        for client in (wb, imf, wto):
+            client.refresh()
+        return len(gdi.economies())
+
+    def parse_to_global() -> int:
+        objects = [WBClient._parse_indicator(item).to_global() for item in fixtures.wb_indicators]
+        objects += [WBClient._parse_economy(item).to_global() for item in fixtures.wb_economies]
+        objects += [indicator.to_global() for indicator in IMFClient._parse_indicators({'indicators': fixtures.imf_indicators})]
+        objects += [WTOClient._parse_indicator(item).to_global() for item in fixtures.wto_indicators]
+        return len(objects)
+
+    return {
+        'wb_indicators': {
+            'sequential': lambda: len(wb.indicators()),
+            'concurrent': lambda: len(wb.indicators(max_workers=8)),
+        },
+        'wb_data': {
+            'objects': lambda: len(wb.data(wb_economies, wb_indicators, 2000, 2023, max_workers=8, source='2')),
+            'columnar': lambda: len(wb.data(wb_economies, wb_indicators, 2000, 2023, max_workers=8, source='2', columnar=True)),
+        },
+        'imf_data': {
+            'data': lambda: len(imf.data(imf_indicators[0], years=imf_years)),
+            'data_many': lambda: len(imf.data_many(imf_indicators, years=imf_years)),
+            'data_many_columnar': lambda: len(imf.data_many(imf_indicators, years=imf_years, columnar=True)),
+        },
+        'wto_data': {
+            'objects': lambda: len(wto.data(fixtures.wto_indicators[0]['code'], ps='1960-2024', paginate=True, page_size=5000)),
+            'columnar': lambda: len(wto.data(fixtures.wto_indicators[0]['code'], ps='1960-2024', paginate=True, page_size=5000, columnar=True)),
+        },
+        'gdi_economies': {
+            'economies': gdi_economies,
+        },
+        'parse_to_global': {
+            'catalogs': parse_to_global,
+        },
+    }
+
+
+def measure(run: Callable[[], int], repeat: int, stub: StubServer, clients: Dict[str, object]) -> dict:
+    '''Runs a case once to warm up, then repeat times, and summarizes the runs.'''
+    run()
+    for client in clients.values():
+        client.instrumentation.histograms.clear()
+    stub.reset_counters()
+
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        records = run()
+        times.append(time.perf_counter() - started)
+    counters = stub.reset_counters()
+
+    median = statistics.median(times)
+    ordered = sorted(times)
+    return {
+        'records': records,
+        'runs': repeat,
+        'seconds': {
+            'min': round(ordered[0], 4),
+            'median': round(median, 4),
+            'p95': round(ordered[min(int(0.95 * len(ordered) + 0.5), len(ordered)) - 1], 4),
+            'mean': round(statistics.fmean(times), 4),
+        },
+        'records_per_second': round(records / median) if median else None,
+        'requests_per_run': counters['requests'] / repeat,
+        'response_bytes_per_run': round(counters['bytes'] / repeat),
+        'latency': {
+            source: {endpoint: {key: round(value, 5) if isinstance(value, float) else value for key, value in stats.items()}
+                     for endpoint, stats in client.latency_stats().items()}
+            for source, client in clients.items() if client.latency_stats()
+        },
+    }
+
+
+def compare(report: dict, baseline: dict) -> List[str]:
+    '''Returns a line per case of both reports with the change of its median time.'''
+    lines = []
+    for scenario, cases in report['scenarios'].items():
+        for case, result in cases.items():
+            old = baseline.get('scenarios', {}).get(scenario, {}).get(case)
+            if old is None:
+                continue
+            before, after = old['seconds']['median'], result['seconds']['median']
+            change = (after - before) / before * 100 if before else 0.0
+            lines.append(f'{scenario}.{case}: {before:.4f}s -> {after:.4f}s ({change:+.1f}%)')
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='Number of measured runs of each case.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds the stub adds to every response.')
+    parser.add_argument('--scenario', action='append', help='Scenario to run, repeatable. Defaults to every scenario.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic fixtures.')
+    parser.add_argument('--output', help='File to write the JSON report to, instead of printing it.')
+    parser.add_argument('--compare', help='JSON report of an earlier run to compare the medians against.')
+    parser.add_argument('--recordings', help='Directory of recorded responses to replay.')
+    parser.add_argument('--record', action='store_true', help='Record responses missing from --recordings from the live APIs.')
+    args = parser.parse_args()
+
+    recordings = Recordings(args.recordings) if args.recordings else None
+    with StubServer(FixtureSet(args.seed), recordings, record=args.record, latency=args.latency) as stub:
+        clients = make_clients(stub)
+        cases = scenarios(stub, clients)
+        selected = args.scenario or list(cases)
+        unknown = set(selected) - set(cases)
+        if unknown:
+            parser.error(f"unknown scenario: {', '.join(sorted(unknown))}")
+
+        report = {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'repeat': args.repeat,
+            'latency': args.latency,
+            'fixtures': 'recorded' if recordings else 'synthetic',
+            'seed': args.seed,
+            'scenarios': {},
+        }
+        for scenario in selected:
+            report['scenarios'][scenario] = {case: measure(run, args.repeat, stub, clients) for case, run in cases[scenario].items()}
+
+        for client in clients.values():
+            client.close()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+        print('\n'.join(compare(report, baseline)), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
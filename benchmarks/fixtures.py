@@ -0,0 +1,262 @@
+'''
+Fixtures for the offline benchmarks: synthetic WB, IMF and WTO catalogs and data at realistic sizes, and recordings of
+real API responses.
+
+The synthetic FixtureSet answers any request the clients make with a response of the same shape as the real API,
+generated deterministically from a seed. Recordings hold real response bodies, captured once by running the stub
+server as a recording proxy in front of the live APIs (python -m benchmarks.client_throughput --record DIR), and are
+replayed in preference to synthetic responses.
+'''
+from typing import Dict, List, Optional, Tuple
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import random
+
+# Sizes of the live catalogs.
+SIZES = {
+    'wb_indicators': 24604,
+    'wb_economies': 296,
+    'imf_indicators': 132,
+    'imf_countries': 229,
+    'wto_indicators': 312,
+    'wto_reporters': 288,
+}
+FIRST_YEAR = 1960
+LAST_YEAR = 2024
+
+_WORDS = (
+    'gross domestic product current constant prices growth annual percent population total labor force participation '
+    'rate exports imports goods services trade balance account inflation consumer index government expenditure revenue '
+    'debt general net lending borrowing unemployment employment agriculture industry manufacturing value added energy '
+    'use emissions electricity access urban rural primary secondary tertiary school enrollment life expectancy birth '
+    'mortality health capita merchandise tariff applied duty commercial transport travel'
+).split()
+
+
+def _value(*key) -> float:
+    '''A deterministic pseudo-random observation for a key such as (indicator, economy, year).'''
+    digest = hashlib.blake2b(repr(key).encode(), digest_size=8).digest()
+    return round(int.from_bytes(digest, 'big') / 2 ** 64 * 1e6, 3)
+
+
+class FixtureSet:
+    '''Synthetic catalogs of the three APIs, and the responses to their endpoints.'''
+
+    def __init__(self, seed: int = 0, sizes: Dict[str, int] = None):
+        self.seed = seed
+        self.sizes = {**SIZES, **(sizes or {})}
+        rng = random.Random(seed)
+
+        def text(words: int) -> str:
+            return ' '.join(rng.choice(_WORDS) for _ in range(words)).capitalize()
+
+        self.economies = []
+        for n in range(max(self.sizes['wb_economies'], self.sizes['imf_countries'], self.sizes['wto_reporters'])):
+            iso3 = chr(65 + (n // 676 + 7) % 26) + chr(65 + n // 26 % 26) + chr(65 + n % 26)
+            self.economies.append({'iso3': iso3, 'iso2': iso3[1:], 'name': f'{text(2)} {n}', 'wto': f'{n + 4:03d}'})
+
+        self.wb_indicators = [
+            {
+                'id': f'{rng.choice(("NY", "SP", "SE", "EN", "NE", "TM", "BX"))}.{text(1).upper()[:3]}.{n:05d}',
+                'name': text(rng.randint(4, 10)),
+                'unit': '',
+                'source': {'id': str(rng.choice((2, 2, 2, 11, 57))), 'value': 'World Development Indicators'},
+                'sourceNote': text(rng.randint(20, 80)),
+                'sourceOrganization': text(rng.randint(3, 12)),
+                'topics': [{'id': str(rng.randint(1, 21)), 'value': text(2)} for _ in range(rng.randint(0, 3))],
+            }
+            for n in range(self.sizes['wb_indicators'])
+        ]
+        self.wb_economies = [
+            {
+                'id': economy['iso3'], 'iso2Code': economy['iso2'], 'name': economy['name'],
+                'region': {'id': 'ECS', 'iso2code': 'Z7', 'value': 'Europe & Central Asia'},
+                'adminregion': {'id': '', 'iso2code': '', 'value': ''},
+                'incomeLevel': {'id': 'HIC', 'iso2code': 'XD', 'value': 'High income'},
+                'lendingType': {'id': 'LNX', 'iso2code': 'XX', 'value': 'Not classified'},
+                'capitalCity': text(1), 'longitude': str(rng.uniform(-180, 180)), 'latitude': str(rng.uniform(-90, 90)),
+            }
+            for economy in self.economies[:self.sizes['wb_economies']]
+        ]
+        self.imf_indicators = {
+            f'IMF{n:03d}': {'label': text(3), 'description': text(rng.randint(15, 60)), 'source': 'World Economic Outlook',
+                            'unit': 'Percent', 'dataset': rng.choice(('WEO', 'FM', 'AFRREO', 'APDREO'))}
+            for n in range(self.sizes['imf_indicators'])
+        }
+        self.imf_countries = {economy['iso3']: {'label': economy['name']} for economy in self.economies[:self.sizes['imf_countries']]}
+        self.wto_indicators = [
+            {
+                'code': f'WTO_{n:04d}', 'name': text(rng.randint(3, 8)), 'categoryCode': 'ITS', 'categoryLabel': text(2),
+                'subcategoryCode': 'ITS_MTV', 'subcategoryLabel': text(3), 'unitCode': 'USM', 'unitLabel': 'Million US dollar',
+                'startYear': FIRST_YEAR, 'endYear': LAST_YEAR, 'frequencyCode': 'A', 'frequencyLabel': 'Annual',
+                'numberReporters': self.sizes['wto_reporters'], 'numberPartners': 1, 'productSectorClassificationCode': 'SITC3',
+                'productSectorClassificationLabel': 'SITC Revision 3', 'hasMetadata': 'Y', 'numberDecimals': 0,
+                'numberDatapoints': 12000, 'updateFrequency': 'Annual', 'description': text(rng.randint(10, 40)), 'sortOrder': n,
+            }
+            for n in range(self.sizes['wto_indicators'])
+        ]
+        self.wto_reporters = [
+            {'code': economy['wto'], 'iso3A': economy['iso3'] if n % 12 else None, 'name': economy['name'], 'displayOrder': n}
+            for n, economy in enumerate(self.economies[:self.sizes['wto_reporters']])
+        ]
+
+    @staticmethod
+    def _page(records, query: dict, total: int = None) -> list:
+        '''Returns a WB page of records, a list or a function returning the records in a range of a total number of them.'''
+        per_page = int(query.get('per_page', 50))
+        page = int(query.get('page', 1))
+        total = len(records) if total is None else total
+        pages = max(-(-total // per_page), 1)
+        meta = {'page': page, 'pages': pages, 'per_page': per_page, 'total': total, 'sourceid': None, 'lastupdated': '2024-12-16'}
+        start, stop = (page - 1) * per_page, min(page * per_page, total)
+        return [meta, records[start:stop] if isinstance(records, list) else records(start, stop)]
+
+    @staticmethod
+    def _years(period: str, first: int = FIRST_YEAR, last: int = LAST_YEAR) -> List[int]:
+        if not period or period == 'all':
+            return list(range(first, last + 1))
+        years = []
+        for part in str(period).replace(':', '-').split(','):
+            start, _, end = part.partition('-')
+            years += range(int(start[:4]), int((end or start)[:4]) + 1)
+        return years
+
+    def wb(self, path: List[str], query: dict) -> Tuple[int, object]:
+        if path == ['indicator']:
+            return 200, self._page(self.wb_indicators, query)
+        if len(path) == 2 and path[0] == 'indicator':
+            return 200, self._page([indicator for indicator in self.wb_indicators if indicator['id'] == path[1]], query)
+        if path == ['country']:
+            return 200, self._page(self.wb_economies, query)
+        if len(path) == 4 and path[0] == 'country' and path[2] == 'indicator':
+            names = {economy['id']: economy['name'] for economy in self.wb_economies}
+            countries = list(names) if path[1].lower() == 'all' else path[1].split(';')
+            indicators = path[3].split(';')
+            start, _, end = query.get('date', f'{FIRST_YEAR}:{LAST_YEAR}').partition(':')
+            years = list(range(int(end or start), int(start) - 1, -1))
+
+            # Rows are ordered by indicator, country and descending year, and only those of the page are generated.
+            def rows(first: int, last: int) -> list:
+                page = []
+                for n in range(first, last):
+                    indicator, rest = divmod(n, len(countries) * len(years))
+                    country, year = countries[rest // len(years)], years[rest % len(years)]
+                    page.append({
+                        'indicator': {'id': indicators[indicator], 'value': indicators[indicator]},
+                        'country': {'id': country[1:], 'value': names.get(country, country)},
+                        'countryiso3code': country, 'date': str(year), 'value': _value(indicators[indicator], country, year),
+                        'unit': '', 'obs_status': '', 'decimal': 1,
+                    })
+                return page
+
+            return 200, self._page(rows, query, len(indicators) * len(countries) * len(years))
+        return 404, [{'message': [{'id': '120', 'key': 'Invalid value', 'value': 'The provided parameter value is not valid'}]}]
+
+    def imf(self, path: List[str], query: dict) -> Tuple[int, object]:
+        if path == ['indicators']:
+            return 200, {'indicators': self.imf_indicators, 'api': {'version': '1', 'output-method': 'json'}}
+        if path == ['countries']:
+            return 200, {'countries': self.imf_countries, 'api': {'version': '1', 'output-method': 'json'}}
+        if path and path[0] in self.imf_indicators:
+            indicator, areas = path[0], path[1:] or list(self.imf_countries)
+            years = self._years(query.get('periods'), 1980, 2029)
+            values = {area: {str(year): _value(indicator, area, year) for year in years} for area in areas if area in self.imf_countries}
+            return 200, {'values': {indicator: values}, 'api': {'version': '1', 'output-method': 'json'}}
+        return 200, {'api': {'version': '1', 'output-method': 'json'}}
+
+    def _wto_records(self, query: dict) -> List[dict]:
+        reporters = self.wto_reporters
+        if query.get('r') and query['r'] != 'all':
+            codes = set(str(query['r']).split(','))
+            reporters = [reporter for reporter in reporters if reporter['code'] in codes]
+        years = self._years(query.get('ps'))
+        indicator = query.get('i')
+        # Sub-products are included when spc is true, as a JSON boolean in a /data payload or 'true' in a query string.
+        products = [('TO', 'Total merchandise')]
+        if query.get('spc') is True or query.get('spc') == 'true':
+            products += [('AG', 'Agricultural products'), ('MA', 'Manufactures')]
+        return [
+            {
+                'IndicatorCategoryCode': 'ITS', 'IndicatorCategory': 'International trade statistics', 'IndicatorCode': indicator,
+                'Indicator': 'Merchandise exports by product group', 'ReportingEconomyCode': reporter['code'],
+                'ReportingEconomy': reporter['name'], 'PartnerEconomyCode': '000', 'PartnerEconomy': 'World',
+                'ProductOrSectorClassificationCode': 'SITC3', 'ProductOrSectorClassification': 'SITC Revision 3',
+                'ProductOrSectorCode': product, 'ProductOrSector': product_name, 'PeriodCode': 'A', 'Period': 'Annual',
+                'FrequencyCode': 'A', 'Frequency': 'Annual', 'UnitCode': 'USM', 'Unit': 'Million US dollar', 'Year': year,
+                'ValueFlagCode': None, 'ValueFlag': None, 'TextValue': None,
+                'Value': _value(indicator, reporter['code'], year) if product == 'TO' else _value(indicator, reporter['code'], year, product),
+            }
+            for reporter in reporters for product, product_name in products for year in years
+        ]
+
+    @staticmethod
+    def _csv(records: List[dict]) -> bytes:
+        '''Returns records as a WTO CSV document with machine readable headings, with a byte order mark like the API's.'''
+        if not records:
+            return b''
+        output = io.StringIO()
+        writer = csv.writer(output, lineterminator='\r\n')
+        writer.writerow(records[0])
+        writer.writerows([['' if value is None else value for value in record.values()] for record in records])
+        return output.getvalue().encode('utf-8-sig')
+
+    def wto(self, method: str, path: List[str], query: dict) -> Tuple[int, object]:
+        if path == ['indicators']:
+            return 200, self.wto_indicators
+        if path == ['reporters']:
+            return 200, self.wto_reporters
+        if path == ['data_count']:
+            return 200, len(self._wto_records(query))
+        if path == ['data']:
+            offset, limit = int(query.get('off') or 0), min(int(query.get('max') or 500), 1000000)
+            records = self._wto_records(query)[offset:offset + limit]
+            if str(query.get('fmt') or '').lower() == 'csv':
+                return 200, self._csv(records)
+            return 200, {'Dataset': records}
+        return 404, {'statusCode': 404, 'message': 'Resource not found'}
+
+    def respond(self, source: str, method: str, path: List[str], query: dict) -> Tuple[int, object]:
+        '''
+        Returns the status code and body of a request to an endpoint of source ('wb', 'imf' or 'wto'): the JSON document,
+        or the encoded document for other formats, e.g. WTO data with fmt 'csv'.
+        '''
+        if source == 'wb':
+            return self.wb(path, query)
+        if source == 'imf':
+            return self.imf(path, query)
+        return self.wto(method, path, query)
+
+
+class Recordings:
+    '''
+    Response bodies of real API requests, stored in a directory as one gzipped JSON file per request.
+
+    Requests are identified by method, path and query relative to the API's base URL, and the body of POSTs.
+    '''
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    @staticmethod
+    def key(source: str, method: str, path_and_query: str, body: Optional[bytes]) -> str:
+        digest = hashlib.sha256(b'\0'.join([source.encode(), method.encode(), path_and_query.encode(), body or b''])).hexdigest()
+        return f'{source}-{digest[:32]}'
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.json.gz')
+
+    def get(self, key: str) -> Optional[Tuple[int, bytes]]:
+        if not os.path.exists(self._path(key)):
+            return None
+        with gzip.open(self._path(key), 'rb') as file:
+            record = json.loads(file.read())
+        return record['status'], record['body'].encode()
+
+    def put(self, key: str, status: int, body: bytes, request: str) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with gzip.open(self._path(key), 'wb') as file:
+            file.write(json.dumps({'request': request, 'status': status, 'body': body.decode()}).encode())
@@ -0,0 +1,63 @@
+'''
+Measures the cold-start cost of the package: the time to import it, and to construct a GlobalDataInterface and its
+first client, each in a fresh interpreter.
+
+Usage:
+    python -m benchmarks.import_time [--repeat N]
+
+Prints a JSON report with the min and median seconds of each step over N interpreters, timed inside the interpreter so
+its own startup is left out, and the heavy dependencies (requests, aiohttp, numpy) the step imported.
+'''
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ['requests', 'aiohttp', 'numpy']
+
+STEPS = {
+    'import_package': 'import global_data_interface',
+    'import_wb_client': 'from global_data_interface import WBClient',
+    'global_data_interface': 'from global_data_interface.global_data_interface import GlobalDataInterface; GlobalDataInterface()',
+    'first_client': 'from global_data_interface.global_data_interface import GlobalDataInterface; GlobalDataInterface().wb',
+    'construct_100_times': 'from global_data_interface.global_data_interface import GlobalDataInterface\n'
+                           'for _ in range(100): GlobalDataInterface().wb',
+}
+
+PROBE = '''
+import sys, time
+started = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - started
+print(elapsed, *[name for name in {modules!r} if name in sys.modules])
+'''
+
+
+def run_step(code: str) -> tuple:
+    '''Runs code in a fresh interpreter and returns the seconds it took and the heavy modules it imported.'''
+    output = subprocess.run([sys.executable, '-c', PROBE.format(code=code, modules=HEAVY_MODULES)],
+                            capture_output=True, text=True, check=True).stdout.split()
+    return float(output[0]), output[1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=10, help='Number of interpreters each step is measured in.')
+    args = parser.parse_args()
+
+    report = {'python': sys.version.split()[0], 'repeat': args.repeat, 'steps': {}}
+    for step, code in STEPS.items():
+        runs = [run_step(code) for _ in range(args.repeat)]
+        times = [seconds for seconds, _ in runs]
+        report['steps'][step] = {
+            'min': round(min(times), 4),
+            'median': round(statistics.median(times), 4),
+            'imported': runs[-1][1],
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
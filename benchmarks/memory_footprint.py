@@ -0,0 +1,62 @@
+'''
+Measures the memory used per object by the catalog and datapoint data classes, comparing the slotted classes
+against dict-backed equivalents with the same fields.
+
+Usage:
+    python -m benchmarks.memory_footprint [--count N]
+
+Prints a JSON report with the bytes per object of each variant and the saving on a catalog of N records.
+'''
+from dataclasses import fields, make_dataclass
+import argparse
+import json
+import tracemalloc
+
+from global_data_interface.imf_client import IMFIndicator
+from global_data_interface.wb_client import WBDataPoint, WBEconomy, WBIndicator
+from global_data_interface.wto_client import WTOIndicator, WTOTimeseriesDatapoint
+
+# 24,604 is the size of the WB indicator catalog.
+DEFAULT_COUNT = 24604
+CLASSES = [WBIndicator, WBEconomy, WBDataPoint, IMFIndicator, WTOIndicator, WTOTimeseriesDatapoint]
+
+
+def dict_backed(cls):
+    '''Returns a plain dataclass with the same fields as cls, storing its attributes in a per-instance __dict__.'''
+    return make_dataclass(f'{cls.__name__}WithDict', [field.name for field in fields(cls)])
+
+
+def bytes_per_object(cls, values: list, count: int) -> float:
+    '''Allocates count instances of cls from pre-built field values and returns the bytes allocated per instance.'''
+    tracemalloc.start()
+    snapshot = tracemalloc.take_snapshot()
+    objects = [cls(*values) for _ in range(count)]
+    allocated = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(snapshot, 'filename'))
+    tracemalloc.stop()
+    del objects
+    return allocated / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=DEFAULT_COUNT, help='Number of objects allocated per class.')
+    args = parser.parse_args()
+
+    report = {'count': args.count, 'classes': {}}
+    for cls in CLASSES:
+        # Field values are shared by every instance, so only the per-object overhead is measured.
+        values = [f'{field.name}-value' for field in fields(cls)]
+        slotted = bytes_per_object(cls, values, args.count)
+        with_dict = bytes_per_object(dict_backed(cls), values, args.count)
+        report['classes'][cls.__name__] = {
+            'slotted_bytes_per_object': round(slotted, 1),
+            'dict_bytes_per_object': round(with_dict, 1),
+            'saving_bytes_per_object': round(with_dict - slotted, 1),
+            'saving_bytes_total': round((with_dict - slotted) * args.count),
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
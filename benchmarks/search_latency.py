@@ -0,0 +1,72 @@
+'''
+Measures the latency of indicator search over catalogs of the live sizes, and fails if it misses the target.
+
+Usage:
+    python -m benchmarks.search_latency [--repeat N] [--target-ms MS] [--seed SEED]
+
+Each query is run against an IndicatorSearchIndex of the WB, IMF and WTO indicator catalogs, unfiltered and filtered
+by source, and through GlobalDataInterface.search_indicators with clients pointed at the stub server, after the index
+is built. Prints a JSON report with the median and p95 milliseconds of each case, and exits with status 1 if any p95
+exceeds --target-ms.
+'''
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from benchmarks.fixtures import FixtureSet
+from benchmarks.stub_server import StubServer
+from global_data_interface import IMFClient, WBClient, WTOClient
+from global_data_interface.global_data_interface import GlobalDataInterface
+from global_data_interface.search_index import IndicatorSearchIndex
+
+UNLIMITED = {'rate': None, 'burst': None, 'max_concurrency': None}
+QUERIES = ['gdp', 'consumer price infla', 'population total', 'gross domestic product current', 'exports goods services', 'g', 't']
+
+
+def timed(run, repeat: int) -> dict:
+    run()
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - started) * 1000)
+    times.sort()
+    return {'median_ms': round(statistics.median(times), 4), 'p95_ms': round(times[min(int(len(times) * 0.95), len(times) - 1)], 4)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=200, help='Number of measured runs of each query, after a warm-up run.')
+    parser.add_argument('--target-ms', type=float, default=1.0, help='Largest acceptable p95 latency of a query, in milliseconds.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic fixtures.')
+    args = parser.parse_args()
+
+    fixtures = FixtureSet(seed=args.seed)
+    index = IndicatorSearchIndex()
+    index.update('WB', (WBClient._parse_indicator(item).to_search_document() for item in fixtures.wb_indicators))
+    index.update('IMF', (indicator.to_search_document() for indicator in IMFClient._parse_indicators({'indicators': fixtures.imf_indicators})))
+    index.update('WTO', (WTOClient._parse_indicator(item).to_search_document() for item in fixtures.wto_indicators))
+
+    report = {'python': sys.version.split()[0], 'repeat': args.repeat, 'documents': len(index), 'target_ms': args.target_ms, 'cases': {}}
+    for query in QUERIES:
+        report['cases'][f'search {query!r}'] = timed(lambda: index.search(query), args.repeat)
+        report['cases'][f'search {query!r} sources=WB,IMF'] = timed(lambda: index.search(query, sources=['WB', 'IMF']), args.repeat)
+
+    with StubServer(fixtures) as stub:
+        gdi = GlobalDataInterface()
+        gdi.wb, gdi.imf, gdi.wto = WBClient(rate_limit=UNLIMITED), IMFClient(rate_limit=UNLIMITED), WTOClient(rate_limit=UNLIMITED)
+        for source, client in (('wb', gdi.wb), ('imf', gdi.imf), ('wto', gdi.wto)):
+            client.BASE_URL = stub.url(source)
+        for query in QUERIES:
+            report['cases'][f'search_indicators {query!r}'] = timed(lambda: gdi.search_indicators(query), args.repeat)
+
+    slow = [case for case, result in report['cases'].items() if result['p95_ms'] > args.target_ms]
+    report['slow'] = slow
+    print(json.dumps(report, indent=2))
+    assert not slow, f'{len(slow)} search cases exceed the p95 target of {args.target_ms} ms'
+
+
+if __name__ == '__main__':
+    main()
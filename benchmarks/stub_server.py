@@ -0,0 +1,154 @@
+'''
+A local HTTP server standing in for the WB, IMF and WTO APIs, so the clients can be benchmarked offline.
+
+Each API is served under its own prefix: point a client at it by setting its BASE_URL to stub.url('wb'), stub.url('imf')
+or stub.url('wto'). Requests are answered from recordings where one exists, and otherwise from a synthetic FixtureSet.
+With record set, requests without a recording are forwarded to the live API and its response is recorded. With compress
+set, responses are gzipped for clients which accept it, as the live APIs do.
+'''
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import parse_qsl, urlsplit
+import gzip
+import json
+import threading
+import time
+
+import requests
+
+from benchmarks.fixtures import FixtureSet, Recordings
+
+# Live base URL of each API, for recording.
+UPSTREAM = {
+    'wb': 'https://api.worldbank.org/v2',
+    'imf': 'https://www.imf.org/external/datamapper/api/v1',
+    'wto': 'http://api.wto.org/timeseries/v1',
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: 'StubServer'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._respond('GET', None)
+
+    def do_POST(self):
+        self._respond('POST', self.rfile.read(int(self.headers.get('Content-Length') or 0)))
+
+    def _respond(self, method: str, body: bytes):
+        source, _, path_and_query = self.path.lstrip('/').partition('/')
+        status, content, headers = self.server.stub.handle(source, method, '/' + path_and_query, body, dict(self.headers))
+        if self.server.stub.latency:
+            time.sleep(self.server.stub.latency)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class StubServer:
+    '''
+    Stub of the three APIs on a local port, run in a background thread.
+
+    Can be used as a context manager, which starts the server and shuts it down on exit. Counts the requests served and
+    the bytes of their responses as sent, i.e. compressed where they were, reset with reset_counters().
+    '''
+
+    def __init__(self, fixtures: FixtureSet = None, recordings: Recordings = None, record: bool = False, latency: float = 0.0,
+                 compress: bool = False, host: str = '127.0.0.1', port: int = 0):
+        '''
+        Args:
+            fixtures (FixtureSet, optional): Synthetic API contents. Defaults to a FixtureSet of the live catalog sizes.
+            recordings (Recordings, optional): Recorded responses, replayed in preference to synthetic ones.
+            record (bool): Forward requests without a recording to the live APIs and record their responses.
+            latency (float): Seconds added to every response, to emulate the round trip to the live APIs.
+            compress (bool): Gzip responses to requests which accept gzip.
+            host (str): Interface to listen on.
+            port (int): Port to listen on. 0 picks a free port.
+        '''
+        self.fixtures = fixtures if fixtures is not None else FixtureSet()
+        self.recordings = recordings
+        self.record = record
+        self.latency = latency
+        self.compress = compress
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def url(self, source: str) -> str:
+        '''The base URL under which the API of source ('wb', 'imf' or 'wto') is served.'''
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/{source}'
+
+    def reset_counters(self) -> Dict[str, int]:
+        '''Resets the request and byte counters and returns their values.'''
+        with self._lock:
+            counters = {'requests': self.requests, 'bytes': self.bytes_sent}
+            self.requests = self.bytes_sent = 0
+        return counters
+
+    def _forward(self, source: str, method: str, path_and_query: str, body: bytes, headers: dict) -> tuple:
+        headers = {key: value for key, value in headers.items() if key.lower() not in ('host', 'content-length', 'accept-encoding')}
+        response = requests.request(method, UPSTREAM[source] + path_and_query, data=body, headers=headers, timeout=60)
+        return response.status_code, response.content
+
+    def handle(self, source: str, method: str, path_and_query: str, body: bytes, headers: dict) -> tuple:
+        '''Returns the status code, body and headers of the response to a request to the API of source.'''
+        recorded = None
+        content_type = 'application/json'
+        if self.recordings is not None:
+            key = self.recordings.key(source, method, path_and_query, body)
+            recorded = self.recordings.get(key)
+            if recorded is None and self.record and source in UPSTREAM:
+                recorded = self._forward(source, method, path_and_query, body, headers)
+                self.recordings.put(key, *recorded, request=f'{method} {source}{path_and_query}')
+
+        if recorded is not None:
+            status, content = recorded
+        else:
+            # The WB client builds some URLs with a double slash, e.g. /v2//country, which urlsplit would read as a host.
+            split = urlsplit('/' + path_and_query.lstrip('/'))
+            path = [segment for segment in split.path.split('/') if segment]
+            query = dict(parse_qsl(split.query))
+            if body:
+                query.update(json.loads(body))
+            status, data = self.fixtures.respond(source, method, path, query)
+            if isinstance(data, bytes):
+                content, content_type = data, 'text/csv'
+            else:
+                content = json.dumps(data).encode()
+
+        response_headers = {'Content-Type': content_type}
+        if self.compress and 'gzip' in headers.get('Accept-Encoding', ''):
+            content = gzip.compress(content, compresslevel=6)
+            response_headers['Content-Encoding'] = 'gzip'
+
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += len(content)
+        return status, content, response_headers
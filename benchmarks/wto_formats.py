@@ -0,0 +1,114 @@
+'''
+Compares the JSON and CSV formats of WTO /data responses: the bytes each transfers, and the time the client takes to
+decode and parse them.
+
+Usage:
+    python -m benchmarks.wto_formats [--repeat N] [--indicators N] [--seed SEED]
+
+Parsing is measured offline, on synthetic responses of every reporter over 1960-2024 for N indicators, streamed to the
+client's decoders in 64 KiB chunks as iter_content would: decoded into records only, and parsed into
+WTOTimeseriesDatapoints and into columns. The client is then measured end to end against the stub server with gzip
+enabled, fetching the same data with WTOClient.data(paginate=True) in each format.
+
+Prints a JSON report with the raw and gzipped size of each format, the min and median seconds of each case, and the
+requests and bytes transferred per end to end run.
+'''
+import argparse
+import gzip
+import json
+import statistics
+import sys
+import time
+
+from benchmarks.fixtures import FixtureSet
+from benchmarks.stub_server import StubServer
+from global_data_interface import WTOClient
+from global_data_interface.columnar import TimeseriesColumns
+from global_data_interface.streaming_csv import iter_csv_records
+from global_data_interface.streaming_json import iter_array_items
+
+UNLIMITED = {'rate': None, 'burst': None, 'max_concurrency': None}
+CHUNK_SIZE = 64 * 1024
+PERIOD = '1960-2024'
+
+
+def chunked(content: bytes):
+    return (content[offset:offset + CHUNK_SIZE] for offset in range(0, len(content), CHUNK_SIZE))
+
+
+def decode(fmt: str, content: bytes):
+    if fmt == 'csv':
+        return iter_csv_records(chunked(content), WTOClient.CSV_CONVERTERS)
+    return iter_array_items(chunked(content), 'Dataset')
+
+
+def decode_records(fmt: str, content: bytes) -> int:
+    return sum(1 for _ in decode(fmt, content))
+
+
+def parse_objects(fmt: str, content: bytes) -> int:
+    return len([WTOClient._parse_datapoint(record) for record in decode(fmt, content)])
+
+
+def parse_columns(fmt: str, content: bytes) -> int:
+    columns = TimeseriesColumns(WTOClient.DATA_COLUMNS)
+    for record in decode(fmt, content):
+        WTOClient._append_datapoint(columns, record)
+    return len(columns)
+
+
+def timed(run, repeat: int) -> dict:
+    run()
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        records = run()
+        times.append(time.perf_counter() - started)
+    return {'records': records, 'min': round(min(times), 4), 'median': round(statistics.median(times), 4)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='Number of measured runs of each case, after a warm-up run.')
+    parser.add_argument('--indicators', type=int, default=4, help='Number of indicators parsed and fetched.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic fixtures.')
+    args = parser.parse_args()
+
+    fixtures = FixtureSet(seed=args.seed)
+    indicators = [indicator['code'] for indicator in fixtures.wto_indicators[:args.indicators]]
+    records = [record for indicator in indicators for record in fixtures._wto_records({'i': indicator, 'ps': PERIOD})]
+    bodies = {'json': json.dumps({'Dataset': records}).encode(), 'csv': fixtures._csv(records)}
+
+    report = {'python': sys.version.split()[0], 'repeat': args.repeat, 'records': len(records), 'formats': {}}
+    for fmt, content in bodies.items():
+        report['formats'][fmt] = {
+            'bytes': len(content),
+            'gzip_bytes': len(gzip.compress(content, compresslevel=6)),
+            'decode': timed(lambda: decode_records(fmt, content), args.repeat),
+            'parse_objects': timed(lambda: parse_objects(fmt, content), args.repeat),
+            'parse_columnar': timed(lambda: parse_columns(fmt, content), args.repeat),
+        }
+
+    with StubServer(fixtures, compress=True) as stub:
+        client = WTOClient(rate_limit=UNLIMITED)
+        client.BASE_URL = stub.url('wto')
+
+        def fetch(fmt: str) -> int:
+            return sum(len(client.data(indicator, ps=PERIOD, fmt=fmt, paginate=True, page_size=5000, columnar=True)) for indicator in indicators)
+
+        for fmt in bodies:
+            stub.reset_counters()
+            result = timed(lambda: fetch(fmt), args.repeat)
+            counters = stub.reset_counters()
+            runs = args.repeat + 1
+            report['formats'][fmt]['end_to_end'] = {
+                **result,
+                'requests_per_run': counters['requests'] // runs,
+                'bytes_per_run': counters['bytes'] // runs,
+            }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
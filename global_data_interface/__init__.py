@@ -1,5 +1,35 @@
-from global_data_interface.global_data_class import GlobalEconomy, GlobalIndicator, GlobalEconomyGroup, GlobalIndicatorGroup
-from global_data_interface.imf_client import IMFClient
-from global_data_interface.un_client import UNClient
-from global_data_interface.wb_client import WBClient
-from global_data_interface.wto_client import WTOClient
\ No newline at end of file
+import importlib
+
+# Public name mapped to the module defining it. Modules are imported on first access to one of their names (PEP 562), so
+# importing the package does not import requests, aiohttp or NumPy, and a client only pulls in the modules it uses.
+_EXPORTS = {
+    'GlobalDataPoint': 'global_data_interface.global_data_class',
+    'GlobalEconomy': 'global_data_interface.global_data_class',
+    'GlobalIndicator': 'global_data_interface.global_data_class',
+    'GlobalEconomyGroup': 'global_data_interface.global_data_class',
+    'GlobalIndicatorGroup': 'global_data_interface.global_data_class',
+    'HTTPCache': 'global_data_interface.http_cache',
+    'IMFClient': 'global_data_interface.imf_client',
+    'UNClient': 'global_data_interface.un_client',
+    'WBClient': 'global_data_interface.wb_client',
+    'WTOClient': 'global_data_interface.wto_client',
+    'AsyncIMFClient': 'global_data_interface.async_imf_client',
+    'AsyncWBClient': 'global_data_interface.async_wb_client',
+    'AsyncWTOClient': 'global_data_interface.async_wto_client',
+    'GlobalDataInterface': 'global_data_interface.global_data_interface',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
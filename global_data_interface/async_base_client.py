@@ -0,0 +1,111 @@
+from abc import ABC, abstractmethod
+import asyncio
+
+from global_data_interface.base_client import APIError, BaseClient
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncBaseClient(ABC):
+    '''
+    Asyncio counterpart of BaseClient.
+
+    Requests are made with aiohttp on a connection pool owned by the client, and at most max_concurrency
+    requests are in flight at once. Requires the optional aiohttp dependency (pip install Global-Data-Interface[async]).
+    '''
+
+    BaseUrl: str = ''
+
+    # URL construction is shared with the synchronous clients.
+    _construct_url = BaseClient._construct_url
+    _add_path_segments = staticmethod(BaseClient._add_path_segments)
+    _add_query_parameters = staticmethod(BaseClient._add_query_parameters)
+
+    def __init__(self, api: str, api_key = None, headers = None, max_concurrency: int = 20, pool_maxsize: int = 100,
+                 keep_alive: bool = True, timeout: float = 10):
+        '''
+        Args:
+            api (str): Name of the API, used in error messages.
+            api_key (str, optional): API key.
+            headers (dict, optional): Headers sent with every request.
+            max_concurrency (int): Maximum number of requests in flight at once.
+            pool_maxsize (int): Maximum number of open connections per host.
+            keep_alive (bool): Keep connections open between requests.
+            timeout (float): Request timeout in seconds.
+        '''
+        if aiohttp is None:
+            raise ImportError('The async clients require aiohttp: pip install Global-Data-Interface[async]')
+        self.api = api
+        self.api_key = api_key
+        self.headers = headers
+        self.max_concurrency = max_concurrency
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self._session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    @property
+    def session(self) -> 'aiohttp.ClientSession':
+        '''The pooled session shared by every request made by this client, created on first use inside the running event loop.'''
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=self.pool_maxsize, force_close=not self.keep_alive)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def close(self) -> None:
+        '''Closes the client's session and every pooled connection.'''
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
+
+    async def _request(self, method: str, url: str, payload=None):
+        '''Makes a request and returns its decoded JSON body.'''
+        if method.upper() not in ('GET', 'POST'):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+
+        session = self.session
+        try:
+            async with self._semaphore:
+                async with session.request(method.upper(), url, json=payload) as response:
+                    response.raise_for_status()
+                    return await response.json(content_type=None)
+
+        except asyncio.TimeoutError:
+            raise APIError(f"Request to {self.api} API timed out")
+        except aiohttp.ClientConnectionError:
+            raise APIError(f"Failed to connect to {self.api} API")
+        except aiohttp.ClientResponseError as e:
+            raise APIError(f"{self.api} API returned an HTTP error: {e.status}")
+        except aiohttp.ClientError as e:
+            action = "getting" if method.upper() == "GET" else "posting"
+            raise APIError(f"An error occurred while {action} data from {self.api} API: {e}")
+
+    async def _get(self, url: str):
+        return await self._request("GET", url)
+
+    async def _post(self, url: str, payload):
+        return await self._request("POST", url, payload)
+
+    @abstractmethod
+    def info(self) -> None:
+        '''
+        Abstract method for retrieving API-specific information.
+
+        This method must be implemented by any subclass of AsyncBaseClient.
+        '''
+        pass
@@ -0,0 +1,86 @@
+from typing import List
+
+from global_data_interface.async_base_client import AsyncBaseClient
+from global_data_interface.imf_client import IMFAPIError, IMFClient, IMFCountry, IMFGroup, IMFIndicator, IMFRegion, IMFTimeseriesDatapoint
+
+
+class AsyncIMFClient(AsyncBaseClient):
+    '''An asyncio client for interacting with the IMF API, returning the same dataclasses as IMFClient.'''
+    
+    BASE_URL = IMFClient.BASE_URL
+    API_DOCS = IMFClient.API_DOCS
+    
+    _data_url = IMFClient._data_url
+    
+    def __init__(self, **kwargs):
+        super().__init__('IMF', **kwargs)
+        
+    def info(self) -> None:
+        IMFClient.info(self)
+    
+    async def data(self, indicator: str, countries: List[str] = None, regions: List[str] = None, groups: List[str] = None, years: List[int] = None) -> List[IMFTimeseriesDatapoint]:
+        '''
+        Fetches timeseries data for a given indicator, filtered by countries, regions, groups, and years.
+
+        Args:
+            indicator (str): The indicator code (e.g., 'PPPGDP').
+            countries (List[str]): List of country codes to filter by.
+            regions (List[str]): List of region codes to filter by.
+            groups (List[str]): List of group codes to filter by.
+            years (List[int]): List of years to filter by.
+
+        Returns:
+            List[IMFTimeseriesDatapoint]: A list of IMFTimeseriesDatapoint objects.
+        '''
+        url = self._data_url(indicator, countries, regions, groups, years)
+        
+        try:
+            data = await self._get(url)
+        except IMFAPIError as e:
+            print(f'Error fetching IMF timeseries data: {e}')
+            return []
+        
+        return IMFClient._parse_data(data, indicator)
+    
+    async def indicators(self) -> List[IMFIndicator]:
+        '''Retrieves a list of available indicators.'''
+        
+        try:
+            data = await self._get(self.BASE_URL + '/indicators')
+        except IMFAPIError as e:
+            print(f'Error fetching IMF indicators: {e}')
+            return []
+        
+        return IMFClient._parse_indicators(data)
+    
+    async def economies(self) -> List[IMFCountry]:
+        '''Retrieves a list of available countries.'''
+        
+        try:
+            data = await self._get(self.BASE_URL + '/countries')
+        except IMFAPIError as e:
+            print(f'Error fetching IMF Countries: {e}')
+            return []
+        
+        return IMFClient._parse_economies(data)
+    
+    async def regions(self) -> List[IMFRegion]:
+        
+        try:
+            data = await self._get(self.BASE_URL + '/regions')
+        except IMFAPIError as e:
+            print(f'Error fetching IMF Regions: {e}')
+            return []
+        
+        return IMFClient._parse_regions(data)
+    
+    async def groups(self) -> List[IMFGroup]:
+        '''Retrieves a list of available analytical groups.'''
+        
+        try:
+            data = await self._get(self.BASE_URL + '/groups')
+        except IMFAPIError as e:
+            print(f'Error fetching IMF Groups: {e}')
+            return []
+        
+        return IMFClient._parse_groups(data)
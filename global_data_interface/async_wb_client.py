@@ -0,0 +1,116 @@
+import asyncio
+from typing import List
+
+from global_data_interface.async_base_client import AsyncBaseClient
+from global_data_interface.wb_client import WBAPIError, WBClient, WBDataPoint, WBEconomy, WBIncomeLevel, WBIndicator, WBRegion, WBSource, WBTopic
+
+
+class AsyncWBClient(AsyncBaseClient):
+    '''An asyncio client for interacting with the WB API, returning the same dataclasses as WBClient.'''
+    
+    BASE_URL = WBClient.BASE_URL
+    API_DOCS = WBClient.API_DOCS
+    
+    _data_url = WBClient._data_url
+    
+    def __init__(self, **kwargs):
+        super().__init__('WB', **kwargs)
+        
+    def info(self) -> None:
+        WBClient.info(self)
+    
+    async def _fetch_page(self, url: str, page: int):
+        paged_url = self._add_query_parameters(url, {'page': page})
+        return await self._get(paged_url)
+    
+    async def _fetch_pages(self, url: str) -> List[list]:
+        '''
+        Fetches every page of a paginated WB endpoint.
+        
+        The first page is fetched on its own to read the page count, the remaining pages are then fetched concurrently.
+        
+        Returns:
+            list: The records (data[1]) of each non-empty page, in page order.
+        '''
+        data = await self._fetch_page(url, 1)
+        if not data or len(data) < 2 or not data[1]:
+            return []
+        
+        page_count = int(data[0].get('pages') or 1)
+        results = await asyncio.gather(*(self._fetch_page(url, page) for page in range(2, page_count + 1)))
+        
+        return [data[1]] + [data[1] for data in results if data and len(data) > 1 and data[1]]
+    
+    async def _records(self, url: str, label: str) -> list:
+        try:
+            data = await self._get(url)
+        except WBAPIError as e:
+            print(f"Error fetching WB {label.lower()} data: {e}")
+            return []
+        
+        if data[1]:
+            return data[1]
+        else:
+            print(f'WB {label} - Something went wrong.')
+            return []
+    
+    async def indicators(self) -> List[WBIndicator]:
+        '''Retrieves a list of available WB indicators.'''
+        
+        url = self._construct_url(self.BASE_URL, ['/indicator'], {'format': 'json', 'per_page': '1000'})
+        
+        try:
+            pages = await self._fetch_pages(url)
+        except WBAPIError as e:
+            print(f"Error fetching WB indicators data: {e}")
+            return []
+        
+        return [WBClient._parse_indicator(item) for page in pages for item in page]
+    
+    async def regions(self) -> List[WBRegion]:
+        url = self._add_query_parameters(self.BASE_URL + '/region', {'format': 'json', 'per_page': '1000'})
+        return [WBClient._parse_region(region) for region in await self._records(url, 'Regions')]
+    
+    async def economies(self, region=None, income_level=None, lending_type=None) -> List[WBEconomy]:
+        '''
+        Retrieves a list of available WB economies.
+        
+        These are collected from the WB API "/country" endpoint, but contains economic zones which are not countries.
+        '''
+        
+        query_parameters = {'format': 'json', 'per_page': '1000', 'region': region, 'income_level': income_level, 'lending_type': lending_type}
+        url = self._construct_url(self.BASE_URL, ['/country'], query_parameters)
+        return [WBClient._parse_economy(economy) for economy in await self._records(url, 'Economies')]
+    
+    async def topics(self) -> List[WBTopic]:
+        '''Retrieves a list of available WB topics.'''
+        
+        url = self._construct_url(self.BASE_URL, ['/topic'], {'format': 'json', 'per_page': '1000'})
+        return [WBClient._parse_topic(topic) for topic in await self._records(url, 'Topics')]
+    
+    async def sources(self) -> List[WBSource]:
+        '''Retrieves a list of available WB sources.'''
+        
+        url = self._construct_url(self.BASE_URL, ['/source'], {'format': 'json', 'per_page': '1000'})
+        return [WBClient._parse_source(source) for source in await self._records(url, 'Sources')]
+    
+    async def income_levels(self) -> List[WBIncomeLevel]:
+        url = self._add_query_parameters(self.BASE_URL + '/incomeLevel', {'format': 'json', 'per_page': '1000'})
+        return [WBClient._parse_income_level(income_level) for income_level in await self._records(url, 'Income Levels')]
+    
+    async def data(self, countries, indicators, start_date, end_date, frequency='Y') -> List[WBDataPoint]:
+        '''
+        Retrieves time series data for the specified countries and indicators within the given date range.
+        
+        Args:
+            countries (list): A list of country codes.
+            indicators (list): A list of indicator codes.
+            start_date (int): The start year for the time series data.
+            end_date (int): The end year for the time series data.
+            frequency (str): Frequency of data (default is 'Y' for yearly data).
+        
+        Returns:
+            List[WBDataPoint]: The time series data for each country and indicator.
+        '''
+        url = self._data_url(countries, indicators, start_date, end_date, frequency)
+        return [WBClient._parse_data_point(entry) for page in await self._fetch_pages(url) for entry in page]
@@ -0,0 +1,77 @@
+from global_data_interface.async_base_client import AsyncBaseClient
+from global_data_interface.wto_client import (WTOAPIError, WTOClient, WTOEconomicGroup, WTOGeographicalRegion, WTOIndicator, WTOIndicatorCategory,
+                                              WTOProduct, WTOProductClassification, WTOTerritory, WTOTimeseriesDatapoint, WTOUnit)
+
+
+class AsyncWTOClient(AsyncBaseClient):
+    """An asyncio client for interacting with the WTO API, returning the same dataclasses as WTOClient."""
+    
+    BASE_URL = WTOClient.BASE_URL
+    API_DOCS = WTOClient.API_DOCS
+    
+    def __init__(self, headers=None, **kwargs):
+        headers = {"Ocp-Apim-Subscription-Key": '57e24c1ab6c44521b3c3c28d80f83462', **(headers or {})}
+        super().__init__('WTO', headers=headers, **kwargs)
+        
+    def info(self) -> None:
+        WTOClient.info(self)
+    
+    async def _records(self, path: str, params: dict, label: str) -> list:
+        url = self._add_query_parameters(self.BASE_URL + path, params)
+        
+        try:
+            return await self._get(url)
+        except WTOAPIError as e:
+            print(f"Error fetching {label}: {e}")
+            return []
+
+    async def data(self, i, r=None, p=None, ps=None, pc=None, spc=None, fmt=None, mode=None, dec=None, off=None, max=None, head=None, lang=None, meta=None) -> list[WTOTimeseriesDatapoint]:
+        """
+        Fetches timeseries datapoints. Takes the same arguments as WTOClient.data.
+        
+        Returns:
+            list[WTOTimeseriesDatapoint]:
+        """
+        
+        payload = WTOClient._data_payload(i=i, r=r, p=p, ps=ps, pc=pc, spc=spc, fmt=fmt, mode=mode, dec=dec, off=off, max=max, head=head, lang=lang, meta=meta)
+        
+        try:
+            data = await self._post(self.BASE_URL + "/data", payload)
+        except WTOAPIError as e:
+            print(f"Error fetching timeseries datapoints for indicator {i}: {e}")
+            return []
+        
+        return [WTOClient._parse_datapoint(datapoint) for datapoint in data.get('Dataset', [])]
+
+    async def units(self, lang: str = None) -> list[WTOUnit]:
+        return [WTOClient._parse_unit(unit) for unit in await self._records("/units", {"lang": lang}, "units")]
+
+    async def indicator_catagories(self, lang: str = None) -> list[WTOIndicatorCategory]:
+        categories = await self._records("/indicator_categories", {"lang": lang}, "indicator catagories")
+        return [WTOClient._parse_indicator_category(category) for category in categories]
+    
+    async def indicators(self, i=None, name=None, t=None, pc=None, tp=None, frq=None, lang=None) -> list[WTOIndicator]:
+        """Fetches indicators. Takes the same arguments as WTOClient.indicators."""
+        
+        params = {"i": i, "name": name, "t": t, "pc": pc, "tp": tp, "frq": frq, "lang": lang}
+        return [WTOClient._parse_indicator(indicator) for indicator in await self._records("/indicators", params, "indicators")]
+    
+    async def geographical_regions(self, lang: str = None) -> list[WTOGeographicalRegion]:
+        regions = await self._records("/territory/regions", {"lang": lang}, "geographical regions")
+        return [WTOClient._parse_geographical_region(region) for region in regions]
+    
+    async def economic_groups(self, lang=None) -> list[WTOEconomicGroup]:
+        groups = await self._records("/territory/groups", {"lang": lang}, "economic groups")
+        return [WTOClient._parse_economic_group(group) for group in groups]
+    
+    async def economies(self, name=None, ig=None, reg=None, gp=None, lang=None) -> list[WTOTerritory]:
+        params = {"name": name, "ig": ig, "reg": reg, "gp": gp, "lang": lang}
+        return [WTOClient._parse_territory(territory) for territory in await self._records("/reporters", params, "reporting economies")]
+    
+    async def product_classifications(self, lang: str = None) -> list[WTOProductClassification]:
+        classifications = await self._records("/product_classifications", {"lang": lang}, "product classifications")
+        return [WTOClient._parse_product_classification(classification) for classification in classifications]
+    
+    async def products_and_sectors(self, name=None, pc=None, lang=None) -> list[WTOProduct]:
+        params = {"name": name, "pc": pc, "lang": lang}
+        return [WTOClient._parse_product(product) for product in await self._records("/products", params, "products and sectors")]
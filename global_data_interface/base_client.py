@@ -1,7 +1,22 @@
 from abc import ABC, abstractmethod
-from typing import List
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, List
 from urllib.parse import urlencode, urljoin, urlparse, parse_qs
+import json
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+
+from global_data_interface.catalog import Catalog
+from global_data_interface.columnar import TimeseriesColumns
+from global_data_interface.http_cache import HTTPCache
+from global_data_interface.instrumentation import Instrumentation, RequestEvent
+from global_data_interface.rate_limiter import RateLimiter, parse_retry_after
+from global_data_interface.retry_policy import RetryPolicy
+from global_data_interface.single_flight import SingleFlight
+from global_data_interface.timeseries_store import StoreFetch, TimeseriesStore
 
 
 class APIError(Exception):
@@ -9,14 +24,235 @@ class APIError(Exception):
     pass
 
 
+class RateLimitError(APIError):
+    '''Raised when an API keeps throttling a request after it has been retried.'''
+    
+    def __init__(self, message: str, status_code: int = None, retry_after: float = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    '''HTTPAdapter that keeps track of the connection pools it hands out.
+
+    urllib3 counts the requests sent and the connections opened on each pool,
+    which lets the owning client report how often keep-alive connections are reused.
+    '''
+    
+    def __init__(self, *args, **kwargs):
+        self._seen_pools = {}
+        self._seen_pools_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+    
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        pool = super().get_connection_with_tls_context(request, verify, proxies=proxies, cert=cert)
+        with self._seen_pools_lock:
+            self._seen_pools[id(pool)] = pool
+        return pool
+    
+    def connection_stats(self) -> dict:
+        with self._seen_pools_lock:
+            pools = list(self._seen_pools.values())
+        requests_sent = sum(pool.num_requests for pool in pools)
+        connections_opened = sum(pool.num_connections for pool in pools)
+        return {
+            'requests': requests_sent,
+            'connections': connections_opened,
+            'reused': max(requests_sent - connections_opened, 0),
+        }
+
+
 class BaseClient(ABC):
     
     BaseUrl: str = ''
     
-    def __init__(self, api: str, api_key = None, headers = None):
+    # Endpoint path (relative to BASE_URL) mapped to the number of seconds its responses may be served from the HTTP cache.
+    CACHE_TTLS: dict = {}
+    
+    # Arguments of the client's RateLimiter: the sustainable request rate, burst and concurrency of the API.
+    RATE_LIMIT: dict = {}
+    
+    # Responses with which an API asks clients to slow down.
+    THROTTLE_STATUS_CODES = (429, 503)
+    
+    RETRY_POLICY = RetryPolicy()
+    
+    # Number of recent latencies kept per endpoint to time hedged requests.
+    LATENCY_WINDOW = 200
+    
+    # Threads of the hedging executor per pooled connection: room for a primary and a hedge of every request the
+    # connection pool can serve at once.
+    HEDGE_WORKERS_PER_CONNECTION = 2
+    
+    def __init__(self, api: str, api_key = None, headers = None, pool_connections: int = 10, pool_maxsize: int = 10,
+                 pool_block: bool = False, max_retries: int = 0, keep_alive: bool = True, timeout: float = 10,
+                 cache: HTTPCache = None, cache_ttls: dict = None, catalog_ttl: float = 3600,
+                 rate_limit: dict = None, rate_limiter: RateLimiter = None, throttle_retries: int = 3,
+                 retry_policy: RetryPolicy = None, store: TimeseriesStore = None, coalesce: bool = True):
+        '''
+        Args:
+            api (str): Name of the API, used in error messages.
+            api_key (str, optional): API key.
+            headers (dict, optional): Headers sent with every request.
+            pool_connections (int): Number of per-host connection pools to cache.
+            pool_maxsize (int): Maximum number of connections kept alive in each per-host pool.
+            pool_block (bool): Block when the pool is exhausted instead of opening extra, unpooled connections.
+            max_retries (int): Retries performed by the transport adapter on failed connections.
+            keep_alive (bool): Keep connections open between requests.
+            timeout (float): Request timeout in seconds, or a (connect timeout, read timeout) tuple.
+            cache (HTTPCache, optional): On-disk cache for the responses of the endpoints in CACHE_TTLS.
+            cache_ttls (dict, optional): Overrides and additions to CACHE_TTLS.
+            catalog_ttl (float, optional): Seconds before in-memory catalogs used for keyed lookups are reloaded. None keeps them until refresh().
+            rate_limit (dict, optional): Overrides of RATE_LIMIT, e.g. {'rate': 5, 'max_concurrency': 2}.
+            rate_limiter (RateLimiter, optional): A limiter to share with other clients of the same API, instead of rate_limit.
+            throttle_retries (int): Times a throttled request is retried, once the limiter allows it, before raising RateLimitError.
+            retry_policy (RetryPolicy, optional): Retries and hedging of failed and slow requests. Defaults to RETRY_POLICY.
+            store (TimeseriesStore, optional): Local store of the observations fetched with stored_data().
+            coalesce (bool): Share one request, and one result of the catalog and data methods, between identical concurrent calls.
+        '''
         self.api = api
         self.api_key = api_key
         self.headers = headers
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.max_retries = max_retries
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self.cache = cache
+        self.cache_ttls = {**self.CACHE_TTLS, **(cache_ttls or {})}
+        self.catalog_ttl = catalog_ttl
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter(**{**self.RATE_LIMIT, **(rate_limit or {})})
+        self.throttle_retries = throttle_retries
+        self.retry_policy = retry_policy if retry_policy is not None else self.RETRY_POLICY
+        self.retries = 0
+        self.hedged = 0
+        self._latencies = defaultdict(lambda: deque(maxlen=self.LATENCY_WINDOW))
+        self._hedge_executor = None
+        self._hedge_slots = None
+        self.instrumentation = Instrumentation()
+        self.store = store
+        self.single_flight = SingleFlight() if coalesce else None
+        self._request_flight = SingleFlight() if coalesce else None
+        self._catalogs = {}
+        self._session = None
+        self._session_lock = threading.Lock()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    @property
+    def session(self) -> requests.Session:
+        '''The pooled session shared by every request made by this client, created on first use.'''
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+    
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = PooledHTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=self.max_retries,
+            pool_block=self.pool_block,
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if self.headers:
+            session.headers.update(self.headers)
+        if not self.keep_alive:
+            session.headers['Connection'] = 'close'
+        return session
+    
+    def close(self) -> None:
+        '''Closes the client's session and every pooled connection. The client can still be used afterwards; a new session is created on the next request.'''
+        with self._session_lock:
+            session, self._session = self._session, None
+            executor, self._hedge_executor = self._hedge_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        if session is not None:
+            session.close()
+    
+    def rate_limit_stats(self) -> dict:
+        '''
+        Reports the state of the rate limiter.
+
+        Returns:
+            dict: Requests made, throttling responses, requests in flight, the current rate and concurrency limit, and the seconds spent waiting.
+        '''
+        return self.rate_limiter.stats()
+    
+    def add_request_hook(self, on_start: Callable[[RequestEvent], None] = None, on_end: Callable[[RequestEvent], None] = None) -> None:
+        '''
+        Registers functions called with a RequestEvent when each request starts and when it ends.
+
+        The event passed to on_end carries the duration, status, bytes transferred, retries, cache outcome ('hit',
+        'revalidated' or 'miss', None when the endpoint is not cached) and error of the request.
+        '''
+        self.instrumentation.add_hook(on_start, on_end)
+    
+    def remove_request_hook(self, hook: Callable[[RequestEvent], None]) -> None:
+        self.instrumentation.remove_hook(hook)
+    
+    def latency_stats(self) -> dict:
+        '''
+        Reports the latency of the requests sent to each endpoint.
+
+        Returns:
+            dict: Endpoint name mapped to the count, mean, p50, p95, p99 and max latency in seconds.
+        '''
+        return self.instrumentation.latency_stats()
+    
+    def coalesce_stats(self) -> dict:
+        '''
+        Reports the identical concurrent calls which shared one call.
+
+        Returns:
+            dict: For 'requests', by endpoint, and 'methods', by method name, the number of calls and how many were coalesced.
+        '''
+        if self.single_flight is None:
+            return {}
+        return {'requests': self._request_flight.stats(), 'methods': self.single_flight.stats()}
+    
+    def _stored_data(self, source: str, indicators: List[str], economies: List[str], years: List[int],
+                     fetch: Callable[[StoreFetch], Iterable[tuple]], max_age: float = None) -> TimeseriesColumns:
+        '''Answers a query from the client's TimeseriesStore, fetching only missing and stale cells, see TimeseriesStore.data.'''
+        if self.store is None:
+            raise ValueError(f'{self.api} client has no TimeseriesStore, pass store= when creating it')
+        return self.store.data(source, list(indicators), list(economies), sorted({int(year) for year in years}), fetch, max_age)
+    
+    def retry_stats(self) -> dict:
+        '''
+        Reports the retries and hedged requests made by the retry policy.
+
+        Returns:
+            dict: Requests retried and GETs hedged.
+        '''
+        return {'retries': self.retries, 'hedged': self.hedged}
+    
+    def connection_stats(self) -> dict:
+        '''
+        Reports connection reuse for the current session.
+
+        Returns:
+            dict: Requests sent, connections opened and the number of requests which reused an open connection.
+        '''
+        stats = {'requests': 0, 'connections': 0, 'reused': 0}
+        session = self._session
+        if session is None:
+            return stats
+        for adapter in {id(a): a for a in session.adapters.values()}.values():
+            if isinstance(adapter, PooledHTTPAdapter):
+                for key, value in adapter.connection_stats().items():
+                    stats[key] += value
+        return stats
         
     def _construct_url(self, url_base: str, path_segments: List[str], query_parameters: dict):
         url = self._add_path_segments(url_base, path_segments)
@@ -26,14 +262,11 @@ class BaseClient(ABC):
     @staticmethod
     def _add_path_segments(url_base: str, path_segments: List[str]):
         # Normalize the base URL by ensuring it ends with a slash
-        for s in path_segments:
-            print('segment:', s)
         if not url_base.endswith('/'):
             url_base += '/'
 
         # Concatenate all path segments
         url = url_base + '/'.join(path_segments)
-        print('product (add segments):', url)
         return url
     
     @staticmethod
@@ -47,8 +280,6 @@ class BaseClient(ABC):
         Returns:
             str: The updated URL with the new query parameters.
         """
-        print("initial url:", url)
-        
         # Filter out parameters with None values
         filtered_params = {k: v for k, v in query_parameters.items() if v is not None}
         
@@ -73,37 +304,273 @@ class BaseClient(ABC):
         else:
             product_url = base_url
         
-        print('product url (add queries):', product_url)
         return product_url
 
     
-    def _request(self, method: str, url: str, payload=None) -> requests.Response:
+    def _catalog(self, name: str, loader: Callable[[], list], keys: Callable) -> Catalog:
+        '''Returns the in-memory catalog with the given name, creating it on first use.'''
+        catalog = self._catalogs.get(name)
+        if catalog is None:
+            catalog = self._catalogs.setdefault(name, Catalog(loader, keys, self.catalog_ttl))
+        return catalog
+    
+    def refresh(self) -> None:
+        '''Drops every in-memory catalog, the next keyed lookup reloads it from the API.'''
+        for catalog in list(self._catalogs.values()):
+            catalog.refresh()
+    
+    def catalog_stats(self) -> dict:
+        '''
+        Reports the use of the in-memory catalogs.
+
+        Returns:
+            dict: Catalog name mapped to its hits, misses, loads and number of records.
+        '''
+        return {name: catalog.stats() for name, catalog in self._catalogs.items()}
+    
+    def _endpoint(self, url: str):
+        '''Returns the path of a URL relative to BASE_URL, or None if it does not point to the API.'''
+        base_url = getattr(self, 'BASE_URL', '')
+        if not url.startswith(base_url):
+            return None
+        return url[len(base_url):].split('?')[0].strip('/')
+    
+    def _endpoint_name(self, url: str) -> str:
+        '''Returns the name under which the latencies of a URL are recorded: the first segment of its endpoint path.'''
+        endpoint = self._endpoint(url)
+        return endpoint.split('/')[0] if endpoint is not None else url.split('?')[0]
+    
+    def _cache_ttl(self, url: str):
+        '''Returns the cache TTL of the endpoint a URL points to, or None if its responses are not cached.'''
+        endpoint = self._endpoint(url)
+        return self.cache_ttls.get(endpoint) if endpoint is not None else None
+    
+    def _request(self, method: str, url: str, payload=None, stream: bool = False, idempotent: bool = None) -> requests.Response:
+        '''
+        Makes a request, answering it from the HTTP cache where the endpoint is cached.
+        
+        Args:
+            method (str): 'GET' or 'POST'.
+            url (str): The request URL.
+            payload (optional): JSON body of a POST request.
+            stream (bool): Leave the body on the socket to be read incrementally, e.g. with response.iter_content().
+                Streamed responses are never cached.
+            idempotent (bool, optional): Whether the request can safely be retried. Defaults to True for GET and False for POST.
+        
+        Identical concurrent requests, with the same method, URL and payload, share one response unless they are
+        streamed. Only the request actually sent is passed to the request hooks.
+        '''
+        if self._request_flight is None or stream:
+            return self._instrumented_request(method, url, payload, stream, idempotent)
+        key = (method.upper(), url, json.dumps(payload, sort_keys=True, default=str) if payload is not None else None)
+        return self._request_flight.do(key, lambda: self._instrumented_request(method, url, payload, stream, idempotent),
+                                       name=self._endpoint_name(url))[0]
+    
+    def _instrumented_request(self, method: str, url: str, payload=None, stream: bool = False, idempotent: bool = None) -> requests.Response:
+        if not self.instrumentation.hooked:
+            return self._cached_request(method, url, payload, stream, idempotent)
+        
+        event = RequestEvent(api=self.api, method=method.upper(), url=url, endpoint=self._endpoint_name(url), started_at=time.time())
+        self.instrumentation.start(event)
+        started = time.monotonic()
+        try:
+            response = self._cached_request(method, url, payload, stream, idempotent, event)
+        except Exception as e:
+            event.duration = time.monotonic() - started
+            event.error = str(e)
+            self.instrumentation.end(event)
+            raise
+        
+        event.duration = time.monotonic() - started
+        event.status = response.status_code
+        request = getattr(response, 'request', None)
+        body = getattr(request, 'body', None) if request is not None else None
+        event.bytes_sent = len(body) if body else 0
+        if stream:
+            length = response.headers.get('Content-Length')
+            event.bytes_received = int(length) if length and length.isdigit() else None
+        else:
+            event.bytes_received = len(response.content)
+        self.instrumentation.end(event)
+        return response
+    
+    def _cached_request(self, method: str, url: str, payload=None, stream: bool = False, idempotent: bool = None,
+                        event: RequestEvent = None) -> requests.Response:
+        ttl = self._cache_ttl(url) if self.cache is not None and not stream else None
+        if ttl is None:
+            return self._send(method, url, payload, stream=stream, idempotent=idempotent, event=event)
+        
+        key = self.cache.key(method, url, payload)
+        entry = self.cache.get(key, ttl)
+        if entry is not None and entry.fresh:
+            if event is not None:
+                event.cache = 'hit'
+            return entry.to_response()
+        
+        headers = entry.revalidation_headers() if entry is not None else None
+        response = self._send(method, url, payload, headers, idempotent=idempotent, event=event)
+        if response.status_code == 304 and entry is not None:
+            self.cache.refresh(key, ttl)
+            if event is not None:
+                event.cache = 'revalidated'
+            return entry.to_response()
+        
+        if event is not None:
+            event.cache = 'miss'
+        self.cache.set(key, response, ttl)
+        return response
+    
+    def _send(self, method: str, url: str, payload=None, headers: dict = None, stream: bool = False, idempotent: bool = None,
+              event: RequestEvent = None) -> requests.Response:
+        '''
+        Sends a request once the rate limiter allows it, retrying it according to the retry policy.
+        
+        Throttling responses (THROTTLE_STATUS_CODES) slow the limiter down and are retried up to throttle_retries
+        times, after the Retry-After delay, before a RateLimitError is raised. Requests which may not be idempotent are
+        not retried after a throttling response, as the API may have processed them. Other failures are retried with
+        backoff when the retry policy allows it, see RetryPolicy.should_retry.
+        '''
+        if method.upper() not in ('GET', 'POST'):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        idempotent = method.upper() == 'GET' if idempotent is None else idempotent
+        policy = self.retry_policy
+        throttled = retried = 0
+        
+        while True:
+            try:
+                if method.upper() == 'GET' and not stream:
+                    response = self._hedged_attempt(url, headers)
+                else:
+                    response = self._attempt(method, url, payload, headers, stream)
+            except requests.exceptions.RequestException as e:
+                if not policy.should_retry(retried, idempotent, error=e):
+                    raise self._api_error(method, e)
+                time.sleep(policy.delay(retried))
+                retried += 1
+                self.retries += 1
+                if event is not None:
+                    event.retries = retried
+                continue
+            
+            if response.status_code in self.THROTTLE_STATUS_CODES:
+                response.close()
+                throttled += 1
+                if throttled > self.throttle_retries or not idempotent:
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    raise RateLimitError(f"{self.api} API is rate limiting requests: {response.status_code}", response.status_code, retry_after)
+                continue
+            
+            if policy.should_retry(retried, idempotent, status_code=response.status_code):
+                response.close()
+                time.sleep(policy.delay(retried))
+                retried += 1
+                self.retries += 1
+                if event is not None:
+                    event.retries = retried
+                continue
+            break
+        
+        if not response.ok:
+            response.close()
+            raise APIError(f"{self.api} API returned an HTTP error: {response.status_code}")
+        return response
+    
+    def _attempt(self, method: str, url: str, payload=None, headers: dict = None, stream: bool = False) -> requests.Response:
+        '''Sends a request once, holding a slot of the rate limiter for it, and records its latency if it succeeds.'''
+        self.rate_limiter.acquire()
+        started = time.monotonic()
         try:
             if method.upper() == 'GET':
-                response = requests.get(url, headers=self.headers, timeout=10)
-            elif method.upper() == 'POST':
-                response = requests.post(url, json=payload, headers=self.headers, timeout=10)
+                response = self.session.get(url, headers=headers, timeout=self.timeout, stream=stream)
             else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-
-            response.raise_for_status()
-            return response
-
-        except requests.exceptions.Timeout:
-            raise APIError(f"Request to {self.api} API timed out")
-        except requests.exceptions.ConnectionError:
-            raise APIError(f"Failed to connect to {self.api} API")
-        except requests.exceptions.HTTPError as e:
-            raise APIError(f"{self.api} API returned an HTTP error: {e.response.status_code}")
-        except requests.exceptions.RequestException as e:
-            action = "getting" if method.upper() == "GET" else "posting"
-            raise APIError(f"An error occurred while {action} data from {self.api} API: {e}")
-
-    def _get(self, url: str) -> requests.Response:
-        return self._request("GET", url)
-
-    def _post(self, url: str, payload) -> requests.Response:
-        return self._request("POST", url, payload)
+                response = self.session.post(url, json=payload, headers=headers, timeout=self.timeout, stream=stream)
+        except requests.exceptions.RequestException:
+            self.rate_limiter.release(success=False)
+            raise
+        
+        if response.status_code in self.THROTTLE_STATUS_CODES:
+            self.rate_limiter.release(throttled=True, retry_after=parse_retry_after(response.headers.get('Retry-After')))
+        else:
+            self.rate_limiter.release()
+            if response.ok:
+                endpoint, latency = self._endpoint_name(url), time.monotonic() - started
+                self._latencies[endpoint].append(latency)
+                self.instrumentation.record_latency(endpoint, latency)
+        return response
+    
+    def _hedged_attempt(self, url: str, headers: dict = None) -> requests.Response:
+        '''
+        Sends a GET, and sends it again if it is still pending after the hedge delay of the retry policy.
+        
+        The first of the two requests to get a response wins, and the response of the other is closed when it arrives.
+        The requests run on an executor with HEDGE_WORKERS_PER_CONNECTION threads per pooled connection, so hedges do
+        not queue behind the primaries of concurrent requests. When every thread is busy, the request is sent without
+        a hedge rather than waiting for a thread.
+        '''
+        delay = self.retry_policy.hedge_after(self._latencies[self._endpoint_name(url)])
+        if delay is None:
+            return self._attempt('GET', url, headers=headers)
+        
+        executor, slots = self._hedge_executor, self._hedge_slots
+        if executor is None:
+            with self._session_lock:
+                if self._hedge_executor is None:
+                    workers = max(self.pool_maxsize, 1) * self.HEDGE_WORKERS_PER_CONNECTION
+                    self._hedge_slots = threading.BoundedSemaphore(workers)
+                    self._hedge_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'{self.api}-hedge')
+                executor, slots = self._hedge_executor, self._hedge_slots
+        
+        def submit():
+            '''Runs an attempt on a free thread of the executor, or returns None if there is none.'''
+            if not slots.acquire(blocking=False):
+                return None
+            try:
+                future = executor.submit(self._attempt, 'GET', url, None, headers)
+            except RuntimeError:
+                # The client was closed and its executor shut down meanwhile.
+                slots.release()
+                return None
+            future.add_done_callback(lambda _: slots.release())
+            return future
+        
+        primary = submit()
+        if primary is None:
+            return self._attempt('GET', url, headers=headers)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+        
+        hedge = submit()
+        if hedge is None:
+            return primary.result()
+        self.hedged += 1
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winners = [future for future in done if future.exception() is None]
+            if winners:
+                for future in winners[1:]:
+                    future.result().close()
+                for future in pending:
+                    future.add_done_callback(lambda future: future.exception() is None and future.result().close())
+                return winners[0].result()
+            error = error or next(iter(done)).exception()
+        raise error
+    
+    def _api_error(self, method: str, error: requests.exceptions.RequestException) -> APIError:
+        if isinstance(error, requests.exceptions.Timeout):
+            return APIError(f"Request to {self.api} API timed out")
+        if isinstance(error, requests.exceptions.ConnectionError):
+            return APIError(f"Failed to connect to {self.api} API")
+        action = "getting" if method.upper() == "GET" else "posting"
+        return APIError(f"An error occurred while {action} data from {self.api} API: {error}")
+
+    def _get(self, url: str, stream: bool = False) -> requests.Response:
+        return self._request("GET", url, stream=stream)
+
+    def _post(self, url: str, payload, stream: bool = False, idempotent: bool = False) -> requests.Response:
+        return self._request("POST", url, payload, stream=stream, idempotent=idempotent)
     
     @abstractmethod
     def info(self) -> None:
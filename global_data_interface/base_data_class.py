@@ -2,7 +2,7 @@ from abc import ABC, abstractmethod
 from dataclasses import asdict, dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class BaseDataClass(ABC):
     
     def __str__(self):
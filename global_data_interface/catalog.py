@@ -0,0 +1,91 @@
+from typing import Any, Callable, Iterable, Optional
+import threading
+import time
+
+
+class Catalog:
+    '''
+    Memoized, TTL-bounded in-memory catalog of records, such as the indicators or economies of an API.
+
+    The records are loaded on the first lookup and indexed in a dict, so lookups by code are answered from memory
+    until the TTL expires or the catalog is refreshed.
+    '''
+
+    def __init__(self, loader: Callable[[], list], keys: Callable[[Any], Iterable[str]], ttl: Optional[float] = 3600):
+        '''
+        Args:
+            loader (Callable): Returns the full list of records.
+            keys (Callable): Returns the codes a record can be looked up by. None codes are skipped.
+            ttl (float, optional): Seconds before the records are reloaded. None keeps them until refreshed.
+        '''
+        self.loader = loader
+        self.keys = keys
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self._records = None
+        self._index = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _expired(self) -> bool:
+        return self._records is None or (self.ttl is not None and time.monotonic() - self._loaded_at > self.ttl)
+
+    @property
+    def fresh(self) -> bool:
+        '''Whether the records are loaded and within their TTL.'''
+        return not self._expired()
+
+    def _ensure_loaded(self) -> None:
+        if not self._expired():
+            self.hits += 1
+            return
+
+        with self._lock:
+            if not self._expired():
+                self.hits += 1
+                return
+            self.misses += 1
+            records = list(self.loader())
+            index = {}
+            for record in records:
+                for key in self.keys(record):
+                    if key is not None:
+                        index.setdefault(key, record)
+            self._records, self._index, self._loaded_at = records, index, time.monotonic()
+            self.loads += 1
+
+    def load(self) -> int:
+        '''Loads the records unless they are fresh, and returns the number of loads so far, which changes whenever the records are reloaded.'''
+        self._ensure_loaded()
+        return self.loads
+
+    def get(self, code: str, default=None):
+        self._ensure_loaded()
+        return self._index.get(code, default)
+
+    def __getitem__(self, code: str):
+        self._ensure_loaded()
+        return self._index[code]
+
+    def __contains__(self, code: str) -> bool:
+        self._ensure_loaded()
+        return code in self._index
+
+    def all(self) -> list:
+        self._ensure_loaded()
+        return list(self._records)
+
+    def refresh(self) -> None:
+        '''Drops the loaded records, the next lookup reloads them.'''
+        with self._lock:
+            self._records, self._index = None, {}
+
+    def stats(self) -> dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'loads': self.loads,
+            'size': len(self._records) if self._records is not None else 0,
+        }
@@ -0,0 +1,323 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import json
+import mmap
+import os
+import struct
+import tempfile
+import time
+import zlib
+
+from global_data_interface.economy_crosswalk import SCHEMES, CrosswalkEconomy, EconomyCrosswalk, normalize_name
+from global_data_interface.global_data_class import GlobalEconomy, GlobalIndicator
+
+# Magic, version, number of tables, built_at and the comma separated sources of a snapshot.
+_HEADER = struct.Struct('<8sIId64s')
+# Name, number of fields, number of records, number of hash slots and offset of each table.
+_TABLE = struct.Struct('<16sIIIQ')
+_UINT32 = struct.Struct('<I')
+_UINT64 = struct.Struct('<Q')
+# Field value of None. A lone 0xFF byte is not valid UTF-8, so it cannot be the encoding of a string.
+_NULL = b'\xff'
+_NAME_SEPARATOR = '\x1f'
+
+
+def _encode(value: Optional[str]) -> bytes:
+    return _NULL if value is None else value.encode('utf-8')
+
+
+def _table(name: str, fields: int, records: List[Sequence[Optional[str]]]) -> Tuple[tuple, bytes]:
+    '''
+    Encodes a table: an open addressing hash table of record numbers, keyed by the crc32 of the first field of each
+    record, the offsets of the records, and the records, each the offsets of its fields followed by their UTF-8 bytes.
+
+    Returns:
+        tuple: The table's directory entry without its offset, and its contents.
+    '''
+    slots = 1
+    while slots < len(records) * 2:
+        slots *= 2
+    hashes = [0] * slots
+    for number, record in enumerate(records):
+        slot = zlib.crc32(_encode(record[0])) & (slots - 1)
+        while hashes[slot]:
+            slot = (slot + 1) & (slots - 1)
+        hashes[slot] = number + 1
+
+    offsets, data = [], bytearray()
+    for record in records:
+        offsets.append(len(data))
+        values = [_encode(value) for value in record]
+        position = (fields + 1) * _UINT32.size
+        field_offsets = []
+        for value in values:
+            field_offsets.append(position)
+            position += len(value)
+        field_offsets.append(position)
+        data += struct.pack(f'<{fields + 1}I', *field_offsets)
+        data += b''.join(values)
+    offsets.append(len(data))
+
+    contents = struct.pack(f'<{slots}I', *hashes) + struct.pack(f'<{len(offsets)}Q', *offsets) + bytes(data)
+    return (name, fields, len(records), slots), contents
+
+
+class _Table:
+
+    __slots__ = ('fields', 'count', 'slots', 'hashes', 'offsets', 'data')
+
+    def __init__(self, fields: int, count: int, slots: int, offset: int):
+        self.fields = fields
+        self.count = count
+        self.slots = slots
+        self.hashes = offset
+        self.offsets = offset + slots * _UINT32.size
+        self.data = self.offsets + (count + 1) * _UINT64.size
+
+
+class CatalogSnapshot:
+    '''
+    Read-only, memory-mapped snapshot of the indicator and economy catalogs of several sources, in a compact binary file.
+
+    A snapshot is written once with write(), e.g. by GlobalDataInterface.save_catalog_snapshot(), and opened by any
+    number of processes. Opening one only reads its header, and the file is mapped read-only, so every process shares
+    the one copy in the page cache and starts without network requests or parsing. Lookups by code probe a hash table
+    in the mapping and decode only the fields of the record found. The per-client detail of a record is stored as
+    JSON and only parsed when asked for.
+
+    Indicators are looked up by source and code. Economies are the economies of an EconomyCrosswalk, and are looked up
+    by any of their codes or names, like EconomyCrosswalk.key(). The crosswalk itself can be rebuilt from the snapshot
+    with crosswalk(), so workers translate economy codes without requests.
+    '''
+
+    MAGIC = b'GDICATS\0'
+    VERSION = 2
+    # Fields of the records of each table. The first field is the key the table is looked up by.
+    TABLES = {
+        'indicators': ('key', 'id', 'name', 'source', 'detail'),
+        'economies': ('key', 'iso3', 'iso2', 'wb_id', 'imf_code', 'wto_code', 'names', 'sources', 'detail'),
+        'economy_codes': ('code', 'key'),
+    }
+
+    def __init__(self, path: str):
+        '''
+        Args:
+            path (str): A snapshot written with write().
+        '''
+        self.path = path
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        magic, version, tables, built_at, sources = (
+            _HEADER.unpack_from(self._mmap, 0) if len(self._mmap) >= _HEADER.size else (None, None, 0, 0.0, b'')
+        )
+        if magic != self.MAGIC or version != self.VERSION:
+            self.close()
+            raise ValueError(f'Unsupported catalog snapshot version: {version if magic == self.MAGIC else None}')
+        self.built_at = built_at
+        self.sources = [source for source in sources.rstrip(b'\0').decode('ascii').split(',') if source]
+
+        self._tables: Dict[str, _Table] = {}
+        for number in range(tables):
+            name, fields, count, slots, offset = _TABLE.unpack_from(self._mmap, _HEADER.size + number * _TABLE.size)
+            self._tables[name.rstrip(b'\0').decode('ascii')] = _Table(fields, count, slots, offset)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self) -> None:
+        self._view.release()
+        self._mmap.close()
+
+    @classmethod
+    def write(cls, path: str, sources: List[str], indicators: Iterable[Tuple[GlobalIndicator, dict]], crosswalk: EconomyCrosswalk,
+              economy_details: Dict[str, dict] = None) -> None:
+        '''
+        Writes a snapshot. The file is replaced atomically, so processes which have the previous snapshot open keep
+        reading it, and processes opening the path read either snapshot whole.
+
+        Args:
+            path (str): The snapshot file.
+            sources (List[str]): The sources the snapshot holds the catalogs of.
+            indicators (Iterable[tuple]): Each indicator, with the per-client detail of its source, e.g. WBIndicator.to_dict().
+            crosswalk (EconomyCrosswalk): The economies, merged across the sources.
+            economy_details (dict, optional): Economy key mapped to the per-client detail of each source, e.g. {'WB': WBEconomy.to_dict()}.
+        '''
+        economy_details = economy_details or {}
+        indicator_records, economy_records, codes = [], [], {}
+        for indicator, detail in indicators:
+            indicator_records.append((
+                f'{indicator.source}:{indicator.id}', indicator.id, indicator.name, indicator.source, json.dumps(detail, default=list),
+            ))
+        for economy in crosswalk:
+            economy_records.append((
+                economy.key, economy.iso3, economy.iso2, economy.wb_id, economy.imf_code, economy.wto_code,
+                _NAME_SEPARATOR.join(economy.names), ','.join(economy.sources), json.dumps(economy_details.get(economy.key, {}), default=list),
+            ))
+            # Codes are claimed in the order of the crosswalk, so they resolve to the same economy as crosswalk.key().
+            for scheme, code in economy.codes().items():
+                if code:
+                    codes.setdefault(f'{scheme}:{code.upper()}', economy.key)
+            for name in economy.names:
+                if normalize_name(name):
+                    codes.setdefault(f'NAME:{normalize_name(name)}', economy.key)
+
+        tables = [
+            _table('indicators', len(cls.TABLES['indicators']), indicator_records),
+            _table('economies', len(cls.TABLES['economies']), economy_records),
+            _table('economy_codes', len(cls.TABLES['economy_codes']), list(codes.items())),
+        ]
+
+        offset = _HEADER.size + len(tables) * _TABLE.size
+        header = _HEADER.pack(cls.MAGIC, cls.VERSION, len(tables), time.time(), ','.join(sources).encode('ascii'))
+        directory = b''
+        for (name, fields, count, slots), contents in tables:
+            directory += _TABLE.pack(name.encode('ascii'), fields, count, slots, offset)
+            offset += len(contents)
+
+        directory_name = os.path.dirname(os.path.abspath(path))
+        descriptor, temporary = tempfile.mkstemp(dir=directory_name, prefix='.catalog-snapshot-')
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                file.write(header)
+                file.write(directory)
+                for _, contents in tables:
+                    file.write(contents)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def _field(self, table: _Table, number: int, field: int) -> Optional[str]:
+        start = table.data + _UINT64.unpack_from(self._mmap, table.offsets + number * _UINT64.size)[0]
+        begin, end = struct.unpack_from('<2I', self._mmap, start + field * _UINT32.size)
+        value = self._view[start + begin:start + end]
+        return None if value == _NULL else str(value, 'utf-8')
+
+    def _record(self, table: _Table, number: int) -> List[Optional[str]]:
+        start = table.data + _UINT64.unpack_from(self._mmap, table.offsets + number * _UINT64.size)[0]
+        field_offsets = struct.unpack_from(f'<{table.fields + 1}I', self._mmap, start)
+        values = [self._view[start + begin:start + end] for begin, end in zip(field_offsets, field_offsets[1:])]
+        return [None if value == _NULL else str(value, 'utf-8') for value in values]
+
+    def _find(self, name: str, key: str) -> Optional[int]:
+        '''Returns the number of the record of a table with the given key, probing the table's hash slots in the mapping.'''
+        table = self._tables[name]
+        encoded = key.encode('utf-8')
+        mask = table.slots - 1
+        slot = zlib.crc32(encoded) & mask
+        for _ in range(table.slots):
+            number = _UINT32.unpack_from(self._mmap, table.hashes + slot * _UINT32.size)[0]
+            if not number:
+                return None
+            start = table.data + _UINT64.unpack_from(self._mmap, table.offsets + (number - 1) * _UINT64.size)[0]
+            begin, end = struct.unpack_from('<2I', self._mmap, start)
+            if self._view[start + begin:start + end] == encoded:
+                return number - 1
+            slot = (slot + 1) & mask
+        return None
+
+    def _indicator_number(self, code: str, source: str = None) -> Optional[int]:
+        for candidate in ([source] if source is not None else self.sources):
+            number = self._find('indicators', f'{candidate}:{code}')
+            if number is not None:
+                return number
+        return None
+
+    @staticmethod
+    def _indicator(record: List[Optional[str]]) -> GlobalIndicator:
+        return GlobalIndicator(id=record[1], name=record[2], source=record[3])
+
+    @staticmethod
+    def _economy(record: List[Optional[str]]) -> GlobalEconomy:
+        return GlobalEconomy(
+            iso3=record[1],
+            iso2=record[2],
+            name=set(record[6].split(_NAME_SEPARATOR)) if record[6] else set(),
+            sources=set(record[7].split(',')) if record[7] else set(),
+        )
+
+    def indicator(self, code: str, source: str = None) -> Optional[GlobalIndicator]:
+        '''
+        Looks up an indicator by code.
+
+        Args:
+            code (str): The indicator's code in its source.
+            source (str, optional): The indicator's source. By default the sources are tried in order.
+        '''
+        number = self._indicator_number(code, source)
+        return self._indicator(self._record(self._tables['indicators'], number)) if number is not None else None
+
+    def indicator_detail(self, code: str, source: str = None) -> Optional[dict]:
+        '''Looks up the per-client record of an indicator, e.g. WBIndicator.to_dict(), by code.'''
+        number = self._indicator_number(code, source)
+        return json.loads(self._field(self._tables['indicators'], number, 4)) if number is not None else None
+
+    def economy_key(self, code: str, scheme: str = None) -> Optional[str]:
+        '''
+        Returns the crosswalk key of an economy.
+
+        Args:
+            code (str): The code or name of an economy.
+            scheme (str, optional): One of SCHEMES. By default the code is tried as a key, ISO3, ISO2, WB, IMF and WTO code, then as a name.
+        '''
+        if not code:
+            return None
+        schemes = [scheme] if scheme is not None else SCHEMES
+        for candidate in schemes:
+            number = self._find('economy_codes', f"{candidate}:{normalize_name(code) if candidate == 'NAME' else code.upper()}")
+            if number is not None:
+                return self._field(self._tables['economy_codes'], number, 1)
+        return None
+
+    def _economy_number(self, code: str, scheme: str = None) -> Optional[int]:
+        key = self.economy_key(code, scheme)
+        return self._find('economies', key) if key is not None else None
+
+    def economy(self, code: str, scheme: str = None) -> Optional[GlobalEconomy]:
+        '''Looks up an economy by any of its codes or names, see economy_key().'''
+        number = self._economy_number(code, scheme)
+        return self._economy(self._record(self._tables['economies'], number)) if number is not None else None
+
+    def economy_detail(self, code: str, scheme: str = None) -> Optional[dict]:
+        '''Looks up the per-client records of an economy, source mapped to e.g. WBEconomy.to_dict(), by any of its codes or names.'''
+        number = self._economy_number(code, scheme)
+        return json.loads(self._field(self._tables['economies'], number, 8)) if number is not None else None
+
+    def _records(self, name: str) -> Iterator[List[Optional[str]]]:
+        table = self._tables[name]
+        return (self._record(table, number) for number in range(table.count))
+
+    def indicators(self, sources: List[str] = None) -> List[GlobalIndicator]:
+        '''Returns the indicators of the sources, by default of every source, in the order they were written.'''
+        wanted = set(sources) if sources is not None else None
+        return [self._indicator(record) for record in self._records('indicators') if wanted is None or record[3] in wanted]
+
+    def economies(self) -> List[GlobalEconomy]:
+        '''Returns the economies, merged across the snapshot's sources, in the order of the crosswalk they were written from.'''
+        return [self._economy(record) for record in self._records('economies')]
+
+    def crosswalk(self) -> EconomyCrosswalk:
+        '''Returns the EconomyCrosswalk the snapshot's economies were written from, built from the mapping without requests.'''
+        return EconomyCrosswalk(
+            (
+                CrosswalkEconomy(
+                    key=record[0], iso3=record[1], iso2=record[2], wb_id=record[3], imf_code=record[4], wto_code=record[5],
+                    names=record[6].split(_NAME_SEPARATOR) if record[6] else [],
+                    sources=record[7].split(',') if record[7] else [],
+                )
+                for record in self._records('economies')
+            ),
+            built_at=self.built_at,
+        )
+
+    def stats(self) -> dict:
+        return {
+            'sources': list(self.sources),
+            'built_at': self.built_at,
+            'bytes': len(self._mmap),
+            'tables': {name: table.count for name, table in self._tables.items()},
+        }
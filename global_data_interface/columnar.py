@@ -0,0 +1,147 @@
+from array import array
+from typing import Dict, Iterator, List, Optional
+import math
+
+_numpy = None
+
+
+def _np():
+    '''Imports NumPy on first use, so parsing results does not import it. Returns None if NumPy is not installed.'''
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+class DictionaryColumn:
+    '''
+    Dictionary-encoded string column.
+
+    Each distinct value is stored once in values, and every row holds the int32 index of its value in codes.
+    Missing values are encoded as -1, which pandas and Arrow both read as null.
+    '''
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes = array('i')
+        self._lookup: Dict[str, int] = {}
+
+    def append(self, value: Optional[str]) -> None:
+        if value is None:
+            self.codes.append(-1)
+            return
+        code = self._lookup.get(value)
+        if code is None:
+            code = self._lookup[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        code = self.codes[index]
+        return self.values[code] if code >= 0 else None
+
+    def decode(self) -> List[Optional[str]]:
+        values = self.values
+        return [values[code] if code >= 0 else None for code in self.codes]
+
+
+class TimeseriesColumns:
+    '''
+    Columnar container for time series observations.
+
+    Years and values are stored in contiguous int64 and float64 buffers and every other field in a DictionaryColumn,
+    so a result set of any size costs a few bytes per observation instead of one Python object each. Missing years are
+    stored as 0 and missing values as NaN.
+
+    Parsers append observations one at a time. The year and value buffers are exposed as NumPy arrays without copying
+    when NumPy is installed, after which no more observations can be appended.
+    '''
+
+    def __init__(self, code_columns: List[str]):
+        '''
+        Args:
+            code_columns (List[str]): Names of the dictionary-encoded columns, e.g. ['economy', 'indicator'].
+        '''
+        self.year_buffer = array('q')
+        self.value_buffer = array('d')
+        self.columns: Dict[str, DictionaryColumn] = {name: DictionaryColumn() for name in code_columns}
+
+    def append(self, year: Optional[int], value: Optional[float], **codes: Optional[str]) -> None:
+        self.year_buffer.append(year if year is not None else 0)
+        self.value_buffer.append(value if value is not None else math.nan)
+        for name, column in self.columns.items():
+            column.append(codes.get(name))
+
+    def __len__(self) -> int:
+        return len(self.year_buffer)
+
+    @property
+    def years(self):
+        '''The years as an int64 NumPy array sharing this container's memory, or the raw array.array without NumPy.'''
+        np = _np()
+        if np is None:
+            return self.year_buffer
+        return np.frombuffer(self.year_buffer, dtype=np.int64)
+
+    @property
+    def values(self):
+        '''The values as a float64 NumPy array sharing this container's memory, or the raw array.array without NumPy.'''
+        np = _np()
+        if np is None:
+            return self.value_buffer
+        return np.frombuffer(self.value_buffer, dtype=np.float64)
+
+    def rows(self) -> Iterator[dict]:
+        '''Yields each observation as a dict.'''
+        names = list(self.columns)
+        for index in range(len(self)):
+            row = {name: self.columns[name][index] for name in names}
+            row['year'] = self.year_buffer[index]
+            row['value'] = self.value_buffer[index]
+            yield row
+
+    def to_pandas(self):
+        '''
+        Converts the columns to a pandas DataFrame, with the code columns as categoricals.
+
+        The year and value columns are built from views over this container's buffers, the categoricals reuse the codes buffer.
+        '''
+        import numpy as np
+        import pandas as pd
+
+        frame = {
+            name: pd.Categorical.from_codes(np.frombuffer(column.codes, dtype=np.int32), categories=column.values)
+            for name, column in self.columns.items()
+        }
+        frame['year'] = self.years
+        frame['value'] = self.values
+        return pd.DataFrame(frame, copy=False)
+
+    def to_arrow(self):
+        '''
+        Converts the columns to a pyarrow Table, with the code columns as dictionary arrays.
+
+        The year and value arrays wrap this container's buffers without copying.
+        '''
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        np = _np()
+        arrays, names = [], []
+        for name, column in self.columns.items():
+            codes = pa.array(np.frombuffer(column.codes, dtype=np.int32)) if np is not None else pa.array(column.codes, type=pa.int32())
+            indices = pc.if_else(pc.less(codes, 0), pa.scalar(None, pa.int32()), codes)
+            arrays.append(pa.DictionaryArray.from_arrays(indices, pa.array(column.values, type=pa.string())))
+            names.append(name)
+
+        arrays.append(pa.Array.from_buffers(pa.int64(), len(self), [None, pa.py_buffer(self.year_buffer)]))
+        arrays.append(pa.Array.from_buffers(pa.float64(), len(self), [None, pa.py_buffer(self.value_buffer)]))
+        names += ['year', 'value']
+        return pa.Table.from_arrays(arrays, names=names)
@@ -0,0 +1,165 @@
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional
+import json
+import re
+import time
+
+# Code schemes an economy can be looked up by.
+SCHEMES = ('KEY', 'ISO3', 'ISO2', 'WB', 'IMF', 'WTO', 'NAME')
+
+
+def normalize_name(name: str) -> str:
+    return re.sub(r'[^a-z0-9]+', ' ', name.lower()).strip() if name else ''
+
+
+@dataclass(slots=True)
+class CrosswalkEconomy:
+
+    key: str
+    iso3: Optional[str] = None
+    iso2: Optional[str] = None
+    wb_id: Optional[str] = None
+    imf_code: Optional[str] = None
+    wto_code: Optional[str] = None
+    names: List[str] = field(default_factory=list)
+    sources: List[str] = field(default_factory=list)
+
+    def __str__(self):
+        return (str(self.to_dict()))
+
+    def to_dict(self):
+        return asdict(self)
+
+    def codes(self) -> Dict[str, Optional[str]]:
+        return {'KEY': self.key, 'ISO3': self.iso3, 'ISO2': self.iso2, 'WB': self.wb_id, 'IMF': self.imf_code, 'WTO': self.wto_code}
+
+
+class EconomyCrosswalk:
+    '''
+    Index mapping the economy codes of every source to one stable economy key.
+
+    Economies are joined by ISO3 code (WB ids, IMF codes and WTO iso3A codes), then by normalized name. The key is the
+    ISO3 code where one exists and otherwise the source-qualified code, e.g. 'WTO:918', so it is the same on every build.
+    Lookups in every direction are dict lookups. A crosswalk is built once from the economy catalogs and can be saved
+    and loaded as versioned JSON, so code translation needs no catalog requests.
+    '''
+
+    VERSION = 1
+
+    def __init__(self, economies: Iterable[CrosswalkEconomy] = (), built_at: float = None):
+        self.economies: Dict[str, CrosswalkEconomy] = {}
+        self.built_at = built_at if built_at is not None else time.time()
+        self._lookup: Dict[tuple, str] = {}
+        for economy in economies:
+            self._add(economy)
+
+    def __len__(self) -> int:
+        return len(self.economies)
+
+    def __iter__(self):
+        return iter(self.economies.values())
+
+    def _add(self, economy: CrosswalkEconomy) -> None:
+        self.economies[economy.key] = economy
+        self._index(economy)
+
+    def _index(self, economy: CrosswalkEconomy) -> None:
+        for scheme, code in economy.codes().items():
+            if code:
+                self._lookup.setdefault((scheme, code.upper()), economy.key)
+        for name in economy.names:
+            if normalize_name(name):
+                self._lookup.setdefault(('NAME', normalize_name(name)), economy.key)
+
+    @staticmethod
+    def _is_iso3(code: Optional[str]) -> bool:
+        return bool(code) and len(code) == 3 and code.isalpha() and code.isupper()
+
+    def _merge(self, source: str, iso3: Optional[str], name: Optional[str], **codes) -> None:
+        key = None
+        if iso3:
+            key = self._lookup.get(('ISO3', iso3))
+        if key is None and name:
+            key = self._lookup.get(('NAME', normalize_name(name)))
+        if key is None:
+            if iso3:
+                key = iso3
+            else:
+                key = f'{source}:{next(code for code in codes.values() if code)}'
+            self.economies[key] = CrosswalkEconomy(key=key)
+
+        economy = self.economies[key]
+        if iso3 and not economy.iso3:
+            economy.iso3 = iso3
+        for attribute, code in codes.items():
+            if code and not getattr(economy, attribute):
+                setattr(economy, attribute, code)
+        if name and name not in economy.names:
+            economy.names.append(name)
+        if source not in economy.sources:
+            economy.sources.append(source)
+        self._index(economy)
+
+    @classmethod
+    def build(cls, wb_economies: Iterable = (), imf_economies: Iterable = (), wto_economies: Iterable = ()) -> 'EconomyCrosswalk':
+        '''
+        Builds a crosswalk from the economies of each source.
+
+        Args:
+            wb_economies (Iterable[WBEconomy]): WB economies, from WBClient.economies().
+            imf_economies (Iterable[IMFCountry]): IMF countries, from IMFClient.economies().
+            wto_economies (Iterable[WTOTerritory]): WTO reporting economies, from WTOClient.economies().
+        '''
+        crosswalk = cls()
+        for economy in wb_economies:
+            crosswalk._merge('WB', economy.id if cls._is_iso3(economy.id) else None, economy.name, wb_id=economy.id, iso2=economy.iso2code)
+        for territory in wto_economies:
+            crosswalk._merge('WTO', territory.iso3A if cls._is_iso3(territory.iso3A) else None, territory.name, wto_code=territory.code)
+        for country in imf_economies:
+            crosswalk._merge('IMF', country.code if cls._is_iso3(country.code) else None, country.label, imf_code=country.code)
+        return crosswalk
+
+    def key(self, code: str, scheme: str = None) -> Optional[str]:
+        '''
+        Returns the economy key of a code.
+
+        Args:
+            code (str): The code or name of an economy.
+            scheme (str, optional): One of SCHEMES. By default the code is tried as a key, ISO3, ISO2, WB, IMF and WTO code, then as a name.
+        '''
+        if not code:
+            return None
+        if scheme is not None:
+            return self._lookup.get((scheme, normalize_name(code) if scheme == 'NAME' else code.upper()))
+        for scheme in SCHEMES[:-1]:
+            key = self._lookup.get((scheme, code.upper()))
+            if key is not None:
+                return key
+        return self._lookup.get(('NAME', normalize_name(code)))
+
+    def get(self, code: str, scheme: str = None) -> Optional[CrosswalkEconomy]:
+        key = self.key(code, scheme)
+        return self.economies.get(key) if key is not None else None
+
+    def translate(self, code: str, from_scheme: Optional[str], to_scheme: str) -> Optional[str]:
+        '''Translates a code from one scheme to another, e.g. translate('USA', 'ISO3', 'WTO') returns '840'. A from_scheme of None tries every scheme.'''
+        economy = self.get(code, from_scheme)
+        if economy is None:
+            return None
+        return economy.codes().get(to_scheme)
+
+    def save(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({
+                'version': self.VERSION,
+                'built_at': self.built_at,
+                'economies': [economy.to_dict() for economy in self.economies.values()],
+            }, file)
+
+    @classmethod
+    def load(cls, path: str) -> 'EconomyCrosswalk':
+        with open(path, encoding='utf-8') as file:
+            state = json.load(file)
+        if state.get('version') != cls.VERSION:
+            raise ValueError(f"Unsupported economy crosswalk version: {state.get('version')}")
+        return cls((CrosswalkEconomy(**data) for data in state['economies']), built_at=state['built_at'])
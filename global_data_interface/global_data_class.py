@@ -3,7 +3,7 @@ from dataclasses import asdict, dataclass
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class GlobalDataClass(ABC):
     
     def __str__(self):
@@ -12,14 +12,14 @@ class GlobalDataClass(ABC):
     def to_dict(self):
         return asdict(self)
 
-@dataclass
+@dataclass(slots=True)
 class GlobalIndicator(GlobalDataClass):
     
     id: str
     name: str
     source: str
 
-@dataclass
+@dataclass(slots=True)
 class GlobalEconomy(GlobalDataClass):
     
     iso3: Optional[str] = None
@@ -27,19 +27,21 @@ class GlobalEconomy(GlobalDataClass):
     name: Optional[str] = None
     sources: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class GlobalDataPoint(GlobalDataClass):
     
     indicator: str
     time: str
     value: float
+    economy: Optional[str] = None
+    source: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class GlobalEconomyGroup(GlobalDataClass):
     
     id: str
 
-@dataclass
+@dataclass(slots=True)
 class GlobalIndicatorGroup(GlobalDataClass):
     pass
 
@@ -1,67 +1,364 @@
-from global_data_interface import *
-from typing import List
-import uuid
+from global_data_interface.catalog_snapshot import CatalogSnapshot
+from global_data_interface.economy_crosswalk import EconomyCrosswalk
+from global_data_interface.global_data_class import GlobalDataPoint, GlobalEconomy, GlobalIndicator
+from global_data_interface.search_index import IndicatorSearchIndex
+from global_data_interface.single_flight import SingleFlight, coalesced
+from global_data_interface.timeseries_store import TimeseriesStore
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import Callable, Dict, List
+import importlib
+import math
+import threading
+import time
+
+
+class _SubClient:
+    '''Sub-client attribute of the GlobalDataInterface, which imports and constructs the client on first access.'''
+    
+    def __init__(self, source: str):
+        self.source = source
+    
+    def __get__(self, gdi, owner=None):
+        if gdi is None:
+            return self
+        return gdi._client(self.source)
+    
+    def __set__(self, gdi, client) -> None:
+        gdi._clients[self.source] = client
 
 
 class GlobalDataInterface:
     _instance = None
+    _instance_lock = threading.Lock()
+    
+    # Source name mapped to the module and class of its sub-client.
+    CLIENTS = {
+        'WB': ('global_data_interface.wb_client', 'WBClient'),
+        'WTO': ('global_data_interface.wto_client', 'WTOClient'),
+        'IMF': ('global_data_interface.imf_client', 'IMFClient'),
+        'UN': ('global_data_interface.un_client', 'UNClient'),
+    }
+    
+    wb = _SubClient('WB')
+    wto = _SubClient('WTO')
+    imf = _SubClient('IMF')
+    un = _SubClient('UN')
     
     def __new__(cls, *args, **kwargs):
         if not cls._instance:
-            cls._instance = super(GlobalDataInterface, cls).__new__(cls, *args, **kwargs)
+            with cls._instance_lock:
+                if not cls._instance:
+                    cls._instance = super(GlobalDataInterface, cls).__new__(cls, *args, **kwargs)
         return cls._instance
     
     def __init__(self):
-        self.wb = WBClient()
-        self.wto = WTOClient()
-        self.imf = IMFClient()
-        self.un = UNClient()
+        # The interface is a singleton, only its first construction initializes it.
+        if self.__dict__.get('_initialized'):
+            return
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+        self._request_hooks = []
+        self._store = None
+        self.single_flight = SingleFlight()
+        self.search_index = IndicatorSearchIndex()
+        self._search_index_loads = {}
+        self.crosswalk = None
+        self.catalog_snapshot = None
+        self._initialized = True
+    
+    def _client(self, source: str):
+        '''Returns the sub-client of a source, importing its module and constructing it on first use.'''
+        client = self._clients.get(source)
+        if client is None:
+            with self._clients_lock:
+                client = self._clients.get(source)
+                if client is None:
+                    module, name = self.CLIENTS[source]
+                    client = getattr(importlib.import_module(module), name)()
+                    for on_start, on_end in self._request_hooks:
+                        client.add_request_hook(on_start, on_end)
+                    if self._store is not None:
+                        client.store = self._store
+                    self._clients[source] = client
+        return client
         
-    def indicators(self, sources=['WB', 'WTO', 'IMF', 'UN']) -> List[GlobalIndicator]:
+    def _source_clients(self, sources=None) -> dict:
+        '''Returns the sub-clients of the sources, constructing them as needed. By default returns the sub-clients constructed so far.'''
+        if sources is None:
+            return dict(self._clients)
+        return {source: self._client(source) for source in sources if source in self.CLIENTS}
+    
+    def add_request_hook(self, on_start: Callable = None, on_end: Callable = None) -> None:
+        '''Registers request hooks on every sub-client, including those constructed later, see BaseClient.add_request_hook.'''
+        with self._clients_lock:
+            self._request_hooks.append((on_start, on_end))
+            for client in self._clients.values():
+                client.add_request_hook(on_start, on_end)
+    
+    def remove_request_hook(self, hook: Callable) -> None:
+        with self._clients_lock:
+            self._request_hooks = [
+                (None if on_start is hook else on_start, None if on_end is hook else on_end)
+                for on_start, on_end in self._request_hooks
+            ]
+            self._request_hooks = [hooks for hooks in self._request_hooks if hooks != (None, None)]
+            for client in self._clients.values():
+                client.remove_request_hook(hook)
+    
+    def use_store(self, store: TimeseriesStore) -> None:
+        '''Sets the TimeseriesStore of every sub-client, including those constructed later. None stops using a store.'''
+        with self._clients_lock:
+            self._store = store
+            for client in self._clients.values():
+                client.store = store
+    
+    def coalesce_stats(self) -> Dict[str, dict]:
         '''
+        Reports the identical concurrent calls which shared one call, of this interface and of each sub-client constructed so far.
+        
+        Returns:
+            dict: 'GDI' mapped to the coalesced calls of the interface's methods, and each source to its sub-client's coalesce_stats().
+        '''
+        return {'GDI': self.single_flight.stats(), **{source: client.coalesce_stats() for source, client in self._source_clients().items()}}
+    
+    def latency_stats(self) -> Dict[str, dict]:
         '''
+        Reports the request latencies of every sub-client constructed so far.
+        
+        Returns:
+            dict: Source name mapped to its endpoints' count, mean, p50, p95, p99 and max latency in seconds.
+        '''
+        return {source: client.latency_stats() for source, client in self._source_clients().items()}
+    
+    def _fan_out(self, calls: Dict[str, Callable], timeouts: Dict[str, float] = None, deadline: float = None) -> dict:
+        '''
+        Runs one call per source concurrently and collects the results which are ready in time.
+        
+        Args:
+            calls (dict): Source name mapped to a callable taking no arguments.
+            timeouts (dict, optional): Source name mapped to the number of seconds to wait for that source.
+            deadline (float, optional): Number of seconds to wait for any source.
+        
+        Returns:
+            dict: Source name mapped to the result of its call. Sources which failed or did not finish in time are left out.
+        '''
+        timeouts = timeouts or {}
+        executor = ThreadPoolExecutor(max_workers=max(len(calls), 1))
+        started = time.monotonic()
+        futures = {source: executor.submit(call) for source, call in calls.items()}
+        
+        results = {}
+        try:
+            for source, future in futures.items():
+                limits = [limit for limit in (timeouts.get(source), deadline) if limit is not None]
+                remaining = max(min(limits) - (time.monotonic() - started), 0) if limits else None
+                try:
+                    results[source] = future.result(timeout=remaining)
+                except TimeoutError:
+                    print(f'{source} did not respond within the time limit and was left out of the results')
+                except Exception as e:
+                    print(f'Error fetching data from {source}: {e}')
+        finally:
+            # Slow sources are not waited on, their threads finish in the background.
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        return results
+        
+    @coalesced
+    def indicators(self, sources=['WB', 'WTO', 'IMF', 'UN'], timeouts: Dict[str, float] = None, deadline: float = None) -> List[GlobalIndicator]:
+        '''
+        Retrieves the indicators of every source, querying the sources concurrently.
+        
+        Args:
+            sources (list): Sources to query.
+            timeouts (dict, optional): Source name mapped to the number of seconds to wait for that source.
+            deadline (float, optional): Number of seconds to wait for any source. Sources which are not ready are left out.
+        
+        Returns:
+            List[GlobalIndicator]: The indicators of every source which responded, in the order of sources.
+                With a catalog snapshot of every source, see load_catalog_snapshot(), they are read from the snapshot.
+        '''
+        
+        if self._snapshot_covers(sources):
+            order = {source: position for position, source in enumerate(sources)}
+            return sorted(self.catalog_snapshot.indicators(sources), key=lambda indicator: order[indicator.source])
                 
-        source_mapping = {
-            'WB': self.wb,
-            'WTO': self.wto,
-            'IMF': self.imf,
-            'UN': self.un
-        }
+        source_mapping = self._source_clients(sources)
+        calls = {source: source_mapping[source].indicators for source in sources if source in source_mapping}
+        results = self._fan_out(calls, timeouts, deadline)
         
         all_indicators = []
         
-        for source in sources:
-            if source in source_mapping:
-                all_indicators += source_mapping[source].indicators()
+        for source in calls:
+            all_indicators += results.get(source, [])
         
         return [indicator.to_global() for indicator in all_indicators]
     
-    def economies(self, sources=['WB', 'WTO', 'IMF']) -> List[GlobalEconomy]:
-        
-        economies = []
-        
-        if 'WB' in sources:
-            economies += self.wb.economies()
-            
-        if 'WTO' in sources:
-            economies += self.wto.economies()
-            
-        if 'IMF' in sources:
-            economies += self.imf.economies()
-            
-        all_global_economies = [economy.to_global() for economy in economies]
-        
-        merged_global_economies = {}
-        for economy in all_global_economies:
-            if not economy.iso3:
-                merged_global_economies[uuid.uuid4()] = economy
-            elif economy.iso3 not in merged_global_economies.keys():
-                merged_global_economies[economy.iso3] = GlobalEconomy(iso3=economy.iso3, name=set([economy.name]), sources=set([economy.sources]))
-            else:
-                merged_global_economies[economy.iso3].name.add(economy.name)
-                merged_global_economies[economy.iso3].sources.add(economy.sources)
-        
-        return merged_global_economies.values()
+    def _sync_search_index(self, sources) -> None:
+        '''
+        Brings the search index in line with the indicator catalog of each source.
+        
+        A source is re-indexed, incrementally, when its catalog has been reloaded since it was last indexed. Sources
+        indexed from a file loaded with load_search_index() are only re-indexed once their catalog is loaded in this process.
+        '''
+        source_mapping = self._source_clients(sources)
+        for source in sources:
+            client = source_mapping.get(source)
+            if not hasattr(client, 'indicator_catalog'):
+                continue
+            catalog = client.indicator_catalog()
+            indexed = self._search_index_loads.get(source)
+            # The index is in line with a catalog which has not been reloaded or expired since it was indexed.
+            if catalog.fresh and catalog.loads == indexed:
+                continue
+            if indexed == 'file' and not catalog.fresh:
+                continue
+            loads = catalog.load()
+            if loads != indexed:
+                self.search_index.update(source, (indicator.to_search_document() for indicator in catalog.all()))
+                self._search_index_loads[source] = loads
+    
+    def search_indicators(self, query: str, sources=['WB', 'WTO', 'IMF'], topics: List[str] = None, limit: int = 20) -> List[GlobalIndicator]:
+        '''
+        Searches the indicators of every source by id, name, description and topic.
+        
+        The search runs against a local inverted index, built from the in-memory indicator catalogs on first use and
+        updated incrementally when a catalog is reloaded.
+        
+        Args:
+            query (str): Keywords. The last keyword also matches as a prefix.
+            sources (list): Sources to search.
+            topics (List[str], optional): Only return indicators with one of these topics (WB topics, IMF datasets, WTO categories).
+            limit (int): Maximum number of results.
+        
+        Returns:
+            List[GlobalIndicator]: The best matching indicators, best first.
+        '''
+        self._sync_search_index(sources)
+        return [
+            GlobalIndicator(id=document.id, name=document.name, source=document.source)
+            for _, document in self.search_index.search(query, sources=sources, topics=topics, limit=limit)
+        ]
+    
+    def save_search_index(self, path: str) -> None:
+        '''Saves the search index, so other processes can load it with load_search_index() instead of building it.'''
+        self.search_index.save(path)
+    
+    def load_search_index(self, path: str) -> None:
+        '''Loads a search index saved with save_search_index(), without fetching the indicator catalogs.'''
+        self.search_index = IndicatorSearchIndex.load(path)
+        self._search_index_loads = {document.source: 'file' for document in self.search_index.documents.values()}
+    
+    def _build_crosswalk(self, sources, timeouts: Dict[str, float] = None, deadline: float = None) -> EconomyCrosswalk:
+        '''Builds a crosswalk from the economy catalogs of the sources, loading the catalogs concurrently.'''
+        source_mapping = self._source_clients([source for source in ['WB', 'WTO', 'IMF'] if source in sources])
+        calls = {source: client.economy_catalog().all for source, client in source_mapping.items()}
+        results = self._fan_out(calls, timeouts, deadline)
+        crosswalk = EconomyCrosswalk.build(results.get('WB', []), results.get('IMF', []), results.get('WTO', []))
+        
+        # Only a crosswalk of every source, each of which responded, is kept for translating codes.
+        if len(calls) == 3 and all(results.get(source) for source in calls):
+            self.crosswalk = crosswalk
+        return crosswalk
+    
+    def economy_crosswalk(self, rebuild: bool = False) -> EconomyCrosswalk:
+        '''
+        The crosswalk between the economy codes of WB, WTO and IMF.
+        
+        It is built from the economy catalogs on first use, or loaded with load_economy_crosswalk() or from a catalog
+        snapshot of every source with load_catalog_snapshot(), and then reused to translate economy codes in data queries.
+        
+        Args:
+            rebuild (bool): Rebuild the crosswalk from the economy catalogs.
+        '''
+        if self.crosswalk is None or rebuild:
+            return self._build_crosswalk(['WB', 'WTO', 'IMF'])
+        return self.crosswalk
+    
+    def save_economy_crosswalk(self, path: str) -> None:
+        '''Saves the economy crosswalk, so other processes can load it with load_economy_crosswalk() instead of building it.'''
+        self.economy_crosswalk().save(path)
+    
+    def load_economy_crosswalk(self, path: str) -> None:
+        '''Loads an economy crosswalk saved with save_economy_crosswalk(), without fetching the economy catalogs.'''
+        self.crosswalk = EconomyCrosswalk.load(path)
+    
+    def _snapshot_covers(self, sources, exactly: bool = False) -> bool:
+        '''Whether a catalog snapshot is loaded which holds the catalogs of the sources, or of exactly the sources. The UN has no catalogs.'''
+        if self.catalog_snapshot is None:
+            return False
+        wanted, held = {source for source in sources if source in ['WB', 'WTO', 'IMF']}, set(self.catalog_snapshot.sources)
+        return wanted == held if exactly else wanted <= held
+    
+    def save_catalog_snapshot(self, path: str, sources=['WB', 'WTO', 'IMF'], timeouts: Dict[str, float] = None, deadline: float = None) -> CatalogSnapshot:
+        '''
+        Saves the indicator and economy catalogs of the sources, with each client's detail, to a memory-mapped snapshot,
+        so worker processes can open it with load_catalog_snapshot() instead of fetching the catalogs.
+        
+        The catalogs are loaded concurrently. Sources which fail or do not respond in time are left out of the snapshot.
+        
+        Returns:
+            CatalogSnapshot: The snapshot, opened read-only.
+        '''
+        source_mapping = self._source_clients([source for source in ['WB', 'WTO', 'IMF'] if source in sources])
+        calls = {
+            source: lambda client=client: (client.indicator_catalog().all(), client.economy_catalog().all())
+            for source, client in source_mapping.items()
+        }
+        results = self._fan_out(calls, timeouts, deadline)
+        
+        indicators = [(indicator.to_global(), indicator.to_dict()) for source in calls for indicator in results.get(source, ([], []))[0]]
+        economies = {source: results.get(source, ([], []))[1] for source in calls}
+        crosswalk = EconomyCrosswalk.build(economies.get('WB', []), economies.get('IMF', []), economies.get('WTO', []))
+        
+        economy_details = {}
+        codes = {'WB': lambda economy: economy.id, 'IMF': lambda economy: economy.code, 'WTO': lambda territory: territory.code}
+        for source, records in economies.items():
+            for record in records:
+                key = crosswalk.key(codes[source](record), source)
+                if key is not None:
+                    economy_details.setdefault(key, {})[source] = record.to_dict()
+        
+        CatalogSnapshot.write(path, [source for source in calls if source in results], indicators, crosswalk, economy_details)
+        return CatalogSnapshot(path)
+    
+    def load_catalog_snapshot(self, path: str) -> CatalogSnapshot:
+        '''
+        Opens a snapshot saved with save_catalog_snapshot(). While it is loaded, indicators() and economies() of sources
+        the snapshot holds are answered from it, without requests. A snapshot of every source also replaces the economy
+        crosswalk, so data queries translate economy codes without requests.
+        '''
+        self.catalog_snapshot = CatalogSnapshot(path)
+        if self._snapshot_covers(['WB', 'WTO', 'IMF'], exactly=True):
+            self.crosswalk = self.catalog_snapshot.crosswalk()
+        return self.catalog_snapshot
+    
+    @coalesced
+    def economies(self, sources=['WB', 'WTO', 'IMF'], timeouts: Dict[str, float] = None, deadline: float = None) -> List[GlobalEconomy]:
+        '''
+        Retrieves the economies of every source, querying the sources concurrently, and merges them with an economy crosswalk.
+        
+        Economies are merged by ISO3 code, then by name. Economies without an ISO3 code, such as WTO groups and IMF
+        aggregates, are returned once each, in the same order on every call.
+        
+        Args:
+            sources (list): Sources to query.
+            timeouts (dict, optional): Source name mapped to the number of seconds to wait for that source.
+            deadline (float, optional): Number of seconds to wait for any source. Sources which are not ready are left out.
+        
+        Returns:
+            List[GlobalEconomy]: The merged economies, with the set of their names and sources.
+                With a catalog snapshot of exactly these sources, see load_catalog_snapshot(), they are read from the snapshot.
+        '''
+        
+        if self._snapshot_covers(sources, exactly=True):
+            return self.catalog_snapshot.economies()
+        
+        crosswalk = self._build_crosswalk(sources, timeouts, deadline)
+        return [
+            GlobalEconomy(iso3=economy.iso3, iso2=economy.iso2, name=set(economy.names), sources=set(economy.sources))
+            for economy in crosswalk
+        ]
     
     def indicator_groups(self, sources=['WB', 'WTO', 'IMF']):
         pass
@@ -69,9 +366,119 @@ class GlobalDataInterface:
     def economy_groups(self, sources=['WB', 'WTO', 'IMF']):
         pass
     
-    def data(self, indicators:List[GlobalIndicator], years:List[int], economies, indicator_groups, economy_groups):
+    def _wb_indicator_sources(self, indicator_ids: List[str]) -> Dict[str, str]:
+        '''
+        Returns the WB source id of the indicators the loaded catalog snapshot knows. The WB client reads the rest from
+        its indicator catalog when it is loaded, and otherwise looks them up concurrently.
+        '''
+        if self.catalog_snapshot is None or 'WB' not in self.catalog_snapshot.sources or len(indicator_ids) < 2:
+            return {}
+        sources = {}
+        for indicator_id in indicator_ids:
+            detail = self.catalog_snapshot.indicator_detail(indicator_id, 'WB')
+            source = detail.get('source') if detail else None
+            if isinstance(source, dict) and source.get('id') is not None:
+                sources[indicator_id] = str(source['id'])
+        return sources
+    
+    def _wb_data(self, indicator_ids: List[str], years: List[int], economies: List[str]) -> List[GlobalDataPoint]:
+        sources = self._wb_indicator_sources(indicator_ids) or None
+        if self.wb.store is not None and economies:
+            columns = self.wb.stored_data(economies, indicator_ids, years, max_workers=4, source=sources)
+        else:
+            columns = self.wb.data(economies or ['all'], indicator_ids, min(years), max(years), columnar=True, max_workers=4, source=sources)
+        wanted_years = set(years)
+        return [
+            GlobalDataPoint(indicator=row['indicator'], time=str(row['year']), value=row['value'], economy=row['economy'], source='WB')
+            for row in columns.rows()
+            if row['year'] in wanted_years and not math.isnan(row['value'])
+        ]
+    
+    def _imf_data(self, indicator_ids: List[str], years: List[int], economies: List[str]) -> List[GlobalDataPoint]:
+        if self.imf.store is not None and economies:
+            columns = self.imf.stored_data(indicator_ids, economies, years)
+        else:
+            columns = self.imf.data_many(indicator_ids, countries=economies, years=years, columnar=True)
+        return [
+            GlobalDataPoint(indicator=row['indicator'], time=str(row['year']), value=row['value'], economy=row['economy'], source='IMF')
+            for row in columns.rows()
+            if not math.isnan(row['value'])
+        ]
+    
+    def _wto_data(self, indicator_id: str, years: List[int], economies: List[str]) -> List[GlobalDataPoint]:
+        crosswalk = self.economy_crosswalk()
+        if economies:
+            reporters = [code for code in (crosswalk.translate(code, None, 'WTO') for code in economies) if code]
+            if not reporters:
+                return []
+        else:
+            reporters = ['all']
+        
+        if self.wto.store is not None and economies:
+            columns, reporter_column = self.wto.stored_data([indicator_id], reporters, years), 'economy'
+        else:
+            periods = ','.join(str(year) for year in years)
+            columns = self.wto.data(indicator_id, r=','.join(reporters), ps=periods, columnar=True, paginate=True)
+            reporter_column = 'reporter'
+        return [
+            GlobalDataPoint(
+                indicator=row['indicator'],
+                time=str(row['year']),
+                value=row['value'],
+                economy=(crosswalk.translate(row[reporter_column], 'WTO', 'ISO3') or crosswalk.key(row[reporter_column], 'WTO')
+                         or row[reporter_column]),
+                source='WTO',
+            )
+            for row in columns.rows()
+            if not math.isnan(row['value'])
+        ]
+    
+    @coalesced
+    def data(self, indicators: List[GlobalIndicator], years: List[int], economies=None, indicator_groups=None, economy_groups=None,
+             timeouts: Dict[str, float] = None, deadline: float = None) -> List[GlobalDataPoint]:
+        '''
+        Retrieves time series data for indicators from any source, for the given years and economies.
+        
+        The indicators are grouped by source and each group is translated into that source's native queries: a single
+        WB query for every WB indicator, planned into as few requests as the WB API accepts, a single IMF query fetching
+        every IMF indicator concurrently with the years as periods, and one paginated WTO query per indicator with the
+        economies as reporter codes. All queries run concurrently and their results are normalized into GlobalDataPoints.
+        With a TimeseriesStore, see use_store(), queries for given economies only fetch the cells which are not stored
+        or are stale, and are answered from the store.
+        
+        Args:
+            indicators (List[GlobalIndicator]): The indicators to retrieve.
+            years (List[int]): The years to retrieve.
+            economies (list, optional): GlobalEconomy objects or ISO3 codes. Defaults to every economy.
+            indicator_groups: Not yet supported.
+            economy_groups: Not yet supported.
+            timeouts (dict, optional): Query name, e.g. 'IMF' or 'WTO TP_A_0010', mapped to the number of seconds to wait for it.
+            deadline (float, optional): Number of seconds to wait for any query. Queries which are not ready are left out.
+        
+        Returns:
+            List[GlobalDataPoint]: The datapoints of every query which completed, with the ISO3 code of their economy, or
+                its crosswalk key if it has none.
+                Observations without a value are left out.
+        '''
         
         catagorized_indicators = {'WB': [], 'WTO': [], 'IMF': []}
         for indicator in indicators:
             if indicator.source in catagorized_indicators.keys():
-                catagorized_indicators[indicator.source].append(indicator)
\ No newline at end of file
+                catagorized_indicators[indicator.source].append(indicator)
+        
+        years = sorted(int(year) for year in years)
+        economy_codes = [economy.iso3 if isinstance(economy, GlobalEconomy) else economy for economy in economies or []]
+        economy_codes = [code for code in economy_codes if code]
+        
+        calls = {}
+        if catagorized_indicators['WB']:
+            wb_ids = [indicator.id for indicator in catagorized_indicators['WB']]
+            calls['WB'] = lambda: self._wb_data(wb_ids, years, economy_codes)
+        if catagorized_indicators['IMF']:
+            imf_ids = [indicator.id for indicator in catagorized_indicators['IMF']]
+            calls['IMF'] = lambda: self._imf_data(imf_ids, years, economy_codes)
+        for indicator in catagorized_indicators['WTO']:
+            calls[f'WTO {indicator.id}'] = lambda indicator_id=indicator.id: self._wto_data(indicator_id, years, economy_codes)
+        
+        results = self._fan_out(calls, timeouts, deadline)
+        return [datapoint for name in calls for datapoint in results.get(name, [])]
\ No newline at end of file
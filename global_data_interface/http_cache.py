@@ -0,0 +1,176 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+if TYPE_CHECKING:
+    import requests
+
+
+@dataclass
+class CacheEntry:
+
+    url: str
+    status_code: int
+    headers: dict
+    body: bytes
+    stored_at: float
+    expires_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def revalidation_headers(self) -> dict:
+        '''Conditional request headers which let the API answer 304 Not Modified if the entry is still current.'''
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def to_response(self) -> 'requests.Response':
+        # Imported here so a cache can be created without importing requests.
+        import requests
+
+        response = requests.Response()
+        response.status_code = self.status_code
+        response.headers.update(self.headers)
+        response._content = self.body
+        response.url = self.url
+        response.encoding = 'utf-8'
+        return response
+
+
+class HTTPCache:
+    '''
+    Persistent on-disk cache of HTTP responses, stored in a SQLite database.
+
+    Entries are keyed by method, URL and POST payload, compressed with zlib, and evicted least recently used first once
+    the cache grows beyond max_size bytes. Clients decide which endpoints are cached and for how long (see BaseClient.CACHE_TTLS).
+    The TTL is applied when an entry is read, relative to when it was stored or last revalidated, so clients sharing a
+    cache with different TTLs each see existing entries expire according to their own.
+    '''
+
+    def __init__(self, path: str = None, max_size: int = 256 * 1024 * 1024, compression_level: int = 6):
+        '''
+        Args:
+            path (str, optional): Directory holding the cache database. Defaults to ~/.cache/global_data_interface.
+            max_size (int): Maximum total size in bytes of the compressed entries.
+            compression_level (int): zlib compression level of the stored responses.
+        '''
+        self.path = os.path.expanduser(path or os.path.join('~', '.cache', 'global_data_interface'))
+        self.max_size = max_size
+        self.compression_level = compression_level
+        os.makedirs(self.path, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(os.path.join(self.path, 'http_cache.sqlite3'), check_same_thread=False)
+        self._connection.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT
+            )
+        ''')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)')
+        self._connection.commit()
+
+    @staticmethod
+    def key(method: str, url: str, payload=None) -> str:
+        material = json.dumps([method.upper(), url, payload], sort_keys=True, default=str)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, key: str, ttl: float = None) -> Optional[CacheEntry]:
+        '''
+        Returns the entry stored under key, or None.
+
+        Args:
+            key (str): Key of the entry, see HTTPCache.key.
+            ttl (float, optional): Number of seconds the entry is fresh for after it was stored or last revalidated.
+                Defaults to the TTL it was stored with.
+        '''
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT url, status_code, headers, body, stored_at, expires_at, etag, last_modified FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute('UPDATE entries SET accessed_at = ? WHERE key = ?', (time.time(), key))
+            self._connection.commit()
+
+        url, status_code, headers, body, stored_at, expires_at, etag, last_modified = row
+        return CacheEntry(
+            url=url,
+            status_code=status_code,
+            headers=json.loads(headers),
+            body=zlib.decompress(body),
+            stored_at=stored_at,
+            expires_at=stored_at + ttl if ttl is not None else expires_at,
+            etag=etag,
+            last_modified=last_modified,
+        )
+
+    def set(self, key: str, response: 'requests.Response', ttl: float) -> None:
+        '''Stores a response, by default fresh for ttl seconds (see HTTPCache.get).'''
+        body = zlib.compress(response.content, self.compression_level)
+        # The body is stored decoded, so transport headers no longer apply to it.
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in ('content-encoding', 'content-length', 'transfer-encoding')}
+        now = time.time()
+
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, response.url, response.status_code, json.dumps(headers), body, len(body), now, now + ttl, now,
+                 response.headers.get('ETag'), response.headers.get('Last-Modified')),
+            )
+            self._evict()
+            self._connection.commit()
+
+    def refresh(self, key: str, ttl: float) -> None:
+        '''Marks an entry as fresh for another ttl seconds, after the API confirmed it has not changed.'''
+        now = time.time()
+        with self._lock:
+            self._connection.execute('UPDATE entries SET stored_at = ?, expires_at = ?, accessed_at = ? WHERE key = ?', (now, now + ttl, now, key))
+            self._connection.commit()
+
+    def _evict(self) -> None:
+        total = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_size:
+            return
+
+        for key, size in self._connection.execute('SELECT key, size FROM entries ORDER BY accessed_at').fetchall():
+            if total <= self.max_size:
+                break
+            self._connection.execute('DELETE FROM entries WHERE key = ?', (key,))
+            total -= size
+
+    def size(self) -> int:
+        '''Total size in bytes of the compressed entries.'''
+        with self._lock:
+            return self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute('DELETE FROM entries')
+            self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
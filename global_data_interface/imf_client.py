@@ -1,15 +1,22 @@
 from global_data_interface.base_data_class import BaseDataClass
 from global_data_interface.base_client import BaseClient
-from global_data_interface import GlobalEconomy, GlobalIndicator
+from global_data_interface.catalog import Catalog
+from global_data_interface.retry_policy import RetryPolicy
+from global_data_interface.columnar import TimeseriesColumns
+from global_data_interface.global_data_class import GlobalEconomy, GlobalIndicator
+from global_data_interface.search_index import SearchDocument
+from global_data_interface.single_flight import coalesced
+from global_data_interface.timeseries_store import StoreFetch
 from dataclasses import asdict, dataclass
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
 
 
 class IMFAPIError(Exception):
     '''Custom exception for WTO API errors.'''
     pass
 
-@dataclass
+@dataclass(slots=True)
 class IMFTimeseriesDatapoint:
     
     area_code: str
@@ -23,7 +30,7 @@ class IMFTimeseriesDatapoint:
     def to_dict(self):
         return asdict(self)
 
-@dataclass
+@dataclass(slots=True)
 class IMFIndicator:
     
     code: str
@@ -45,8 +52,17 @@ class IMFIndicator:
             name = self.label,
             source = 'IMF'
         )
+    
+    def to_search_document(self):
+        return SearchDocument(
+            id = self.code,
+            source = 'IMF',
+            name = self.label or '',
+            description = self.description or '',
+            topics = [self.dataset] if self.dataset else []
+        )
 
-@dataclass
+@dataclass(slots=True)
 class IMFCountry(BaseDataClass):
     
     code: str
@@ -59,7 +75,7 @@ class IMFCountry(BaseDataClass):
             sources = "IMF"
         )
 
-@dataclass
+@dataclass(slots=True)
 class IMFRegion:
     
     code: str
@@ -71,7 +87,7 @@ class IMFRegion:
     def to_dict(self):
         return asdict(self)
 
-@dataclass
+@dataclass(slots=True)
 class IMFGroup:
     
     code: str
@@ -88,9 +104,15 @@ class IMFClient(BaseClient):
     
     BASE_URL = 'https://www.imf.org/external/datamapper/api/v1'
     API_DOCS = 'https://www.imf.org/external/datamapper/api/help'
+    CACHE_TTLS = {'indicators': 24 * 60 * 60, 'countries': 24 * 60 * 60}
+    DATA_COLUMNS = ['economy', 'indicator']
+    RATE_LIMIT = {'rate': 10, 'burst': 10, 'max_concurrency': 8}
+    # Datamapper latency varies widely, so slow GETs are hedged.
+    RETRY_POLICY = RetryPolicy(hedge=True)
+    METADATA_ENDPOINTS = ('indicators', 'countries', 'regions', 'groups')
 
-    def __init__(self):
-        super().__init__('IMF')
+    def __init__(self, **kwargs):
+        super().__init__('IMF', **kwargs)
         
     def info(self) -> None:
         print(f'''
@@ -100,20 +122,12 @@ class IMFClient(BaseClient):
               API DOCS: {self.API_DOCS}
               ''')
     
-    def data(self, indicator: str, countries: List[str] = None, regions: List[str] = None, groups: List[str] = None, years: List[int] = None) -> List[IMFTimeseriesDatapoint]:
-        '''
-        Fetches timeseries data for a given indicator, filtered by countries, regions, groups, and years.
-
-        Args:
-            indicator (str): The indicator code (e.g., 'PPPGDP').
-            countries (List[str]): List of country codes to filter by.
-            regions (List[str]): List of region codes to filter by.
-            groups (List[str]): List of group codes to filter by.
-            years (List[int]): List of years to filter by.
-
-        Returns:
-            List[IMFTimeseriesDatapoint]: A list of IMFTimeseriesDatapoint objects.
-        '''
+    def _endpoint_name(self, url: str) -> str:
+        '''Data URLs start with the indicator code, so their latencies are recorded together under 'data'.'''
+        name = super()._endpoint_name(url)
+        return name if name in self.METADATA_ENDPOINTS else 'data'
+    
+    def _data_url(self, indicator: str, countries: List[str] = None, regions: List[str] = None, groups: List[str] = None, years: List[int] = None) -> str:
         path_segments = [indicator]
         if countries:
             path_segments += countries
@@ -121,22 +135,16 @@ class IMFClient(BaseClient):
             path_segments += regions
         if groups:
             path_segments += groups
-        print(f"Path segments: {path_segments}")
         url = self._add_path_segments(self.BASE_URL, path_segments)
         
         if years:
-            years = ','.join(years)
+            years = ','.join(str(year) for year in years)
             url = self._add_query_parameters(url, {'periods': years})
         
-        print("URL: ", url)
-
-        try:
-            response = self._get(url)
-            data = response.json()
-        except IMFAPIError as e:
-            print(f'Error fetching IMF timeseries data: {e}')
-            return []
-
+        return url
+    
+    @staticmethod
+    def _parse_data(data: dict, indicator: str) -> List[IMFTimeseriesDatapoint]:
         timeseries_data = []
         indicator_data = data.get('values', {}).get(indicator, {})
         
@@ -151,8 +159,179 @@ class IMFClient(BaseClient):
                 timeseries_data.append(datapoint)
 
         return timeseries_data
+    
+    @classmethod
+    def _parse_data_columns(cls, data: dict, indicator: str, columns: TimeseriesColumns = None) -> TimeseriesColumns:
+        if columns is None:
+            columns = TimeseriesColumns(cls.DATA_COLUMNS)
+        indicator_data = data.get('values', {}).get(indicator, {})
+        
+        for area_code, year_values in indicator_data.items():
+            for year, value in year_values.items():
+                columns.append(int(year), float(value) if value is not None else None, economy=area_code, indicator=indicator)
+        
+        return columns
+    
+    @staticmethod
+    def _parse_indicators(data: dict) -> List[IMFIndicator]:
+        return [
+            IMFIndicator(
+                code=indicator_code,
+                label=indicator_data.get('label'),
+                description=indicator_data.get('description', ''),
+                source=indicator_data.get('source', ''),
+                unit=indicator_data.get('unit', ''),
+                dataset=indicator_data.get('dataset', '')
+            )
+            for indicator_code, indicator_data in data.get('indicators').items()
+        ]
+    
+    @staticmethod
+    def _parse_economies(data: dict) -> List[IMFCountry]:
+        return [
+            IMFCountry(
+                code=country_code,
+                label=country_data.get('label')
+            )
+            for country_code, country_data in data.get('countries').items()
+        ]
+    
+    @staticmethod
+    def _parse_regions(data: dict) -> List[IMFRegion]:
+        return [
+            IMFRegion(
+                code=region_code,
+                label=region_data.get('label')
+            )
+            for region_code, region_data in data.get('regions').items()
+        ]
+    
+    @staticmethod
+    def _parse_groups(data: dict) -> List[IMFGroup]:
+        return [
+            IMFGroup(
+                code=group_code,
+                label=group_data.get('label')
+            )
+            for group_code, group_data in data.get('groups').items()
+        ]
+    
+    @coalesced
+    def data(self, indicator: str, countries: List[str] = None, regions: List[str] = None, groups: List[str] = None, years: List[int] = None, columnar: bool = False) -> List[IMFTimeseriesDatapoint]:
+        '''
+        Fetches timeseries data for a given indicator, filtered by countries, regions, groups, and years.
+
+        Args:
+            indicator (str): The indicator code (e.g., 'PPPGDP').
+            countries (List[str]): List of country codes to filter by.
+            regions (List[str]): List of region codes to filter by.
+            groups (List[str]): List of group codes to filter by.
+            years (List[int]): List of years to filter by.
+            columnar (bool): Return the data as TimeseriesColumns, with the DATA_COLUMNS code columns, instead of IMFTimeseriesDatapoints.
+
+        Returns:
+            List[IMFTimeseriesDatapoint]: A list of IMFTimeseriesDatapoint objects.
+        '''
+        url = self._data_url(indicator, countries, regions, groups, years)
+
+        try:
+            response = self._get(url)
+            data = response.json()
+        except IMFAPIError as e:
+            print(f'Error fetching IMF timeseries data: {e}')
+            return []
+
+        if columnar:
+            return self._parse_data_columns(data, indicator)
+        return self._parse_data(data, indicator)
+    
+    def _fetch_data(self, url: str) -> dict:
+        return self._get(url).json()
+    
+    def _fetch_indicators(self, urls: List[str], indicators: List[str], max_workers: int = None) -> List[dict]:
+        '''
+        Fetches the data URL of each indicator concurrently, by up to max_workers threads (default pool_maxsize).
+        
+        If any indicator could not be fetched, an IMFAPIError naming every failed indicator is raised once all requests
+        have finished, so a partial result is never returned as a complete one.
+        '''
+        workers = max(min(max_workers or self.pool_maxsize, len(urls)), 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._fetch_data, url) for url in urls]
+        
+        errors = [(indicator, future.exception()) for indicator, future in zip(indicators, futures) if future.exception() is not None]
+        if errors:
+            raise IMFAPIError(f"Could not fetch {', '.join(indicator for indicator, _ in errors)}: {errors[0][1]}") from errors[0][1]
+        return [future.result() for future in futures]
+    
+    @coalesced
+    def data_many(self, indicators: List[str], countries: List[str] = None, regions: List[str] = None, groups: List[str] = None,
+                  years: List[int] = None, max_workers: int = None, columnar: bool = False) -> Dict[Tuple[str, str, int], float]:
+        '''
+        Fetches timeseries data for several indicators concurrently and merges it into one result set.
+
+        The datamapper API serves one indicator per request, so the indicators are requested concurrently over the
+        client's pooled session, and through its cache when one is configured.
+
+        Args:
+            indicators (List[str]): The indicator codes (e.g., ['NGDPD', 'PPPGDP']).
+            countries (List[str]): List of country codes to filter by.
+            regions (List[str]): List of region codes to filter by.
+            groups (List[str]): List of group codes to filter by.
+            years (List[int]): List of years to filter by.
+            max_workers (int, optional): Number of indicators to fetch concurrently. Defaults to pool_maxsize.
+            columnar (bool): Return the data as TimeseriesColumns, with the DATA_COLUMNS code columns, instead of a dict.
+
+        Returns:
+            Dict[Tuple[str, str, int], float]: (indicator, area code, year) mapped to the value. An IMFAPIError is
+                raised if any indicator could not be fetched.
+        '''
+        indicators = list(dict.fromkeys(indicators))
+        urls = [self._data_url(indicator, countries, regions, groups, years) for indicator in indicators]
+        
+        responses = self._fetch_indicators(urls, indicators, max_workers)
+        
+        if columnar:
+            columns = TimeseriesColumns(self.DATA_COLUMNS)
+            for indicator, data in zip(indicators, responses):
+                self._parse_data_columns(data, indicator, columns)
+            return columns
         
+        results = {}
+        for indicator, data in zip(indicators, responses):
+            for area_code, year_values in data.get('values', {}).get(indicator, {}).items():
+                for year, value in year_values.items():
+                    results[(indicator, area_code, int(year))] = float(value) if value is not None else None
+        return results
+        
+    
+    @coalesced
+    def stored_data(self, indicators: List[str], countries: List[str], years: List[int], max_workers: int = None,
+                    max_age: float = None) -> TimeseriesColumns:
+        '''
+        Retrieves data through the client's TimeseriesStore, fetching only the cells which are missing or stale.
+
+        Args:
+            indicators (List[str]): The indicator codes (e.g., ['NGDPD', 'PPPGDP']).
+            countries (List[str]): Country, region or group codes.
+            years (List[int]): Years.
+            max_workers (int, optional): Number of indicators to fetch concurrently. Defaults to pool_maxsize.
+            max_age (float, optional): Overrides the store's max_age.
+
+        Returns:
+            TimeseriesColumns: The stored observations with a value, with economy and indicator columns.
+        '''
+        def fetch(planned: StoreFetch):
+            urls = [self._data_url(indicator, planned.economies, years=planned.years) for indicator in planned.indicators]
+            responses = self._fetch_indicators(urls, planned.indicators, max_workers)
+            for indicator, data in zip(planned.indicators, responses):
+                for area_code, year_values in data.get('values', {}).get(indicator, {}).items():
+                    for year, value in year_values.items():
+                        yield (indicator, area_code, int(year), float(value) if value is not None else None)
+        
+        return self._stored_data('IMF', indicators, countries, years, fetch, max_age)
     
+    @coalesced
     def indicators(self):
         '''Retrieves a list of available indicators.
 
@@ -168,18 +347,21 @@ class IMFClient(BaseClient):
             print(f'Error fetching IMF indicators: {e}')
             return []
 
-        return [
-            IMFIndicator(
-                code=indicator_code,
-                label=indicator_data.get('label'),
-                description=indicator_data.get('description', ''),
-                source=indicator_data.get('source', ''),
-                unit=indicator_data.get('unit', ''),
-                dataset=indicator_data.get('dataset', '')
-            )
-            for indicator_code, indicator_data in data.get('indicators').items()
-        ]
+        return self._parse_indicators(data)
     
+    def indicator(self, code: str) -> IMFIndicator:
+        '''Looks up an IMF indicator by code from the in-memory indicator catalog.
+
+        Returns:
+            IMFIndicator: The indicator, or None if there is no indicator with the code.
+        '''
+        return self.indicator_catalog().get(code)
+    
+    def indicator_catalog(self) -> Catalog:
+        '''The in-memory catalog of IMF indicators, keyed by code.'''
+        return self._catalog('indicators', self.indicators, lambda indicator: (indicator.code,))
+    
+    @coalesced
     def economies(self):
         '''Retrieves a list of available countries.
 
@@ -195,14 +377,21 @@ class IMFClient(BaseClient):
             print(f'Error fetching IMF Countries: {e}')
             return []
 
-        return [
-            IMFCountry(
-                code=country_code,
-                label=country_data.get('label')
-            )
-            for country_code, country_data in data.get('countries').items()
-        ]
+        return self._parse_economies(data)
+    
+    def economy(self, code: str) -> IMFCountry:
+        '''Looks up an IMF country by code, e.g. 'USA', from the in-memory country catalog.
+
+        Returns:
+            IMFCountry: The country, or None if there is no country with the code.
+        '''
+        return self.economy_catalog().get(code)
+    
+    def economy_catalog(self) -> Catalog:
+        '''The in-memory catalog of IMF countries, keyed by code.'''
+        return self._catalog('economies', self.economies, lambda country: (country.code,))
     
+    @coalesced
     def regions(self):
         
         url = self.BASE_URL + '/regions'
@@ -214,14 +403,9 @@ class IMFClient(BaseClient):
             print(f'Error fetching IMF Regions: {e}')
             return []
         
-        return [
-            IMFRegion(
-                code=region_code,
-                label=region_data.get('label')
-            )
-            for region_code, region_data in data.get('regions').items()
-        ]
+        return self._parse_regions(data)
     
+    @coalesced
     def groups(self):
         '''Retrieves a list of available analytical groups.
 
@@ -237,10 +421,4 @@ class IMFClient(BaseClient):
             print(f'Error fetching IMF Groups: {e}')
             return []
 
-        return [
-            IMFGroup(
-                code=group_code,
-                label=group_data.get('label')
-            )
-            for group_code, group_data in data.get('groups').items()
-        ]
\ No newline at end of file
+        return self._parse_groups(data)
\ No newline at end of file
@@ -0,0 +1,125 @@
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+import math
+import threading
+
+
+@dataclass(slots=True)
+class RequestEvent:
+    '''A request made by a client, passed to the instrumentation hooks when it starts and again when it ends.'''
+
+    api: str
+    method: str
+    url: str
+    endpoint: str
+    started_at: float
+    duration: Optional[float] = None
+    status: Optional[int] = None
+    bytes_sent: int = 0
+    bytes_received: Optional[int] = None
+    retries: int = 0
+    cache: Optional[str] = None
+    error: Optional[str] = None
+
+    def to_dict(self):
+        return asdict(self)
+
+
+class LatencyHistogram:
+    '''
+    Log-scale histogram of request latencies.
+
+    Latencies are counted in buckets BUCKETS_PER_DOUBLING per doubling wide, from MIN_LATENCY seconds up, so
+    quantiles are accurate to about 9% whatever the number of requests, in constant memory.
+    '''
+
+    MIN_LATENCY = 1e-4
+    BUCKETS_PER_DOUBLING = 8
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self._buckets: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        bucket = max(int(math.log2(max(seconds, self.MIN_LATENCY) / self.MIN_LATENCY) * self.BUCKETS_PER_DOUBLING), 0)
+        with self._lock:
+            self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+            self.count += 1
+            self.total += seconds
+            self.maximum = max(self.maximum, seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        '''Returns the upper bound of the bucket holding the q-quantile, or None before any latency is recorded.'''
+        with self._lock:
+            if not self.count:
+                return None
+            rank = q * self.count
+            seen = 0
+            for bucket in sorted(self._buckets):
+                seen += self._buckets[bucket]
+                if seen >= rank:
+                    return min(self.MIN_LATENCY * 2 ** ((bucket + 1) / self.BUCKETS_PER_DOUBLING), self.maximum)
+            return self.maximum
+
+    def summary(self) -> dict:
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'max': self.maximum if self.count else None,
+        }
+
+
+class Instrumentation:
+    '''
+    Request hooks and per-endpoint latency histograms of a client.
+
+    Start hooks are called with a RequestEvent before a request is sent and end hooks with the same event once it
+    completes, carrying its duration, status, bytes transferred, retries, cache outcome and any error. Events are only
+    built while hooks are registered, so requests cost nothing extra without them.
+    '''
+
+    def __init__(self):
+        self.start_hooks: List[Callable[[RequestEvent], None]] = []
+        self.end_hooks: List[Callable[[RequestEvent], None]] = []
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def hooked(self) -> bool:
+        return bool(self.start_hooks or self.end_hooks)
+
+    def add_hook(self, on_start: Callable[[RequestEvent], None] = None, on_end: Callable[[RequestEvent], None] = None) -> None:
+        if on_start is not None:
+            self.start_hooks.append(on_start)
+        if on_end is not None:
+            self.end_hooks.append(on_end)
+
+    def remove_hook(self, hook: Callable[[RequestEvent], None]) -> None:
+        for hooks in (self.start_hooks, self.end_hooks):
+            if hook in hooks:
+                hooks.remove(hook)
+
+    def start(self, event: RequestEvent) -> None:
+        for hook in self.start_hooks:
+            hook(event)
+
+    def end(self, event: RequestEvent) -> None:
+        for hook in self.end_hooks:
+            hook(event)
+
+    def record_latency(self, endpoint: str, seconds: float) -> None:
+        histogram = self.histograms.get(endpoint)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(endpoint, LatencyHistogram())
+        histogram.record(seconds)
+
+    def latency_stats(self) -> Dict[str, dict]:
+        '''Returns the count, mean, p50, p95, p99 and max latency in seconds of each endpoint.'''
+        return {endpoint: histogram.summary() for endpoint, histogram in list(self.histograms.items())}
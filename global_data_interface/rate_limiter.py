@@ -0,0 +1,126 @@
+from email.utils import parsedate_to_datetime
+from typing import Optional
+import math
+import threading
+import time
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    '''Returns the number of seconds a Retry-After header asks to wait, given as seconds or as an HTTP date.'''
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    '''
+    Token bucket with an adaptive concurrency limit, shared by every request of a client.
+
+    A request waits for a token, refilled at rate per second up to burst, and for a free slot below the concurrency
+    limit. Both adapt with AIMD: each successful response raises the concurrency limit by 1 / limit and the rate by
+    1 / rate, about one slot and one request per second every round of requests, while a throttling response halves both and pauses every
+    request for the Retry-After delay, or throttle_delay seconds without one. The limits never exceed their configured
+    maximums, so the client settles just below the throughput the API sustains.
+    '''
+
+    def __init__(self, rate: float = None, burst: float = None, max_concurrency: int = None, min_rate: float = 0.1,
+                 throttle_delay: float = 1.0):
+        '''
+        Args:
+            rate (float, optional): Maximum requests per second. None does not limit the rate.
+            burst (float, optional): Number of requests which can be made at once after a quiet period. Defaults to rate.
+            max_concurrency (int, optional): Maximum requests in flight. None does not limit concurrency.
+            min_rate (float): The rate is never lowered below this many requests per second.
+            throttle_delay (float): Seconds to pause after a throttling response without a Retry-After header.
+        '''
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst if burst is not None else (max(rate, 1.0) if rate is not None else None)
+        self.min_rate = min_rate if rate is None else min(min_rate, rate)
+        self.max_concurrency = max_concurrency
+        self.limit = float(max_concurrency) if max_concurrency is not None else math.inf
+        self.throttle_delay = throttle_delay
+        self.in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+        self.waited = 0.0
+        self._tokens = self.burst if self.burst is not None else 0.0
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._condition = threading.Condition()
+
+    def _refill(self, now: float) -> None:
+        if self.rate is not None:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _wait_time(self, now: float) -> float:
+        '''Seconds until a request may start, 0 if it may start now, or inf if it has to wait for a request to finish.'''
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self.max_concurrency is not None and self.in_flight >= max(int(self.limit), 1):
+            return math.inf
+        if self.rate is None:
+            return 0.0
+        self._refill(now)
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def acquire(self) -> None:
+        '''Blocks until a request may start, and takes a token and a concurrency slot for it.'''
+        with self._condition:
+            started = time.monotonic()
+            while True:
+                now = time.monotonic()
+                wait = self._wait_time(now)
+                if wait <= 0:
+                    break
+                self._condition.wait(None if wait == math.inf else wait)
+            if self.rate is not None:
+                self._tokens -= 1
+            self.in_flight += 1
+            self.requests += 1
+            self.waited += now - started
+
+    def release(self, success: bool = True, throttled: bool = False, retry_after: float = None) -> None:
+        '''
+        Frees the slot of a finished request and adapts the limits to its outcome.
+
+        Args:
+            success (bool): Whether the request got a response. Failed requests leave the limits as they are.
+            throttled (bool): Whether the API asked to slow down, e.g. with a 429 response.
+            retry_after (float, optional): Seconds the API asked to wait before the next request.
+        '''
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.throttled += 1
+                if self.max_concurrency is not None:
+                    self.limit = max(self.limit / 2, 1.0)
+                if self.rate is not None:
+                    self.rate = max(self.rate / 2, self.min_rate)
+                    self._tokens = min(self._tokens, 0.0)
+                delay = retry_after if retry_after is not None else self.throttle_delay
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            elif success:
+                if self.max_concurrency is not None:
+                    self.limit = min(self.limit + 1 / self.limit, float(self.max_concurrency))
+                if self.rate is not None:
+                    self.rate = min(self.rate + 1 / self.rate, self.max_rate)
+            self._condition.notify_all()
+
+    def stats(self) -> dict:
+        return {
+            'requests': self.requests,
+            'throttled': self.throttled,
+            'in_flight': self.in_flight,
+            'rate': self.rate,
+            'concurrency': int(self.limit) if self.max_concurrency is not None else None,
+            'waited': round(self.waited, 3),
+        }
@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+import random
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+
+def is_connect_error(error: Exception) -> bool:
+    '''Whether a request failed before a connection was made, so it never reached the server.'''
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        return isinstance(getattr(error.args[0], 'reason', None), NewConnectionError)
+    return False
+
+
+def quantile(samples: Sequence[float], q: float) -> Optional[float]:
+    '''Returns the q-quantile of the samples by the nearest-rank method, or None without samples.'''
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(max(int(q * len(ordered) + 0.5) - 1, 0), len(ordered) - 1)]
+
+
+@dataclass(slots=True, frozen=True)
+class RetryPolicy:
+    '''
+    When and how a client retries failed requests, and whether it hedges slow ones.
+
+    Failed requests are retried after an exponential backoff with full jitter: attempt n waits a random time of up to
+    backoff * 2 ** n seconds, capped at max_backoff. Requests which may not be idempotent, POSTs unless marked otherwise,
+    are only retried when they failed before reaching the server.
+
+    With hedge, a GET which has not completed after the hedge_quantile of the endpoint's recent latencies is sent a
+    second time, and the first response wins. Hedging starts once hedge_min_samples latencies have been recorded, or
+    right away after a fixed hedge_delay.
+    '''
+
+    retries: int = 2
+    backoff: float = 0.5
+    max_backoff: float = 10.0
+    jitter: bool = True
+    retry_status_codes: Tuple[int, ...] = (500, 502, 504)
+    hedge: bool = False
+    hedge_quantile: float = 0.95
+    hedge_min_samples: int = 20
+    hedge_delay: Optional[float] = None
+
+    def delay(self, attempt: int) -> float:
+        '''Seconds to wait before retry number attempt, counting from 0.'''
+        delay = min(self.backoff * 2 ** attempt, self.max_backoff)
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def should_retry(self, attempt: int, idempotent: bool, error: Exception = None, status_code: int = None) -> bool:
+        '''
+        Whether a failed attempt should be retried.
+
+        Args:
+            attempt (int): Number of retries made so far.
+            idempotent (bool): Whether the request can safely be sent more than once.
+            error (Exception, optional): The requests exception the attempt raised.
+            status_code (int, optional): The status code of the response the attempt got.
+        '''
+        if attempt >= self.retries:
+            return False
+        if error is not None:
+            return idempotent or is_connect_error(error)
+        return idempotent and status_code in self.retry_status_codes
+
+    def hedge_after(self, latencies: Sequence[float]) -> Optional[float]:
+        '''Seconds after which a GET to an endpoint with these recent latencies is hedged, or None to not hedge it.'''
+        if not self.hedge:
+            return None
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        if len(latencies) < self.hedge_min_samples:
+            return None
+        return quantile(latencies, self.hedge_quantile)
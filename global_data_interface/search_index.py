@@ -0,0 +1,306 @@
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+import gzip
+import heapq
+import json
+import math
+import re
+
+from global_data_interface.columnar import _np
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+# Weight of a term occurrence by the field it occurs in.
+FIELD_WEIGHTS = {'id': 3.0, 'name': 2.0, 'description': 1.0, 'topics': 1.0}
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+@dataclass(slots=True)
+class SearchDocument:
+
+    id: str
+    source: str
+    name: str
+    description: str = ''
+    topics: List[str] = field(default_factory=list)
+
+    @property
+    def key(self) -> str:
+        return f'{self.source}:{self.id}'
+
+    def to_dict(self):
+        return asdict(self)
+
+
+class IndicatorSearchIndex:
+    '''
+    Inverted index over indicator ids, names, descriptions and topics, ranked with BM25.
+
+    Documents are keyed by source and id. update() re-indexes only the documents of a source which were added, changed
+    or removed, so the index can follow catalog refreshes without a rebuild. The index can be saved to and loaded from
+    a gzipped JSON file.
+    '''
+
+    VERSION = 1
+    # Most frequent indexed tokens a prefix keyword is expanded to.
+    MAX_EXPANSIONS = 32
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.documents: Dict[str, SearchDocument] = {}
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._lengths: Dict[str, float] = {}
+        self._fingerprints: Dict[str, int] = {}
+        self._total_length = 0.0
+        self._vocabulary: Optional[List[str]] = None
+        self._impacts: Dict[str, Dict[str, float]] = {}
+        # Documents numbered for vector scoring with NumPy, and each term's document numbers and scores as arrays.
+        self._numbers: Optional[Dict[str, int]] = None
+        self._keys: List[str] = []
+        self._source_codes = None
+        self._source_names: Dict[str, int] = {}
+        self._arrays: Dict[str, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def _invalidate(self) -> None:
+        '''Drops the caches derived from the documents, after they change.'''
+        self._vocabulary = None
+        self._impacts = {}
+        self._numbers = None
+        self._arrays = {}
+
+    @staticmethod
+    def _fingerprint(document: SearchDocument) -> int:
+        return hash((document.name, document.description, tuple(document.topics)))
+
+    def _term_weights(self, document: SearchDocument) -> Dict[str, float]:
+        weights = defaultdict(float)
+        fields = {'id': document.id, 'name': document.name, 'description': document.description, 'topics': ' '.join(document.topics)}
+        for name, text in fields.items():
+            for token in tokenize(text):
+                weights[token] += FIELD_WEIGHTS[name]
+        return weights
+
+    def add(self, document: SearchDocument) -> None:
+        key = document.key
+        if key in self.documents:
+            self.remove(key)
+
+        weights = self._term_weights(document)
+        for token, weight in weights.items():
+            self._postings[token][key] = weight
+        length = sum(weights.values())
+
+        self.documents[key] = document
+        self._lengths[key] = length
+        self._fingerprints[key] = self._fingerprint(document)
+        self._total_length += length
+        self._invalidate()
+
+    def remove(self, key: str) -> None:
+        document = self.documents.pop(key, None)
+        if document is None:
+            return
+        for token in self._term_weights(document):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[token]
+        self._total_length -= self._lengths.pop(key)
+        self._fingerprints.pop(key, None)
+        self._invalidate()
+
+    def update(self, source: str, documents: Iterable[SearchDocument]) -> dict:
+        '''
+        Brings the documents of a source in line with a fresh catalog.
+
+        Returns:
+            dict: The number of documents added, changed, removed and left unchanged.
+        '''
+        stats = {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0}
+        seen = set()
+        for document in documents:
+            key = document.key
+            seen.add(key)
+            if key not in self.documents:
+                stats['added'] += 1
+            elif self._fingerprints[key] != self._fingerprint(document):
+                stats['changed'] += 1
+            else:
+                stats['unchanged'] += 1
+                continue
+            self.add(document)
+
+        for key in [key for key, document in self.documents.items() if document.source == source and key not in seen]:
+            self.remove(key)
+            stats['removed'] += 1
+        return stats
+
+    def _expand(self, token: str) -> List[str]:
+        '''Returns the indexed tokens starting with token: the token itself, if indexed, and the most frequent others, up to MAX_EXPANSIONS.'''
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        vocabulary = self._vocabulary
+        # Tokens are [a-z0-9]+, so every token starting with token sorts before token + '{'.
+        start = bisect_left(vocabulary, token)
+        matches = vocabulary[start:bisect_left(vocabulary, token + '{', start)]
+        if len(matches) > self.MAX_EXPANSIONS:
+            matches = heapq.nlargest(self.MAX_EXPANSIONS, matches, key=lambda term: (term == token, len(self._postings[term])))
+        return matches
+
+    def _impact(self, term: str) -> Dict[str, float]:
+        '''Returns the BM25 score of a term in each document containing it, cached until the index changes.'''
+        impact = self._impacts.get(term)
+        if impact is None:
+            postings = self._postings.get(term)
+            if not postings:
+                return {}
+            document_count = len(self.documents)
+            average_length = self._total_length / document_count
+            idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            k1, b, lengths = self.k1, self.b, self._lengths
+            impact = {
+                key: idf * weight * (k1 + 1) / (weight + k1 * (1 - b + b * lengths[key] / average_length))
+                for key, weight in postings.items()
+            }
+            self._impacts[term] = impact
+        return impact
+
+    def _term_arrays(self, np, term: str) -> tuple:
+        '''Returns the numbers of the documents containing a term and its BM25 score in each, as arrays, cached until the index changes.'''
+        if self._numbers is None:
+            self._keys = list(self.documents)
+            self._numbers = {key: number for number, key in enumerate(self._keys)}
+            codes = {}
+            self._source_codes = np.fromiter(
+                (codes.setdefault(self.documents[key].source, len(codes)) for key in self._keys), dtype=np.int32, count=len(self._keys),
+            )
+            self._source_names = codes
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            impact = self._impact(term)
+            arrays = (
+                np.fromiter((self._numbers[key] for key in impact), dtype=np.int64, count=len(impact)),
+                np.fromiter(impact.values(), dtype=np.float64, count=len(impact)),
+            )
+            self._arrays[term] = arrays
+        return arrays
+
+    @staticmethod
+    def _accepts(document: SearchDocument, sources: Optional[set], topics: Optional[set]) -> bool:
+        if sources is not None and document.source not in sources:
+            return False
+        return topics is None or bool(topics.intersection(topic.lower() for topic in document.topics))
+
+    def _search_arrays(self, np, terms: List[str], sources: Optional[set], topics: Optional[set], limit: int) -> List[Tuple[float, str]]:
+        '''
+        Scores every matching document at once, summing the terms' score arrays with bincount, and selects the best with
+        argpartition, so only the selected documents are sorted and read.
+        '''
+        arrays = [self._term_arrays(np, term) for term in terms]
+        scores = np.bincount(
+            np.concatenate([numbers for numbers, _ in arrays]), weights=np.concatenate([weights for _, weights in arrays]),
+            minlength=len(self._keys),
+        )
+        matching = np.flatnonzero(scores)
+        if sources is not None:
+            codes = [code for source, code in self._source_names.items() if source in sources]
+            matching = matching[np.isin(self._source_codes[matching], codes)]
+        # Without a topic filter only the best limit documents can be returned, so only they are selected and sorted.
+        if topics is None and len(matching) > limit:
+            matching = matching[np.argpartition(-scores[matching], limit - 1)[:limit]]
+        # Sorted by score, then by document order, so ties rank the same on every search.
+        ranked = matching[np.lexsort((matching, -scores[matching]))]
+
+        results = []
+        for number in ranked.tolist():
+            key = self._keys[number]
+            if topics is None or self._accepts(self.documents[key], None, topics):
+                results.append((float(scores[number]), key))
+                if len(results) >= limit:
+                    break
+        return results
+
+    def search(self, query: str, sources: Iterable[str] = None, topics: Iterable[str] = None, limit: int = 20,
+               prefix: bool = True) -> List[Tuple[float, SearchDocument]]:
+        '''
+        Ranks the documents matching a keyword query.
+
+        Args:
+            query (str): Keywords. Documents matching more of them, in higher weighted fields, rank first.
+            sources (Iterable[str], optional): Only return documents from these sources.
+            topics (Iterable[str], optional): Only return documents with one of these topics (case insensitive).
+            limit (int): Maximum number of results.
+            prefix (bool): Match the last keyword as a prefix, e.g. 'infla' matches 'inflation'.
+
+        Returns:
+            List[Tuple[float, SearchDocument]]: Scores and documents, best first.
+        '''
+        tokens = tokenize(query)
+        if not tokens or not self.documents or limit < 1:
+            return []
+
+        terms = []
+        for position, token in enumerate(tokens):
+            terms += self._expand(token) if prefix and position == len(tokens) - 1 else [token]
+        terms = [term for term in terms if term in self._postings]
+        if not terms:
+            return []
+
+        sources = set(sources) if sources else None
+        topics = {topic.lower() for topic in topics} if topics else None
+
+        np = _np()
+        if np is not None:
+            ranked = self._search_arrays(np, terms, sources, topics, limit)
+        else:
+            scores = defaultdict(float)
+            for term in terms:
+                for key, score in self._impact(term).items():
+                    scores[key] += score
+            ranked = heapq.nlargest(
+                limit,
+                ((score, key) for key, score in scores.items() if self._accepts(self.documents[key], sources, topics)),
+                key=lambda item: item[0],
+            )
+        return [(score, self.documents[key]) for score, key in ranked]
+
+    def save(self, path: str) -> None:
+        '''Saves the documents and postings to a gzipped JSON file.'''
+        state = {
+            'version': self.VERSION,
+            'k1': self.k1,
+            'b': self.b,
+            'documents': [document.to_dict() for document in self.documents.values()],
+            'postings': self._postings,
+            'lengths': self._lengths,
+        }
+        with gzip.open(path, 'wt', encoding='utf-8') as file:
+            json.dump(state, file)
+
+    @classmethod
+    def load(cls, path: str) -> 'IndicatorSearchIndex':
+        '''Loads an index saved with save() without re-tokenizing the documents.'''
+        with gzip.open(path, 'rt', encoding='utf-8') as file:
+            state = json.load(file)
+        if state.get('version') != cls.VERSION:
+            raise ValueError(f"Unsupported search index version: {state.get('version')}")
+
+        index = cls(k1=state['k1'], b=state['b'])
+        for data in state['documents']:
+            document = SearchDocument(**data)
+            index.documents[document.key] = document
+            index._fingerprints[document.key] = cls._fingerprint(document)
+        index._postings = defaultdict(dict, state['postings'])
+        index._lengths = state['lengths']
+        index._total_length = sum(index._lengths.values())
+        return index
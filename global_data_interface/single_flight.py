@@ -0,0 +1,114 @@
+from typing import Any, Callable, Dict, Hashable, Tuple
+import functools
+import threading
+
+
+class _Call:
+
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    '''
+    Coalesces identical concurrent calls: while a call with a key is in flight, callers with the same key wait for it
+    and share its result, or its exception, instead of making the call again.
+
+    Only calls which overlap are coalesced, a call made after the previous one returned runs again.
+    '''
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._by_name: Dict[str, list] = {}
+        self._in_flight: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, function: Callable[[], Any], name: str = None) -> Tuple[Any, bool]:
+        '''
+        Runs function, unless a call with the same key is in flight, in which case its result is awaited.
+
+        Args:
+            key (Hashable): Identifies identical calls.
+            function (Callable): Makes the call.
+            name (str, optional): Name the call is counted under in stats(), e.g. the method or endpoint.
+
+        Returns:
+            tuple: The result, and whether it was shared from another caller's call.
+        '''
+        with self._lock:
+            self.calls += 1
+            counts = self._by_name.setdefault(name, [0, 0]) if name is not None else None
+            if counts is not None:
+                counts[0] += 1
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = _Call()
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+                if counts is not None:
+                    counts[1] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = function()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self) -> dict:
+        '''Returns the number of calls, how many of them were coalesced into another call, and both counts by name.'''
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._in_flight),
+                'by_name': {name: {'calls': calls, 'coalesced': coalesced} for name, (calls, coalesced) in self._by_name.items()},
+            }
+
+
+def _freeze(value) -> Hashable:
+    '''Returns a hashable key equal for equal arguments: lists, tuples, sets and dicts are frozen recursively, other unhashable values by repr.'''
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return (type(value).__name__, repr(value))
+
+
+def coalesced(method: Callable) -> Callable:
+    '''
+    Decorates a method of an object with a single_flight attribute, so identical concurrent calls share one call and
+    one result, keyed by the method name and arguments. Coalesced callers receive the same result object.
+    '''
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        flight = getattr(self, 'single_flight', None)
+        if flight is None:
+            return method(self, *args, **kwargs)
+        key = (method.__qualname__, _freeze(args), _freeze(kwargs))
+        return flight.do(key, lambda: method(self, *args, **kwargs), name=method.__name__)[0]
+    return wrapper
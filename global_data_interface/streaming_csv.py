@@ -0,0 +1,44 @@
+from typing import Callable, Dict, Iterable, Iterator
+import codecs
+import csv
+
+
+def _iter_lines(chunks: Iterable[bytes], encoding: str) -> Iterator[str]:
+    '''Decodes byte chunks incrementally and yields the text line by line, each with its line ending.'''
+    decoder = codecs.getincrementaldecoder(encoding)()
+    rest = ''
+    for chunk in chunks:
+        lines = (rest + decoder.decode(chunk)).split('\n')
+        rest = lines.pop()
+        for line in lines:
+            yield line + '\n'
+    rest += decoder.decode(b'', final=True)
+    if rest:
+        yield rest
+
+
+def iter_csv_records(chunks: Iterable[bytes], converters: Dict[str, Callable[[str], object]] = None, encoding: str = 'utf-8-sig') -> Iterator[dict]:
+    '''
+    Yields the rows of a CSV document as dicts keyed by its header row, decoding them as the chunks arrive, so neither
+    the raw body nor the full document is held in memory.
+
+    Args:
+        chunks (Iterable[bytes]): The document, e.g. response.iter_content().
+        converters (dict, optional): Column name mapped to a function converting its values, e.g. {'Year': int}.
+        encoding (str): Encoding of the document. The default skips a UTF-8 byte order mark.
+
+    Empty fields are returned as None, like JSON nulls, and are not converted.
+    '''
+    reader = csv.reader(_iter_lines(chunks, encoding))
+    header = next(reader, None)
+    if header is None:
+        return
+    converters = converters or {}
+    columns = [(name, converters.get(name)) for name in header]
+    for row in reader:
+        if not row:
+            continue
+        yield {
+            name: None if value == '' else (convert(value) if convert is not None else value)
+            for (name, convert), value in zip(columns, row)
+        }
@@ -0,0 +1,100 @@
+from typing import Iterable, Iterator
+import codecs
+import json
+
+_WHITESPACE = ' \t\n\r'
+
+
+class _ChunkBuffer:
+    '''Text buffer filled on demand from an iterable of byte chunks.'''
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self.text = ''
+        self.position = 0
+        self.exhausted = False
+
+    def fill(self) -> bool:
+        '''Appends the next chunk to the buffer, dropping the consumed text. Returns False once the chunks are exhausted.'''
+        if self.exhausted:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self.exhausted = True
+            self.text = self.text[self.position:] + self._decoder.decode(b'', final=True)
+        else:
+            self.text = self.text[self.position:] + self._decoder.decode(chunk)
+        self.position = 0
+        return True
+
+    def skip(self, characters: str) -> str:
+        '''Skips any of the given characters and returns the next character, or an empty string at the end of the input.'''
+        while True:
+            while self.position < len(self.text) and self.text[self.position] in characters:
+                self.position += 1
+            if self.position < len(self.text):
+                return self.text[self.position]
+            if not self.fill():
+                return ''
+
+
+def iter_array_items(chunks: Iterable[bytes], key: str) -> Iterator:
+    '''
+    Incrementally decodes the items of the array stored under key in a JSON object streamed as byte chunks.
+
+    Only the current item and the unconsumed part of the latest chunk are held in memory, so memory use does not grow
+    with the size of the array. Yields nothing if the key is not present. Raises a ValueError if the input ends before
+    the array does, so a truncated response is not mistaken for a short one.
+
+    Args:
+        chunks (Iterable[bytes]): The JSON document, e.g. response.iter_content().
+        key (str): Name of the array, e.g. 'Dataset'.
+    '''
+    decoder = json.JSONDecoder()
+    buffer = _ChunkBuffer(chunks)
+    marker = json.dumps(key)
+
+    # Find the key, keeping enough of the buffer to match a marker split across chunks. A string equal to the key is
+    # only the key if it is followed by a colon.
+    while True:
+        index = buffer.text.find(marker, buffer.position)
+        if index < 0:
+            buffer.position = max(len(buffer.text) - len(marker), buffer.position)
+            if not buffer.fill():
+                return
+            continue
+        buffer.position = index + len(marker)
+        if buffer.skip(_WHITESPACE) == ':':
+            break
+
+    character = buffer.skip(_WHITESPACE + ':')
+    if character == '':
+        raise ValueError(f'JSON input ended before the value of {marker}')
+    if character != '[':
+        return
+    buffer.position += 1
+
+    while True:
+        character = buffer.skip(_WHITESPACE + ',')
+        if character == ']':
+            return
+        if character == '':
+            raise ValueError(f'JSON input ended before the end of the {marker} array')
+
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer.text, buffer.position)
+            except json.JSONDecodeError:
+                # The item is incomplete, read another chunk unless the input has ended.
+                if not buffer.fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk.
+            if end == len(buffer.text) and not buffer.exhausted:
+                buffer.fill()
+                continue
+            break
+
+        buffer.position = end
+        yield item
@@ -0,0 +1,224 @@
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from typing import Callable, Iterable, List, Optional, Set, Tuple
+import os
+import sqlite3
+import threading
+import time
+
+from global_data_interface.columnar import TimeseriesColumns
+
+# An observation cell: (indicator, economy, year).
+Cell = Tuple[str, str, int]
+
+
+@dataclass(slots=True)
+class StoreFetch:
+    '''A query fetching missing cells: every combination of its indicators, economies and years from start_year to end_year.'''
+
+    indicators: List[str]
+    economies: List[str]
+    start_year: int
+    end_year: int
+
+    def __str__(self):
+        return (str(self.to_dict()))
+
+    def to_dict(self):
+        return asdict(self)
+
+    @property
+    def years(self) -> List[int]:
+        return list(range(self.start_year, self.end_year + 1))
+
+    def cells(self) -> Iterable[Cell]:
+        return ((indicator, economy, year) for indicator in self.indicators for economy in self.economies for year in self.years)
+
+
+class TimeseriesStore:
+    '''
+    Local store of annual time series observations, in a SQLite database, keyed by source, indicator, economy and year.
+
+    Every cell a client fetches is upserted with the time it was fetched, including cells the API has no value for, so
+    they are not fetched again either. A query looks up which of its cells are missing or older than max_age, fetches
+    only those, in as few queries as their indicators, economies and year ranges allow, and answers the rest locally.
+    '''
+
+    def __init__(self, path: str = None, max_age: Optional[float] = 7 * 24 * 60 * 60):
+        '''
+        Args:
+            path (str, optional): Directory holding the store database. Defaults to ~/.cache/global_data_interface.
+            max_age (float, optional): Seconds after which stored cells are stale and fetched again. None keeps them forever.
+        '''
+        self.path = os.path.expanduser(path or os.path.join('~', '.cache', 'global_data_interface'))
+        self.max_age = max_age
+        self.fetched_cells = 0
+        self.stored_cells = 0
+        os.makedirs(self.path, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(os.path.join(self.path, 'timeseries.sqlite3'), check_same_thread=False)
+        self._connection.execute('''
+            CREATE TABLE IF NOT EXISTS observations (
+                source TEXT NOT NULL,
+                indicator TEXT NOT NULL,
+                economy TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                value REAL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (source, indicator, economy, year)
+            ) WITHOUT ROWID
+        ''')
+        self._connection.commit()
+
+    def upsert(self, source: str, observations: Iterable[Tuple[str, str, int, Optional[float]]], fetched_at: float = None) -> int:
+        '''
+        Inserts or replaces observations.
+
+        Args:
+            source (str): Source of the observations, e.g. 'WB'.
+            observations (Iterable[tuple]): (indicator, economy, year, value) tuples. A value of None records a cell the
+                source has no value for.
+            fetched_at (float, optional): When the observations were fetched. Defaults to now.
+
+        Returns:
+            int: Number of observations upserted.
+        '''
+        fetched_at = fetched_at if fetched_at is not None else time.time()
+        rows = [(source, indicator, economy, int(year), value, fetched_at) for indicator, economy, year, value in observations]
+        with self._lock:
+            self._connection.executemany('INSERT OR REPLACE INTO observations VALUES (?, ?, ?, ?, ?, ?)', rows)
+            self._connection.commit()
+        return len(rows)
+
+    def _select(self, columns: str, source: str, indicators: List[str], economies: List[str], years: List[int], where: str = '',
+                parameters: tuple = ()) -> List[tuple]:
+        # Cells are filtered by indicator in SQL and by economy and year in Python, which keeps queries within SQLite's
+        # parameter limit whatever the number of economies.
+        wanted_economies, wanted_years = set(economies), set(years)
+        query = (
+            f'SELECT {columns}, economy, year FROM observations WHERE source = ? AND indicator = ? AND year BETWEEN ? AND ?{where}'
+        )
+        rows = []
+        with self._lock:
+            for indicator in dict.fromkeys(indicators):
+                for row in self._connection.execute(query, (source, indicator, min(years), max(years), *parameters)):
+                    if row[-2] in wanted_economies and row[-1] in wanted_years:
+                        rows.append((indicator, *row))
+        return rows
+
+    def missing(self, source: str, indicators: List[str], economies: List[str], years: List[int], max_age: float = None) -> Set[Cell]:
+        '''
+        Returns the cells of a query which are not stored, or are stale.
+
+        Args:
+            max_age (float, optional): Overrides the store's max_age.
+        '''
+        if not (indicators and economies and years):
+            return set()
+        max_age = max_age if max_age is not None else self.max_age
+        cutoff = time.time() - max_age if max_age is not None else float('-inf')
+        fresh = {
+            (indicator, economy, year)
+            for indicator, _, economy, year in self._select('fetched_at', source, indicators, economies, years, ' AND fetched_at >= ?', (cutoff,))
+        }
+        return {
+            (indicator, economy, year)
+            for indicator in dict.fromkeys(indicators) for economy in dict.fromkeys(economies) for year in dict.fromkeys(years)
+            if (indicator, economy, year) not in fresh
+        }
+
+    def query(self, source: str, indicators: List[str], economies: List[str], years: List[int]) -> TimeseriesColumns:
+        '''Returns the stored observations of a query which have a value, as TimeseriesColumns with economy and indicator columns.'''
+        columns = TimeseriesColumns(['economy', 'indicator'])
+        if not (indicators and economies and years):
+            return columns
+        for indicator, value, economy, year in self._select('value', source, indicators, economies, years, ' AND value IS NOT NULL'):
+            columns.append(year, value, economy=economy, indicator=indicator)
+        return columns
+
+    @staticmethod
+    def _year_ranges(years: List[int]) -> List[Tuple[int, int]]:
+        ranges = []
+        for year in sorted(years):
+            if ranges and year == ranges[-1][1] + 1:
+                ranges[-1] = (ranges[-1][0], year)
+            else:
+                ranges.append((year, year))
+        return ranges
+
+    @classmethod
+    def plan(cls, cells: Iterable[Cell]) -> List[StoreFetch]:
+        '''
+        Groups missing cells into queries which fetch exactly those cells.
+
+        The missing years of each indicator and economy are split into consecutive ranges, and the indicators missing
+        the same range for the same set of economies are fetched together.
+        '''
+        years = defaultdict(set)
+        for indicator, economy, year in cells:
+            years[(indicator, economy)].add(year)
+
+        ranges = defaultdict(lambda: defaultdict(set))
+        for (indicator, economy), cell_years in years.items():
+            for year_range in cls._year_ranges(cell_years):
+                ranges[year_range][indicator].add(economy)
+
+        fetches = []
+        for (start_year, end_year), economies_by_indicator in sorted(ranges.items()):
+            indicators_by_economies = defaultdict(list)
+            for indicator, economies in economies_by_indicator.items():
+                indicators_by_economies[frozenset(economies)].append(indicator)
+            for economies, indicators in indicators_by_economies.items():
+                fetches.append(StoreFetch(sorted(indicators), sorted(economies), start_year, end_year))
+        return fetches
+
+    def data(self, source: str, indicators: List[str], economies: List[str], years: List[int],
+             fetch: Callable[[StoreFetch], Iterable[Tuple[str, str, int, Optional[float]]]], max_age: float = None) -> TimeseriesColumns:
+        '''
+        Answers a query from the store, fetching its missing and stale cells first.
+
+        Args:
+            source (str): Source of the observations, e.g. 'WB'.
+            indicators (List[str]): Indicator codes.
+            economies (List[str]): Economy codes, as the source returns them.
+            years (List[int]): Years.
+            fetch (Callable): Fetches the cells of a StoreFetch from the source and returns their (indicator, economy,
+                year, value) observations. Cells it returns no observation for are stored without a value. A fetch
+                which raises stores nothing, and its cells are fetched again by the next query.
+            max_age (float, optional): Overrides the store's max_age.
+        '''
+        for planned in self.plan(self.missing(source, indicators, economies, years, max_age)):
+            fetched_at = time.time()
+            observations = {}
+            try:
+                for indicator, economy, year, value in fetch(planned):
+                    if year is not None:
+                        observations[(indicator, economy, int(year))] = value
+            except Exception as e:
+                print(f'Error fetching {source} data for {planned}: {e}')
+                continue
+            # Cells of the fetch without an observation are stored as empty, so they are not fetched again until stale.
+            empty = [(indicator, economy, year, None) for indicator, economy, year in planned.cells() if (indicator, economy, year) not in observations]
+            stored = self.upsert(source, [(*cell, value) for cell, value in observations.items()] + empty, fetched_at)
+            self.fetched_cells += len(observations)
+            self.stored_cells += stored
+        return self.query(source, indicators, economies, years)
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._connection.execute('SELECT source, COUNT(*), COUNT(value) FROM observations GROUP BY source').fetchall()
+        return {
+            'fetched_cells': self.fetched_cells,
+            'stored_cells': self.stored_cells,
+            'sources': {source: {'cells': cells, 'values': values} for source, cells, values in rows},
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute('DELETE FROM observations')
+            self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
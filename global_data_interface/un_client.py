@@ -7,8 +7,8 @@ class UNClient(BaseClient):
     BASE_URL = 'https://www.imf.org/external/datamapper/api/v1'
     API_DOCS = 'https://www.imf.org/external/datamapper/api/help'
 
-    def __init__(self):
-        super().__init__('IMF')
+    def __init__(self, **kwargs):
+        super().__init__('UN', **kwargs)
         
     def info(self) -> None:
         print(f'''
@@ -1,8 +1,14 @@
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List
 from global_data_interface.base_data_class import BaseDataClass
 from global_data_interface.base_client import BaseClient
+from global_data_interface.catalog import Catalog
+from global_data_interface.columnar import TimeseriesColumns
 from dataclasses import asdict, dataclass
 from global_data_interface.global_data_class import GlobalEconomy, GlobalIndicator
+from global_data_interface.search_index import SearchDocument
+from global_data_interface.single_flight import coalesced
+from global_data_interface.timeseries_store import StoreFetch
 
 
 class WBAPIError(Exception):
@@ -10,7 +16,7 @@ class WBAPIError(Exception):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class WBIndicator(BaseDataClass):
     
     id: str
@@ -27,9 +33,18 @@ class WBIndicator(BaseDataClass):
             name = self.name,
             source = 'WB'
         )
+    
+    def to_search_document(self):
+        return SearchDocument(
+            id = self.id,
+            source = 'WB',
+            name = self.name or '',
+            description = self.sourceNote or '',
+            topics = [topic.get('value', '').strip() for topic in self.topics or [] if topic.get('value')]
+        )
  
     
-@dataclass
+@dataclass(slots=True)
 class WBDataPoint(BaseDataClass):
     
     country: str
@@ -43,7 +58,7 @@ class WBDataPoint(BaseDataClass):
     decimal: int
 
 
-@dataclass
+@dataclass(slots=True)
 class WBRegion(BaseDataClass):
     
     id: str
@@ -52,7 +67,7 @@ class WBRegion(BaseDataClass):
     name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class WBIncomeLevel(BaseDataClass):
     
     id: str
@@ -60,7 +75,7 @@ class WBIncomeLevel(BaseDataClass):
     value: str
 
 
-@dataclass
+@dataclass(slots=True)
 class WBEconomy(BaseDataClass):
     
     id: str
@@ -83,7 +98,7 @@ class WBEconomy(BaseDataClass):
         )
     
 
-@dataclass
+@dataclass(slots=True)
 class WBTopic(BaseDataClass):
     
     id: int
@@ -91,7 +106,7 @@ class WBTopic(BaseDataClass):
     sourceNote: str
 
 
-@dataclass
+@dataclass(slots=True)
 class WBSource(BaseDataClass):
     
     id: int
@@ -109,9 +124,17 @@ class WBClient(BaseClient):
     
     BASE_URL = 'https://api.worldbank.org/v2'
     API_DOCS = 'https://datahelpdesk.worldbank.org/knowledgebase/topics/125589-developer-information'
+    CACHE_TTLS = {'indicator': 24 * 60 * 60, 'country': 24 * 60 * 60}
+    DATA_COLUMNS = ['economy', 'indicator', 'date', 'obs_status']
+    RATE_LIMIT = {'rate': 20, 'burst': 20, 'max_concurrency': 10}
+    # Limits of a single data request. Requests for several indicators must name the source the indicators belong to.
+    MAX_URL_LENGTH = 4000
+    MAX_INDICATORS_PER_REQUEST = 60
     
-    def __init__(self):
-        super().__init__('WB')
+    def __init__(self, **kwargs):
+        super().__init__('WB', **kwargs)
+        # Indicator code mapped to the id of its source, remembered from metadata requests (see _indicator_sources).
+        self._source_ids = {}
         
     def info(self) -> None:
         print(f'''
@@ -121,45 +144,348 @@ class WBClient(BaseClient):
               API DOCS: {self.API_DOCS}
               ''')
     
-    def indicators(self) -> List[WBIndicator]:
-        '''Retrieves a list of available WB indicators.'''
+    @staticmethod
+    def _parse_indicator(item: dict) -> WBIndicator:
+        return WBIndicator(
+            id=item.get('id'),
+            name=item.get('name'),
+            unit=item.get('unit'),
+            source=item.get('source'),
+            sourceNote=item.get('sourceNote'),
+            sourceOrganization=item.get('sourceOrganization'),
+            topics=item.get('topics'),
+        )
+    
+    @staticmethod
+    def _parse_region(region: dict) -> WBRegion:
+        return WBRegion(
+            id = region.get('id'),
+            code = region.get('code'),
+            iso2code = region.get('iso2code'),
+            name = region.get('name'),
+        )
+    
+    @staticmethod
+    def _parse_economy(economy: dict) -> WBEconomy:
+        return WBEconomy(
+            id = economy.get('id'),
+            iso2code = economy.get('iso2Code'),
+            name = economy.get('name'),
+            region = economy.get('region'),
+            adminRegion = economy.get('adminRegion'),
+            incomeLevel = economy.get('incomeLevel'),
+            lendingType = economy.get('lendingType'),
+            capitalCity = economy.get('capitalCity'),
+            longitude = economy.get('longitude'),
+            latitude = economy.get('latitude'),
+        )
+    
+    @staticmethod
+    def _parse_topic(topic: dict) -> WBTopic:
+        return WBTopic(
+            id = topic.get('id'),
+            value = topic.get('value'),
+            sourceNote = topic.get('sourceNote')
+        )
+    
+    @staticmethod
+    def _parse_source(source: dict) -> WBSource:
+        return WBSource(
+            id = source.get('id'),
+            lastUpdated = source.get('lastUpdated'),
+            name = source.get('name'),
+            code = source.get('code'),
+            description = source.get('description'),
+            dataAvailability = source.get('dataAvailability'),
+            metaDataAvailability = source.get('metaDataAvailability'),
+            concepts = source.get('concepts')
+        )
+    
+    @staticmethod
+    def _parse_income_level(income_level: dict) -> WBIncomeLevel:
+        return WBIncomeLevel(
+            id = income_level.get('id'),
+            iso2code = income_level.get('iso2code'),
+            value = income_level.get('value'),
+        )
+    
+    @staticmethod
+    def _parse_data_point(entry: dict) -> WBDataPoint:
+        return WBDataPoint(
+            country=entry['country']['value'],
+            country_id=entry['country']['id'],
+            countryiso3code=entry.get('countryiso3code'),
+            indicator=entry['indicator']['value'],
+            date=entry.get('date'),
+            value=entry.get('value'),
+            unit=entry.get('unit'),
+            obs_status=entry.get('obs_status'),
+            decimal=entry.get('decimal')
+        )
+    
+    @staticmethod
+    def _append_data_point(columns: TimeseriesColumns, entry: dict) -> None:
+        date = entry.get('date')
+        columns.append(
+            int(date[:4]) if date else None,
+            entry.get('value'),
+            economy=entry.get('countryiso3code') or entry['country']['id'],
+            indicator=entry['indicator']['id'],
+            date=date,
+            obs_status=entry.get('obs_status') or None,
+        )
+    
+    def _data_url(self, countries, indicators, start_date, end_date, frequency='Y', source=None) -> str:
+        # Convert the list of countries and indicators to a comma-separated string
+        country_codes = ';'.join(countries)
+        indicator_codes = ';'.join(indicators)
+
+        # Construct the URL for the time series data
+        # url = f'{self.BASE_URL}/country/{country_codes}/indicator/{indicator_codes}'
+        # url = self._add_query_parameters(url, {
+        #     'date': f'{start_date}:{end_date}',
+        #     'format': 'json',
+        #     'frequency': frequency,
+        #     'per_page': '1000'
+        # })
+        
+        query_parameters = {
+            'date': f'{start_date}:{end_date}',
+            'format': 'json',
+            'frequency': frequency,
+            'per_page': '1000',
+            'source': source
+        }
+        
+        return self._construct_url(self.BASE_URL, ['country', country_codes, 'indicator', indicator_codes],  query_parameters)
+    
+    @staticmethod
+    def _pack(codes: List[str], budget: int, max_items: int = None) -> List[List[str]]:
+        '''Splits codes, in order, into the fewest chunks whose ';'-joined length fits budget and whose size fits max_items.'''
+        chunks, chunk, length = [], [], -1
+        for code in codes:
+            if chunk and (length + 1 + len(code) > budget or (max_items and len(chunk) >= max_items)):
+                chunks.append(chunk)
+                chunk, length = [], -1
+            chunk.append(code)
+            length += 1 + len(code)
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+    
+    def _indicator_record(self, indicator: str):
+        '''Fetches the metadata of one indicator, or returns None if the API does not know it.'''
+        data = self._get(self._construct_url(self.BASE_URL, ['indicator', indicator], {'format': 'json'})).json()
+        return self._parse_indicator(data[1][0]) if data and len(data) > 1 and data[1] else None
+    
+    def _indicator_sources(self, indicators: List[str], source=None, max_workers: int = None) -> Dict[str, str]:
+        '''
+        Returns the id of the source of each indicator, which a request for several indicators must name.
+        
+        The sources are taken from source, then from the sources found by earlier calls, then read from the indicator
+        catalog when it is loaded, and the remaining indicators' metadata is fetched, concurrently by up to max_workers
+        threads. Sources found are remembered for the lifetime of the client, as indicators do not move between
+        sources. A failed metadata request raises, like a failed data request. Indicators whose source is not known are
+        left out.
+        
+        Args:
+            source (str or dict, optional): Id of the source of every indicator, or indicator code mapped to its source id.
+        '''
+        indicators = list(dict.fromkeys(indicators))
+        if len(indicators) < 2:
+            return {}
+        if source is not None and not isinstance(source, dict):
+            return {indicator: str(source) for indicator in indicators}
+        
+        sources = {indicator: str(source[indicator]) for indicator in indicators if source and source.get(indicator) is not None}
+        sources.update({
+            indicator: self._source_ids[indicator]
+            for indicator in indicators if indicator not in sources and indicator in self._source_ids
+        })
+        unknown = [indicator for indicator in indicators if indicator not in sources]
+        if not unknown:
+            return sources
+        
+        catalog = self.indicator_catalog()
+        if catalog.fresh:
+            records = [catalog.get(indicator) for indicator in unknown]
+        elif max_workers and max_workers > 1 and len(unknown) > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(unknown))) as executor:
+                records = list(executor.map(self._indicator_record, unknown))
+        else:
+            records = [self._indicator_record(indicator) for indicator in unknown]
+        
+        found = {
+            indicator: str(record.source['id'])
+            for indicator, record in zip(unknown, records)
+            if record is not None and isinstance(record.source, dict) and record.source.get('id') is not None
+        }
+        self._source_ids.update(found)
+        sources.update(found)
+        return sources
+    
+    def _plan_data_urls(self, countries, indicators, start_date, end_date, frequency='Y', indicator_sources: Dict[str, str] = None) -> List[str]:
+        '''
+        Splits a countries x indicators query into the fewest data requests the WB API accepts.
+        
+        Indicators are grouped by source, as only indicators of one source can be requested together, and indicators
+        of an unknown source are requested on their own. For each group, every indicator chunk size up to
+        MAX_INDICATORS_PER_REQUEST is tried, the countries are packed into as few URLs of at most MAX_URL_LENGTH as
+        fit beside each indicator chunk, and the size which needs the fewest requests is kept.
+        
+        Returns:
+            List[str]: The data URLs, without a page query parameter.
+        '''
+        countries = list(dict.fromkeys(countries))
+        indicator_sources = indicator_sources or {}
+        groups = {}
+        for indicator in dict.fromkeys(indicators):
+            source = indicator_sources.get(indicator)
+            groups.setdefault(source if source is not None else (indicator,), []).append(indicator)
+        
+        urls = []
+        for source, group in groups.items():
+            source = source if isinstance(source, str) else None
+            # Length of a URL with one-character codes, and room for the page query parameter.
+            overhead = len(self._data_url(['_'], ['_'], start_date, end_date, frequency, source)) - 2 + len('&page=99999')
+            budget = self.MAX_URL_LENGTH - overhead
+            
+            best = None
+            for size in range(1, min(len(group), self.MAX_INDICATORS_PER_REQUEST) + 1):
+                plan = [
+                    (indicator_chunk, self._pack(countries, budget - len(';'.join(indicator_chunk))))
+                    for indicator_chunk in self._pack(group, budget, size)
+                ]
+                count = sum(len(country_chunks) for _, country_chunks in plan)
+                if best is None or count < best[0]:
+                    best = (count, plan)
+            
+            for indicator_chunk, country_chunks in best[1]:
+                for country_chunk in country_chunks:
+                    urls.append(self._data_url(country_chunk, indicator_chunk, start_date, end_date, frequency,
+                                               source if len(indicator_chunk) > 1 else None))
+        return urls
+    
+    def _fetch_page(self, url: str, page: int):
+        paged_url = self._add_query_parameters(url, {'page': page})
+        response = self._get(paged_url)
+        return response.json()
+    
+    def _iter_pages(self, url: str, max_workers: int = None):
+        '''
+        Yields the records (data[1]) of each non-empty page of a paginated WB endpoint, in page order.
+        
+        The first page is fetched on its own to read the page count the WB API returns in its metadata (data[0]).
+        The remaining pages are then fetched one at a time as the generator is consumed, so only one page is held in
+        memory, or concurrently when max_workers is given.
+        
+        Args:
+            url (str): The endpoint URL, without a page query parameter.
+            max_workers (int, optional): Number of pages to fetch concurrently after the first.
+        '''
+        data = self._fetch_page(url, 1)
+        if not data or len(data) < 2 or not data[1]:
+            return
+        
+        yield data[1]
+        page_count = int(data[0].get('pages') or 1)
+        remaining = range(2, page_count + 1)
+        
+        if max_workers and max_workers > 1 and len(remaining) > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(remaining))) as executor:
+                results = list(executor.map(lambda page: self._fetch_page(url, page), remaining))
+        else:
+            results = (self._fetch_page(url, page) for page in remaining)
+        
+        for data in results:
+            if data and len(data) > 1 and data[1]:
+                yield data[1]
+    
+    def _iter_batch_pages(self, urls: List[str], max_workers: int = None):
+        '''
+        Yields the records of each non-empty page of several paginated WB requests, in request and page order.
         
+        With max_workers, the first page of every request is fetched concurrently to read the page counts, then every
+        remaining page of every request is fetched concurrently.
+        '''
+        if len(urls) == 1:
+            yield from self._iter_pages(urls[0], max_workers)
+            return
+        if not max_workers or max_workers < 2:
+            for url in urls:
+                yield from self._iter_pages(url)
+            return
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            first_pages = list(executor.map(lambda url: self._fetch_page(url, 1), urls))
+            page_counts = [
+                int(data[0].get('pages') or 1) if data and len(data) > 1 and data[1] else 0
+                for data in first_pages
+            ]
+            remaining = [(url, page) for url, page_count in zip(urls, page_counts) for page in range(2, page_count + 1)]
+            results = iter(list(executor.map(lambda request: self._fetch_page(*request), remaining)))
+        
+        for data, page_count in zip(first_pages, page_counts):
+            if not page_count:
+                continue
+            yield data[1]
+            for _ in range(page_count - 1):
+                data = next(results)
+                if data and len(data) > 1 and data[1]:
+                    yield data[1]
+    
+    def _fetch_pages(self, url: str, max_workers: int = None) -> List[list]:
+        '''Fetches every page of a paginated WB endpoint, see _iter_pages.'''
+        return list(self._iter_pages(url, max_workers))
+    
+    def _indicators_url(self) -> str:
         path_segments = ['/indicator']
         query_parameters = {'format': 'json', 'per_page': '1000'}
-        url = self._construct_url(self.BASE_URL, path_segments, query_parameters)
-
-        page = 1
-        all_indicators = []
-
-        while True:
-            paged_url = self._add_query_parameters(url, {'page': page})
-
-            try:
-                response = self._get(paged_url)
-                data = response.json()
-            except WBAPIError as e:
-                print(f"Error fetching WB indicators data: {e}")
-                return []
-
-            if data[1]:
-                for item in data[1]:
-                    all_indicators.append(WBIndicator(
-                        id=item.get('id'),
-                        name=item.get('name'),
-                        unit=item.get('unit'),
-                        source=item.get('source'),
-                        sourceNote=item.get('sourceNote'),
-                        sourceOrganization=item.get('sourceOrganization'),
-                        topics=item.get('topics'),
-                    ))
-                    
-            else:
-                break
+        return self._construct_url(self.BASE_URL, path_segments, query_parameters)
+    
+    @coalesced
+    def indicators(self, max_workers: int = None) -> List[WBIndicator]:
+        '''
+        Retrieves a list of available WB indicators.
+        
+        Args:
+            max_workers (int, optional): Number of pages to fetch concurrently. By default pages are fetched one at a time.
+        '''
+        
+        url = self._indicators_url()
 
-            page += 1
+        try:
+            pages = self._fetch_pages(url, max_workers)
+        except WBAPIError as e:
+            print(f"Error fetching WB indicators data: {e}")
+            return []
 
-        return all_indicators
+        return [self._parse_indicator(item) for page in pages for item in page]
     
+    def iter_indicators(self) -> Iterator[WBIndicator]:
+        '''
+        Yields the available WB indicators one page at a time as the pages arrive, holding a single page in memory.
+        '''
+        for page in self._iter_pages(self._indicators_url()):
+            for item in page:
+                yield self._parse_indicator(item)
+    
+    def indicator(self, id: str) -> WBIndicator:
+        '''
+        Looks up a WB indicator by id, e.g. 'NY.GDP.MKTP.CD'.
+        
+        The indicator catalog is loaded on first use and kept in memory, see BaseClient.catalog_ttl.
+        
+        Returns:
+            WBIndicator: The indicator, or None if there is no indicator with the id.
+        '''
+        return self.indicator_catalog().get(id)
+    
+    def indicator_catalog(self) -> Catalog:
+        '''The in-memory catalog of WB indicators, keyed by id.'''
+        return self._catalog('indicators', self.indicators, lambda indicator: (indicator.id,))
+    
+    @coalesced
     def regions(self) -> List[WBRegion]:
         url = self.BASE_URL + '/region'
         url = self._add_query_parameters(url, {'format': 'json', 'per_page': '1000'})
@@ -172,19 +498,12 @@ class WBClient(BaseClient):
             return []
             
         if data[1]:
-            regions = []
-            for region in data[1]:
-                regions.append(WBRegion(
-                    id = region.get('id'),
-                    code = region.get('code'),
-                    iso2code = region.get('iso2code'),
-                    name = region.get('name'),
-                ))
-            return regions
+            return [self._parse_region(region) for region in data[1]]
         else:
             print('WB Regions - Something went wrong.')
             return []
         
+    @coalesced
     def economies(self, region=None, income_level=None, lending_type=None) -> List[WBEconomy]:
         '''
         Retrieves a list of available WB economies.
@@ -210,25 +529,27 @@ class WBClient(BaseClient):
             return []
         
         if data[1]:
-            economies = []
-            for economy in data[1]:
-                economies.append(WBEconomy(
-                    id = economy.get('id'),
-                    iso2code = economy.get('iso2code'),
-                    name = economy.get('name'),
-                    region = economy.get('region'),
-                    adminRegion = economy.get('adminRegion'),
-                    incomeLevel = economy.get('incomeLevel'),
-                    lendingType = economy.get('lendingType'),
-                    capitalCity = economy.get('capitalCity'),
-                    longitude = economy.get('longitude'),
-                    latitude = economy.get('latitude'),
-                ))
-            return economies
+            return [self._parse_economy(economy) for economy in data[1]]
         else:
             print('WB Economies - Something went wrong.')
             return []
 
+    def economy(self, id: str) -> WBEconomy:
+        '''
+        Looks up a WB economy by its id (ISO3 code) or ISO2 code.
+        
+        The economy catalog is loaded on first use and kept in memory, see BaseClient.catalog_ttl.
+        
+        Returns:
+            WBEconomy: The economy, or None if there is no economy with the code.
+        '''
+        return self.economy_catalog().get(id)
+
+    def economy_catalog(self) -> Catalog:
+        '''The in-memory catalog of WB economies, keyed by id and ISO2 code.'''
+        return self._catalog('economies', self.economies, lambda economy: (economy.id, economy.iso2code))
+
+    @coalesced
     def topics(self) -> List[WBTopic]:
         '''
         Retrieves a list of available WB topics.
@@ -248,18 +569,12 @@ class WBClient(BaseClient):
             return []
         
         if data[1]:
-            topics = []
-            for topic in data[1]:
-                topics.append(WBTopic(
-                    id = topic.get('id'),
-                    value = topic.get('value'),
-                    sourceNote = topic.get('sourceNote')
-                ))
-            return topics
+            return [self._parse_topic(topic) for topic in data[1]]
         else:
             print('WB Topics - Something went wrong.')
             return []
 
+    @coalesced
     def sources(self) -> List[WBSource]:
         '''
         Retrieves a list of available WB sources.
@@ -267,7 +582,7 @@ class WBClient(BaseClient):
         Note: WB indicators can be grouped by source.
         '''
         
-        path_segments = ['/topic']
+        path_segments = ['/source']
         query_parameters = {'format': 'json', 'per_page': '1000'}
         url = self._construct_url(self.BASE_URL, path_segments, query_parameters)
         
@@ -279,23 +594,12 @@ class WBClient(BaseClient):
             return []
         
         if data[1]:
-            sources = []
-            for source in data[1]:
-                sources.append(WBSource(
-                    id = source.get('id'),
-                    lastUpdated = source.get('lastUpdated'),
-                    name = source.get('name'),
-                    code = source.get('code'),
-                    description = source.get('description'),
-                    dataAvailability = source.get('dataAvailability'),
-                    metaDataAvailability = source.get('metaDataAvailability'),
-                    concepts = source.get('concepts')
-                ))
-            return sources
+            return [self._parse_source(source) for source in data[1]]
         else:
             print('WB Sources - Something went wrong.')
             return []
 
+    @coalesced
     def income_levels(self) -> List[WBIncomeLevel]:
         url = self.BASE_URL + '/incomeLevel'
         url = self._add_query_parameters(url, {'format': 'json', 'per_page': '1000'})
@@ -308,82 +612,84 @@ class WBClient(BaseClient):
             return []
         
         if data[1]:
-            income_levels = []
-            for income_level in data[1]:
-                income_levels.append(WBIncomeLevel(
-                    id = income_level.get('id'),
-                    iso2code = income_level.get('iso2code'),
-                    value = income_level.get('value'),         
-                ))
-            return income_levels
+            return [self._parse_income_level(income_level) for income_level in data[1]]
         else:
             print('WB Income Levels - Something went wrong.')
             return []
 
     
-    def data(self, countries, indicators, start_date, end_date, frequency='Y'):
+    @coalesced
+    def data(self, countries, indicators, start_date, end_date, frequency='Y', max_workers: int = None, columnar: bool = False,
+             source=None):
         '''
         Retrieves time series data for the specified countries and indicators within the given date range.
         
+        The query is split into the fewest requests the WB API accepts, see _plan_data_urls, and the pages of every
+        request are merged in order.
+        
         Args:
             countries (list): A list of country codes.
             indicators (list): A list of indicator codes.
             start_date (int): The start year for the time series data.
             end_date (int): The end year for the time series data.
             frequency (str): Frequency of data (default is 'Y' for yearly data).
+            max_workers (int, optional): Number of requests and pages to fetch concurrently. By default pages are fetched one at a time.
+            columnar (bool): Return the data as TimeseriesColumns, with the DATA_COLUMNS code columns, instead of WBDataPoints.
+            source (str or dict, optional): Id of the source every indicator belongs to, e.g. 2 for the World Development
+                Indicators, or indicator code mapped to its source id. By default the source of each indicator is read
+                from the indicator catalog when it is loaded, and otherwise looked up, concurrently with max_workers,
+                when several indicators are requested.
         
         Returns:
             list: A list of dictionaries containing the time series data for each country and indicator.
         '''
-        # Convert the list of countries and indicators to a comma-separated string
-        country_codes = ';'.join(countries)
-        indicator_codes = ';'.join(indicators)
-
-        # Construct the URL for the time series data
-        # url = f'{self.BASE_URL}/country/{country_codes}/indicator/{indicator_codes}'
-        # url = self._add_query_parameters(url, {
-        #     'date': f'{start_date}:{end_date}',
-        #     'format': 'json',
-        #     'frequency': frequency,
-        #     'per_page': '1000'
-        # })
+        indicator_sources = self._indicator_sources(indicators, source, max_workers)
+        urls = self._plan_data_urls(countries, indicators, start_date, end_date, frequency, indicator_sources)
         
-        query_parameters = {
-            'date': f'{start_date}:{end_date}',
-            'format': 'json',
-            'frequency': frequency,
-            'per_page': '1000'
-        }
+        if columnar:
+            columns = TimeseriesColumns(self.DATA_COLUMNS)
+            for page in self._iter_batch_pages(urls, max_workers):
+                for entry in page:
+                    self._append_data_point(columns, entry)
+            return columns
         
-        url = self._construct_url(self.BASE_URL, ['country', country_codes, 'indicator', indicator_codes],  query_parameters)
+        return [self._parse_data_point(entry) for page in self._iter_batch_pages(urls, max_workers) for entry in page]
+    
+    @coalesced
+    def stored_data(self, countries: List[str], indicators: List[str], years: List[int], max_workers: int = None, source=None,
+                    max_age: float = None) -> TimeseriesColumns:
+        '''
+        Retrieves annual data through the client's TimeseriesStore, fetching only the cells which are missing or stale.
         
-        page = 1
-        all_data_points = []
-
-        while True:
-            # Add pagination query parameter
-            paged_url = self._add_query_parameters(url, {'page': page})
-            response = self._get(paged_url)
-            data = response.json()
-
-            # Check if the data contains values (data[1] is where the time series data is)
-            if data and len(data) > 1 and data[1]:
-                for entry in data[1]:
-                    all_data_points.append(WBDataPoint(
-                        country=entry['country']['value'],
-                        country_id=entry['country']['id'],
-                        countryiso3code=entry.get('countryiso3code'),
-                        indicator=entry['indicator']['value'],
-                        date=entry.get('date'),
-                        value=entry.get('value'),
-                        unit=entry.get('unit'),
-                        obs_status=entry.get('obs_status'),
-                        decimal=entry.get('decimal')
-                    ))
-            else:
-                break
-
-            page += 1
-
-        return all_data_points
-
+        Args:
+            countries (list): ISO3 country codes, as the API returns them in countryiso3code.
+            indicators (list): Indicator codes.
+            years (list): Years.
+            max_workers (int, optional): Number of requests and pages to fetch concurrently.
+            source (str or dict, optional): Id of the source every indicator belongs to, or of each indicator, see data().
+            max_age (float, optional): Overrides the store's max_age.
+        
+        Returns:
+            TimeseriesColumns: The stored observations with a value, with economy and indicator columns.
+        '''
+        def fetch(planned: StoreFetch):
+            sources = self._indicator_sources(planned.indicators, source, max_workers)
+            urls = self._plan_data_urls(planned.economies, planned.indicators, planned.start_year, planned.end_year, 'Y', sources)
+            for page in self._iter_batch_pages(urls, max_workers):
+                for entry in page:
+                    date = entry.get('date')
+                    yield (entry['indicator']['id'], entry.get('countryiso3code') or entry['country']['id'], int(date[:4]) if date else None,
+                           entry.get('value'))
+        
+        return self._stored_data('WB', indicators, countries, years, fetch, max_age)
+    
+    def iter_data(self, countries, indicators, start_date, end_date, frequency='Y', source=None) -> Iterator[WBDataPoint]:
+        '''
+        Yields time series data for the specified countries and indicators one page at a time as the pages arrive,
+        holding a single page in memory. Takes the same arguments as data().
+        '''
+        urls = self._plan_data_urls(countries, indicators, start_date, end_date, frequency, self._indicator_sources(indicators, source))
+        
+        for page in self._iter_batch_pages(urls):
+            for entry in page:
+                yield self._parse_data_point(entry)
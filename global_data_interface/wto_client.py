@@ -1,16 +1,27 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict, dataclass
+from itertools import islice
+from typing import Iterator
 from urllib.parse import urlencode
 import requests
 
 from global_data_interface.base_client import BaseClient
+from global_data_interface.catalog import Catalog
 from global_data_interface.base_data_class import BaseDataClass
+from global_data_interface.columnar import TimeseriesColumns
 from global_data_interface.global_data_class import GlobalEconomy, GlobalIndicator
+from global_data_interface.search_index import SearchDocument
+from global_data_interface.single_flight import coalesced
+from global_data_interface.streaming_csv import iter_csv_records
+from global_data_interface.streaming_json import iter_array_items
+from global_data_interface.timeseries_store import StoreFetch
 
 class WTOAPIError(Exception):
     """Custom exception for WTO API errors."""
     pass
 
-@dataclass
+@dataclass(slots=True)
 class WTOProductClassification:
     
     code: str
@@ -22,7 +33,7 @@ class WTOProductClassification:
     def to_dict(self):
         return asdict(self)
 
-@dataclass
+@dataclass(slots=True)
 class WTOProduct:
     
     code: str
@@ -39,14 +50,14 @@ class WTOProduct:
     def to_dict(self):
         return asdict(self)
 
-@dataclass
+@dataclass(slots=True)
 class WTOEconomicGroup(BaseDataClass):
     
     code: str
     name: str
     displayOrder: int
 
-@dataclass
+@dataclass(slots=True)
 class WTOTimeseriesDatapoint:
     
     indicatorCategoryCode: str
@@ -79,7 +90,7 @@ class WTOTimeseriesDatapoint:
     def to_dict(self):
         return asdict(self)
 
-@dataclass
+@dataclass(slots=True)
 class WTOUnit:
     
     code: str
@@ -91,7 +102,7 @@ class WTOUnit:
     def to_dict(self):
         return asdict(self)
 
-@dataclass
+@dataclass(slots=True)
 class WTOIndicatorCategory:
     
     code: str
@@ -105,7 +116,7 @@ class WTOIndicatorCategory:
     def to_dict(self):
         return asdict(self)
 
-@dataclass
+@dataclass(slots=True)
 class WTOIndicator:
     
     code: str
@@ -143,8 +154,17 @@ class WTOIndicator:
             name = self.name,
             source = 'WTO'
         )
+    
+    def to_search_document(self):
+        return SearchDocument(
+            id = self.code,
+            source = 'WTO',
+            name = self.name or '',
+            description = self.description or '',
+            topics = [label for label in (self.categoryLabel, self.subcategoryLabel) if label]
+        )
 
-@dataclass
+@dataclass(slots=True)
 class WTOGeographicalRegion:
     
     code: str
@@ -157,7 +177,7 @@ class WTOGeographicalRegion:
     def to_dict(self):
         return asdict(self)
     
-@dataclass
+@dataclass(slots=True)
 class WTOTerritory(BaseDataClass):
     
     code: str
@@ -177,10 +197,20 @@ class WTOClient(BaseClient):
     
     BASE_URL = "http://api.wto.org/timeseries/v1"
     API_DOCS = 'https://apiportal.wto.org/api-details#api=version1'
+    CACHE_TTLS = {'indicators': 24 * 60 * 60, 'reporters': 24 * 60 * 60}
+    DATA_COLUMNS = ['indicator', 'reporter', 'partner', 'product', 'period', 'unit', 'value_flag']
+    # Requests count against the quota of the subscription key.
+    RATE_LIMIT = {'rate': 1, 'burst': 4, 'max_concurrency': 4}
+    # Parameters of a /data query which select records, as opposed to formatting or paginating them.
+    QUERY_PARAMETERS = ('i', 'r', 'p', 'ps', 'pc', 'spc')
+    # Queries counting more records than this are split by reporter, then by year, before being paginated.
+    MAX_RECORDS_PER_QUERY = 1000000
+    # Conversions of the CSV columns which are numbers in the JSON Dataset, so both formats parse to the same records.
+    CSV_CONVERTERS = {'Year': int, 'Value': float}
     
-    def __init__(self):
-        headers = {"Ocp-Apim-Subscription-Key": '57e24c1ab6c44521b3c3c28d80f83462'}
-        super().__init__('IMF', headers=headers)
+    def __init__(self, headers=None, **kwargs):
+        headers = {"Ocp-Apim-Subscription-Key": '57e24c1ab6c44521b3c3c28d80f83462', **(headers or {})}
+        super().__init__('WTO', headers=headers, **kwargs)
         
     def info(self) -> None:
         print(f'''
@@ -190,7 +220,181 @@ class WTOClient(BaseClient):
               API DOCS: {self.API_DOCS}
               ''')
 
-    def data(self, i, r=None, p=None, ps=None, pc=None, spc=None, fmt=None, mode=None, dec=None, off=None, max=None, head=None, lang=None, meta=None) -> list[WTOTimeseriesDatapoint]:
+    @staticmethod
+    def _parse_datapoint(datapoint: dict) -> WTOTimeseriesDatapoint:
+        return WTOTimeseriesDatapoint(
+            indicatorCategoryCode=datapoint.get("IndicatorCategoryCode"),
+            indicatorCategory=datapoint.get("IndicatorCategory"),
+            indicatorCode=datapoint.get("IndicatorCode"),
+            indicator=datapoint.get("Indicator"),
+            reportingEconomyCode=datapoint.get("ReportingEconomyCode"),
+            reportingEconomy=datapoint.get("ReportingEconomy"),
+            partnerEconomyCode=datapoint.get("PartnerEconomyCode"),
+            partnerEconomy=datapoint.get("PartnerEconomy"),
+            productOrSectorClassificationCode=datapoint.get("ProductOrSectorClassificationCode"),
+            productOrSectorClassification=datapoint.get("ProductOrSectorClassification"),
+            productOrSectorCode=datapoint.get("ProductOrSectorCode"),
+            productOrSector=datapoint.get("ProductOrSector"),
+            periodCode=datapoint.get("PeriodCode"),
+            period=datapoint.get("Period"),
+            frequencyCode=datapoint.get("FrequencyCode"),
+            frequency=datapoint.get("Frequency"),
+            unitCode=datapoint.get("UnitCode"),
+            unit=datapoint.get("Unit"),
+            year=datapoint.get("Year"),
+            valueFlagCode=datapoint.get("ValueFlagCode"),
+            valueFlag=datapoint.get("ValueFlag"),
+            textValue=datapoint.get("TextValue"),
+            value=datapoint.get("Value"),
+        )
+
+    @staticmethod
+    def _append_datapoint(columns: TimeseriesColumns, datapoint: dict) -> None:
+        columns.append(
+            datapoint.get("Year"),
+            datapoint.get("Value"),
+            indicator=datapoint.get("IndicatorCode"),
+            reporter=datapoint.get("ReportingEconomyCode"),
+            partner=datapoint.get("PartnerEconomyCode"),
+            product=datapoint.get("ProductOrSectorCode"),
+            period=datapoint.get("PeriodCode"),
+            unit=datapoint.get("UnitCode"),
+            value_flag=datapoint.get("ValueFlagCode"),
+        )
+
+    @staticmethod
+    def _parse_unit(unit: dict) -> WTOUnit:
+        return WTOUnit(
+            code=unit.get("code"),
+            name=unit.get("name"),
+        )
+
+    @staticmethod
+    def _parse_indicator_category(category: dict) -> WTOIndicatorCategory:
+        return WTOIndicatorCategory(
+            code=category.get("code"),
+            name=category.get("name"),
+            parentCode=category.get("parentCode"),
+            sortOrder=category.get("sortOrder")
+        )
+
+    @staticmethod
+    def _parse_indicator(indicator: dict) -> WTOIndicator:
+        return WTOIndicator(
+            code=indicator.get("code"),
+            name=indicator.get("name"),
+            categoryCode=indicator.get("categoryCode"),
+            categoryLabel=indicator.get("categoryLabel"),
+            subcategoryCode=indicator.get("subcategoryCode"),
+            subcategoryLabel=indicator.get("subcategoryLabel"),
+            unitCode=indicator.get("unitCode"),
+            unitLabel=indicator.get("unitLabel"),
+            startYear=indicator.get("startYear"),
+            endYear=indicator.get("endYear"),
+            frequencyCode=indicator.get("frequencyCode"),
+            frequencyLabel=indicator.get("frequencyLabel"),
+            numberReporters=indicator.get("numberReporters"),
+            numberPartners=indicator.get("numberPartners"),
+            productSectorClassificationCode=indicator.get("productSectorClassificationCode"),
+            productSectorClassificationLabel=indicator.get("productSectorClassificationLabel"),
+            hasMetadata=indicator.get("hasMetadata"),
+            numberDecimals=indicator.get("numberDecimals"),
+            numberDatapoints=indicator.get("numberDatapoints"),
+            updateFrequency=indicator.get("updateFrequency"),
+            description=indicator.get("description"),
+            sortOrder=indicator.get("sortOrder")
+        )
+
+    @staticmethod
+    def _parse_geographical_region(region: dict) -> WTOGeographicalRegion:
+        return WTOGeographicalRegion(
+            code=region.get("code"),
+            name=region.get("name"),
+            displayOrder=region.get("displayOrder")
+        )
+
+    @staticmethod
+    def _parse_economic_group(group: dict) -> WTOEconomicGroup:
+        return WTOEconomicGroup(
+            code=group.get("code"),
+            name=group.get("name"),
+            displayOrder=group.get("displayOrder")
+        )
+
+    @staticmethod
+    def _parse_territory(territory: dict) -> WTOTerritory:
+        return WTOTerritory(
+            code=territory.get("code"),
+            iso3A=territory.get("iso3A"),
+            name=territory.get("name"),
+            displayOrder=territory.get("displayOrder")
+        )
+
+    @staticmethod
+    def _parse_product_classification(productClassification: dict) -> WTOProductClassification:
+        return WTOProductClassification(
+            code=productClassification.get("code"),
+            name=productClassification.get("name")
+        )
+
+    @staticmethod
+    def _parse_product(product: dict) -> WTOProduct:
+        return WTOProduct(
+            code = product.get("code"),
+            name = product.get("name"),
+            note = product.get("note"),
+            productClassification = product.get("productClassification"),
+            codeUnique = product.get("codeUnique"),
+            displayOrder = product.get("displayOrder"),
+            hierarchy = product.get("hierarchy"),
+        )
+
+    @staticmethod
+    def _data_payload(**parameters) -> dict:
+        """Returns the /data parameters which are set, with lists of codes joined into the comma separated codes the API takes."""
+        return {
+            key: ','.join(str(code) for code in value) if isinstance(value, (list, tuple, set)) else value
+            for key, value in parameters.items()
+            if value is not None
+        }
+    
+    @classmethod
+    def _query_parameters(cls, **parameters) -> dict:
+        """
+        Returns the parameters of a /data query for a query string, such as /data_count's, serialized as the /data JSON
+        payload sends them: lists of codes comma separated and booleans as true or false, not Python's True or False.
+        """
+        return {
+            key: ('true' if value else 'false') if isinstance(value, bool) else value
+            for key, value in cls._data_payload(**parameters).items()
+        }
+
+    def _stream_dataset(self, payload: dict) -> Iterator[dict]:
+        """
+        Posts a /data query and yields the records of the response's Dataset array as they are decoded from the socket,
+        so neither the raw body nor the full parsed document is held in memory.
+        
+        With fmt 'csv' the query is made with machine readable headings (head 'M'), whose column names are the keys of
+        the JSON records, and the rows are yielded as the same records. The session accepts gzip, so the CSV, like the
+        JSON, is transferred compressed and decompressed as it streams.
+        """
+        csv = str(payload.get('fmt') or '').lower() == 'csv'
+        if csv:
+            payload = {**payload, 'fmt': 'csv', 'head': 'M'}
+        # /data queries only read data, so a failed query can be retried like a GET.
+        response = self._post(self.BASE_URL + "/data", payload, stream=True, idempotent=True)
+        try:
+            chunks = response.iter_content(chunk_size=64 * 1024)
+            if csv:
+                yield from iter_csv_records(chunks, self.CSV_CONVERTERS)
+            else:
+                yield from iter_array_items(chunks, 'Dataset')
+        finally:
+            response.close()
+
+    @coalesced
+    def data(self, i, r=None, p=None, ps=None, pc=None, spc=None, fmt=None, mode=None, dec=None, off=None, max=None, head=None, lang=None, meta=None, columnar: bool = False,
+             paginate: bool = False, page_size: int = 10000, max_workers: int = 4) -> list[WTOTimeseriesDatapoint]:
         """
         Args:
             i (): Indicator code.
@@ -199,76 +403,199 @@ class WTOClient(BaseClient):
             ps (): Time period.
             pc (): Products/sectors (comma separated codes) where applicable.
             spc (): Include sub products/sectors. If true, all child items in the product/sector hierarchy are recursively included.
-            fmt (): Output format.
+            fmt (): Output format, 'json' (the default) or 'csv'. CSV is smaller on the wire and faster to decode, and
+                parses to the same datapoints or columns.
             mode (): Output mode.
             dec (): Number of decimals.
             off (): Number of records to skip (offset). You can use it for implementing pagination.
             max (): Maximum number of records to return.
-            head (): Heading style.
+            head (): Heading style. Ignored with fmt 'csv', which always requests machine readable headings.
             lang (): Language id.
             meta (): Include Metadata information. If enabled, it will generate additional files/arrays.
+            columnar (bool): Return the data as TimeseriesColumns, with the DATA_COLUMNS code columns, instead of WTOTimeseriesDatapoints.
+            paginate (bool): Fetch every matching record, ignoring off and max. The query is counted, split into chunks of
+                page_size records (see _plan_queries) and the chunks are fetched concurrently.
+            page_size (int): Number of records per chunk when paginating.
+            max_workers (int): Number of chunks fetched concurrently when paginating.
         Returns:
             list[WTOTimeseriesDatapoint]:
         """
 
-        url = self.BASE_URL + "/data"
-        payload = {key: value for key, value in {
-            "i": i,
-            "r": r,
-            "p": p,
-            "ps": ps,
-            "pc": pc,
-            "spc": spc,
-            "fmt": fmt,
-            "mode": mode,
-            "dec": dec,
-            "off": off,
-            "max": max,
-            "head": head,
-            "lang": lang,
-            "meta": meta
-        }.items() if value is not None}
+        payload = self._data_payload(i=i, r=r, p=p, ps=ps, pc=pc, spc=spc, fmt=fmt, mode=mode, dec=dec, off=off, max=max, head=head, lang=lang, meta=meta)
         
         try:
-            print(f'url: {url}')
-            response = self._post(url, payload)
-            print(f'response: {response}')
-            data = response.json()
+            if paginate:
+                payload = {key: value for key, value in payload.items() if key not in ('off', 'max')}
+                datapoints = self._iter_planned_dataset(payload, page_size, max_workers)
+            else:
+                datapoints = self._stream_dataset(payload)
+            
+            if columnar:
+                columns = TimeseriesColumns(self.DATA_COLUMNS)
+                for datapoint in datapoints:
+                    self._append_datapoint(columns, datapoint)
+                return columns
+            
+            return [self._parse_datapoint(datapoint) for datapoint in datapoints]
         except WTOAPIError as e:
             print(f"Error fetching timeseries datapoints for indicator {i}: {e}")
             return []
+
+    @coalesced
+    def stored_data(self, indicators: list[str], reporters: list[str], years: list[int], page_size: int = 10000, max_workers: int = 4,
+                    max_age: float = None, fmt: str = None) -> TimeseriesColumns:
+        """
+        Retrieves data through the client's TimeseriesStore, fetching only the cells which are missing or stale.
         
-        return [
-            WTOTimeseriesDatapoint(
-                indicatorCategoryCode=datapoint.get("IndicatorCategoryCode"),
-                indicatorCategory=datapoint.get("IndicatorCategory"),
-                indicatorCode=datapoint.get("IndicatorCode"),
-                indicator=datapoint.get("Indicator"),
-                reportingEconomyCode=datapoint.get("ReportingEconomyCode"),
-                reportingEconomy=datapoint.get("ReportingEconomy"),
-                partnerEconomyCode=datapoint.get("PartnerEconomyCode"),
-                partnerEconomy=datapoint.get("PartnerEconomy"),
-                productOrSectorClassificationCode=datapoint.get("ProductOrSectorClassificationCode"),
-                productOrSectorClassification=datapoint.get("ProductOrSectorClassification"),
-                productOrSectorCode=datapoint.get("ProductOrSectorCode"),
-                productOrSector=datapoint.get("ProductOrSector"),
-                periodCode=datapoint.get("PeriodCode"),
-                period=datapoint.get("Period"),
-                frequencyCode=datapoint.get("FrequencyCode"),
-                frequency=datapoint.get("Frequency"),
-                unitCode=datapoint.get("UnitCode"),
-                unit=datapoint.get("Unit"),
-                year=datapoint.get("Year"),
-                valueFlagCode=datapoint.get("ValueFlagCode"),
-                valueFlag=datapoint.get("ValueFlag"),
-                textValue=datapoint.get("TextValue"),
-                value=datapoint.get("Value"),
-            )
-            for datapoint in data.get('Dataset', [])
-        ]
-
-    def get_timeseries_data_count(self):
-        pass
+        Only the default partner and product of each indicator are fetched, so each reporter has one value per year.
+        
+        Args:
+            indicators (list[str]): Indicator codes.
+            reporters (list[str]): Reporting economy codes.
+            years (list[int]): Years.
+            page_size (int): Number of records per chunk, see data().
+            max_workers (int): Number of chunks fetched concurrently.
+            max_age (float, optional): Overrides the store's max_age.
+            fmt (str, optional): Format the missing cells are fetched in, 'json' or 'csv', see data().
+        
+        Returns:
+            TimeseriesColumns: The stored observations with a value, with economy and indicator columns.
+        """
+        def fetch(planned: StoreFetch):
+            for indicator in planned.indicators:
+                payload = self._data_payload(i=indicator, r=','.join(planned.economies), ps=f'{planned.start_year}-{planned.end_year}', fmt=fmt)
+                for datapoint in self._iter_planned_dataset(payload, page_size, max_workers):
+                    yield (datapoint.get("IndicatorCode"), datapoint.get("ReportingEconomyCode"), datapoint.get("Year"), datapoint.get("Value"))
+        
+        return self._stored_data('WTO', indicators, reporters, years, fetch, max_age)
+    
+    def iter_data(self, i, r=None, p=None, ps=None, pc=None, spc=None, mode=None, dec=None, head=None, lang=None, page_size: int = 1000, max_workers: int = None,
+                  fmt=None) -> Iterator[WTOTimeseriesDatapoint]:
+        """
+        Yields timeseries datapoints page by page, paginating with off/max so only one page is held in memory.
+        Takes the same arguments as data(), except the pagination arguments which are handled here.
+        
+        Args:
+            fmt (): Format the pages are fetched in, 'json' (the default) or 'csv', see data().
+            page_size (int): Number of records requested per page (max).
+            max_workers (int, optional): Count the query first and fetch up to this many pages concurrently, holding
+                at most twice as many pages in memory. By default pages are fetched one at a time until a short page.
+        """
+        
+        if max_workers:
+            payload = self._data_payload(i=i, r=r, p=p, ps=ps, pc=pc, spc=spc, fmt=fmt, mode=mode, dec=dec, head=head, lang=lang)
+            for datapoint in self._iter_planned_dataset(payload, page_size, max_workers):
+                yield self._parse_datapoint(datapoint)
+            return
+        
+        off = 0
+        
+        while True:
+            payload = self._data_payload(i=i, r=r, p=p, ps=ps, pc=pc, spc=spc, fmt=fmt, mode=mode, dec=dec, off=off, max=page_size, head=head, lang=lang)
+            count = 0
+            
+            for datapoint in self._stream_dataset(payload):
+                count += 1
+                yield self._parse_datapoint(datapoint)
+            
+            if count < page_size:
+                break
+            off += page_size
+
+    @coalesced
+    def get_timeseries_data_count(self, i, r=None, p=None, ps=None, pc=None, spc=None) -> int:
+        """
+        Counts the datapoints matching a /data query.
+        
+        Args:
+            i (): Indicator code.
+            r (): Reporting economies (comma separated codes).
+            p (): Partner economies where applicable (comma separated codes).
+            ps (): Time period.
+            pc (): Products/sectors (comma separated codes) where applicable.
+            spc (): Include sub products/sectors.
+        Returns:
+            int: The number of datapoints.
+        """
+        
+        url = self.BASE_URL + "/data_count"
+        url = self._add_query_parameters(url, self._query_parameters(i=i, r=r, p=p, ps=ps, pc=pc, spc=spc))
+        response = self._get(url)
+        return int(response.json())
+
+    @staticmethod
+    def _split_period(ps) -> list:
+        """Splits a period of whole years, e.g. '2000-2005' or '2000,2001', into single years. Returns [] for other periods."""
+        if not isinstance(ps, str):
+            return []
+        if ',' in ps:
+            years = [year.strip() for year in ps.split(',')]
+        elif '-' in ps:
+            start, _, end = ps.partition('-')
+            if not (start.strip().isdigit() and end.strip().isdigit()):
+                return []
+            years = [str(year) for year in range(int(start), int(end) + 1)]
+        else:
+            return []
+        return years if all(year.isdigit() for year in years) else []
+
+    def _plan_queries(self, payload: dict, max_records: int) -> list[tuple[dict, int]]:
+        """
+        Splits a /data query into disjoint sub-queries counting at most max_records records where possible.
+        
+        Queries which are too large are split by reporting economy, then by year. A query which cannot be split further
+        is kept whole and paginated with offsets.
+        
+        Returns:
+            list[tuple[dict, int]]: Each sub-query payload with its record count.
+        """
+        count = self.get_timeseries_data_count(**{key: payload.get(key) for key in self.QUERY_PARAMETERS})
+        if count <= max_records:
+            return [(payload, count)]
+        
+        reporters = list(dict.fromkeys(code.strip() for code in str(payload.get('r') or '').split(',') if code.strip()))
+        if len(reporters) > 1:
+            return [plan for reporter in reporters for plan in self._plan_queries({**payload, 'r': reporter}, max_records)]
+        
+        years = list(dict.fromkeys(self._split_period(payload.get('ps'))))
+        if len(years) > 1:
+            return [plan for year in years for plan in self._plan_queries({**payload, 'ps': year}, max_records)]
+        
+        return [(payload, count)]
+
+    def _fetch_chunk(self, payload: dict, expected: int) -> list[dict]:
+        """Fetches one offset chunk. If the API returns fewer records than requested, the remainder is requested from where it stopped."""
+        records = []
+        while len(records) < expected:
+            off = payload['off'] + len(records)
+            page = list(self._stream_dataset({**payload, 'off': off, 'max': expected - len(records)}))
+            if not page:
+                break
+            records += page
+        return records
+
+    def _iter_planned_dataset(self, payload: dict, page_size: int, max_workers: int) -> Iterator[dict]:
+        """
+        Yields every record matching a /data query, in a single ordered stream.
+        
+        The query is planned with _plan_queries and each sub-query is cut into contiguous offset chunks of page_size
+        records. Chunks are fetched concurrently by max_workers threads, with at most twice as many chunks in memory,
+        and yielded in plan order, so there are no duplicates or gaps.
+        """
+        plans = self._plan_queries(payload, max(self.MAX_RECORDS_PER_QUERY, page_size))
+        chunks = (
+            ({**query, 'off': off, 'max': page_size}, min(page_size, count - off))
+            for query, count in plans
+            for off in range(0, count, page_size)
+        )
+        
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+            pending = deque(executor.submit(self._fetch_chunk, *chunk) for chunk in islice(chunks, max(max_workers, 1) * 2))
+            while pending:
+                records = pending.popleft().result()
+                for chunk in islice(chunks, 1):
+                    pending.append(executor.submit(self._fetch_chunk, *chunk))
+                yield from records
 
     def get_timeseries_metadata(self):
         pass
@@ -282,6 +609,7 @@ class WTOClient(BaseClient):
     def periods(self):
         pass
 
+    @coalesced
     def units(self, lang: str = None):
         
         url = self.BASE_URL + "/units"
@@ -294,14 +622,9 @@ class WTOClient(BaseClient):
             print(f"Error fetching units: {e}")
             return []
         
-        return [
-            WTOUnit(
-                code=unit.get("code"),
-                name=unit.get("name"),
-            )
-            for unit in data
-        ]
+        return [self._parse_unit(unit) for unit in data]
 
+    @coalesced
     def indicator_catagories(self, lang: str = None) -> list[WTOIndicatorCategory]:
         
         url = self.BASE_URL + "/indicator_categories"
@@ -314,16 +637,9 @@ class WTOClient(BaseClient):
             print(f"Error fetching indicator catagories: {e}")
             return []
         
-        return [
-            WTOIndicatorCategory(
-                code=category.get("code"),
-                name=category.get("name"),
-                parentCode=category.get("parentCode"),
-                sortOrder=category.get("sortOrder")
-            )
-            for category in data
-        ]
+        return [self._parse_indicator_category(category) for category in data]
         
+    @coalesced
     def indicators(self, i=None, name=None, t=None, pc=None, tp=None, frq=None, lang=None) -> list[WTOIndicator]:
         """
         Args:
@@ -358,34 +674,21 @@ class WTOClient(BaseClient):
             print(f"Error fetching indicators: {e}")
             return []
         
-        return [
-            WTOIndicator(
-                code=indicator.get("code"),
-                name=indicator.get("name"),
-                categoryCode=indicator.get("categoryCode"),
-                categoryLabel=indicator.get("categoryLabel"),
-                subcategoryCode=indicator.get("subcategoryCode"),
-                subcategoryLabel=indicator.get("subcategoryLabel"),
-                unitCode=indicator.get("unitCode"),
-                unitLabel=indicator.get("unitLabel"),
-                startYear=indicator.get("startYear"),
-                endYear=indicator.get("endYear"),
-                frequencyCode=indicator.get("frequencyCode"),
-                frequencyLabel=indicator.get("frequencyLabel"),
-                numberReporters=indicator.get("numberReporters"),
-                numberPartners=indicator.get("numberPartners"),
-                productSectorClassificationCode=indicator.get("productSectorClassificationCode"),
-                productSectorClassificationLabel=indicator.get("productSectorClassificationLabel"),
-                hasMetadata=indicator.get("hasMetadata"),
-                numberDecimals=indicator.get("numberDecimals"),
-                numberDatapoints=indicator.get("numberDatapoints"),
-                updateFrequency=indicator.get("updateFrequency"),
-                description=indicator.get("description"),
-                sortOrder=indicator.get("sortOrder")
-            )
-            for indicator in data
-        ]
+        return [self._parse_indicator(indicator) for indicator in data]
+        
+    def indicator(self, code: str) -> WTOIndicator:
+        """Looks up a WTO indicator by code from the in-memory indicator catalog.
+
+        Returns:
+            WTOIndicator: The indicator, or None if there is no indicator with the code.
+        """
+        return self.indicator_catalog().get(code)
+    
+    def indicator_catalog(self) -> Catalog:
+        """The in-memory catalog of WTO indicators, keyed by code."""
+        return self._catalog('indicators', self.indicators, lambda indicator: (indicator.code,))
         
+    @coalesced
     def geographical_regions(self, lang: str = None) -> list[WTOGeographicalRegion]:
         """Fetches a list of geographical regions from the WTO API.
 
@@ -411,15 +714,9 @@ class WTOClient(BaseClient):
             print(f"Error fetching geographical regions: {e}")
             return []
         
-        return [
-            WTOGeographicalRegion(
-                code=region.get("code"),
-                name=region.get("name"),
-                displayOrder=region.get("displayOrder")
-            )
-            for region in data
-        ]
+        return [self._parse_geographical_region(region) for region in data]
     
+    @coalesced
     def economic_groups(self, lang=None):
         
         query_parameters = {'lang': lang} if lang else {}
@@ -433,15 +730,9 @@ class WTOClient(BaseClient):
             print(f"Error fetching geographical regions: {e}")
             return []
         
-        return [
-            WTOEconomicGroup(
-                code=group.get("code"),
-                name=group.get("name"),
-                displayOrder=group.get("displayOrder")
-            )
-            for group in data
-        ]
+        return [self._parse_economic_group(group) for group in data]
     
+    @coalesced
     def economies(self, name=None, ig=None, reg=None, gp=None, lang=None):
         
         url = self.BASE_URL + "/reporters"
@@ -456,22 +747,26 @@ class WTOClient(BaseClient):
         
         try:
             response = self._get(url)
-            print(response)
             data = response.json() 
         except WTOAPIError as e:
             print(f"Error fetching reporting economies: {e}")
             return []
         
-        return [
-            WTOTerritory(
-                code=territory.get("code"),
-                iso3A=territory.get("iso3A"),
-                name=territory.get("name"),
-                displayOrder=territory.get("displayOrder")
-            )
-            for territory in data
-        ]
+        return [self._parse_territory(territory) for territory in data]
+    
+    def economy(self, code: str) -> WTOTerritory:
+        """Looks up a WTO reporting economy by its numeric code or ISO3 code from the in-memory economy catalog.
+
+        Returns:
+            WTOTerritory: The economy, or None if there is no economy with the code.
+        """
+        return self.economy_catalog().get(code)
+    
+    def economy_catalog(self) -> Catalog:
+        """The in-memory catalog of WTO reporting economies, keyed by numeric code and ISO3 code."""
+        return self._catalog('economies', self.economies, lambda territory: (territory.code, territory.iso3A))
     
+    @coalesced
     def product_classifications(self, lang: str = None):
         
         url = self.BASE_URL + '/product_classifications'
@@ -484,15 +779,10 @@ class WTOClient(BaseClient):
             print(f"Error fetching indicator catagories: {e}")
             return []
         
-        return [
-            WTOProductClassification(
-                code=productClassification.get("code"),
-                name=productClassification.get("name")
-            )
-            for productClassification in data
-        ]
+        return [self._parse_product_classification(productClassification) for productClassification in data]
         
     
+    @coalesced
     def products_and_sectors(self, name=None, pc=None, lang=None):
         
         url = self.BASE_URL + "/products"
@@ -510,17 +800,6 @@ class WTOClient(BaseClient):
             print(f"Error fetching reporting economies: {e}")
             return []
         
-        return [
-            WTOProduct(
-                code = territory.get("code"),
-                name = territory.get("name"),
-                note = territory.get("note"),
-                productClassification = territory.get("productClassification"),
-                codeUnique = territory.get("codeUnique"),
-                displayOrder = territory.get("displayOrder"),
-                hierarchy = territory.get("hierarchy"),
-            )
-            for territory in data
-        ]
+        return [self._parse_product(territory) for territory in data]
 
     
\ No newline at end of file
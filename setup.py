@@ -9,16 +9,22 @@ setup(
     author='Euan McLean Campbell',
     author_email='euan.campbell.dev@pm.me',
     url='https://github.com/EMCampbell01/Global-Data-Interface',
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
     classifiers=[
         'Development Status :: 3 - Alpha',
         'Programming Language :: Python :: 3',
         'License :: OSI Approved :: MIT License',
         'Operating System :: OS Independent',
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.10',
     install_requires=[  
         'Requests==2.32.3',
         'setuptools==65.5.0',
     ],
+    extras_require={
+        'async': ['aiohttp>=3.8'],
+        'columnar': ['numpy'],
+        'pandas': ['numpy', 'pandas'],
+        'arrow': ['numpy', 'pyarrow'],
+    },
 )
\ No newline at end of file
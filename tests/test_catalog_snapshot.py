@@ -0,0 +1,52 @@
+import pytest
+
+from benchmarks.fixtures import FixtureSet
+from benchmarks.stub_server import StubServer
+from global_data_interface import IMFClient, WBClient, WTOClient
+from global_data_interface.global_data_class import GlobalIndicator
+from global_data_interface.global_data_interface import GlobalDataInterface
+
+UNLIMITED = {'rate': None, 'burst': None, 'max_concurrency': None}
+SIZES = {'wb_indicators': 50, 'imf_indicators': 20, 'wto_indicators': 10, 'wb_economies': 30, 'imf_countries': 30, 'wto_reporters': 30}
+
+
+def interface(stub: StubServer) -> GlobalDataInterface:
+    '''A new GlobalDataInterface, as in a fresh worker process, with its clients pointed at the stub.'''
+    GlobalDataInterface._instance = None
+    gdi = GlobalDataInterface()
+    gdi.wb, gdi.imf, gdi.wto = WBClient(rate_limit=UNLIMITED), IMFClient(rate_limit=UNLIMITED), WTOClient(rate_limit=UNLIMITED)
+    for source, client in (('wb', gdi.wb), ('imf', gdi.imf), ('wto', gdi.wto)):
+        client.BASE_URL = stub.url(source)
+    return gdi
+
+
+@pytest.fixture(autouse=True)
+def reset_interface():
+    yield
+    GlobalDataInterface._instance = None
+
+
+def test_snapshot_translates_economy_codes_without_catalog_requests(tmp_path):
+    fixtures = FixtureSet(sizes=SIZES)
+    path = str(tmp_path / 'catalog.snapshot')
+    with StubServer(fixtures) as stub:
+        built = interface(stub).economy_crosswalk()
+        interface(stub).save_catalog_snapshot(path)
+
+        gdi = interface(stub)
+        endpoints = []
+        gdi.add_request_hook(on_end=lambda event: endpoints.append((event.api, event.endpoint)))
+        snapshot = gdi.load_catalog_snapshot(path)
+        crosswalk = gdi.economy_crosswalk()
+
+        assert [economy.to_dict() for economy in crosswalk] == [economy.to_dict() for economy in built]
+        economies = [economy['iso3'] for economy in fixtures.economies[1:4]]
+        assert [crosswalk.translate(code, 'ISO3', 'WTO') for code in economies] == [economy['wto'] for economy in fixtures.economies[1:4]]
+
+        indicator = fixtures.wto_indicators[0]['code']
+        datapoints = gdi.data([GlobalIndicator(id=indicator, name='', source='WTO')], [2000, 2001], economies=economies)
+        assert len(datapoints) == 3 * 2
+        # Only the data queries are sent, no economy catalog is loaded.
+        assert endpoints and {endpoint for _, endpoint in endpoints} <= {'data_count', 'data'}
+        assert {api for api, _ in endpoints} == {'WTO'}
+        snapshot.close()
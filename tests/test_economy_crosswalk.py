@@ -0,0 +1,19 @@
+from benchmarks.fixtures import FixtureSet
+from global_data_interface.economy_crosswalk import EconomyCrosswalk
+from global_data_interface.imf_client import IMFClient
+from global_data_interface.wb_client import WBClient
+from global_data_interface.wto_client import WTOClient
+
+
+def test_economies_are_looked_up_by_iso2():
+    fixtures = FixtureSet(sizes={'wb_economies': 20, 'imf_countries': 20, 'wto_reporters': 20})
+    wb_economies = [WBClient._parse_economy(economy) for economy in fixtures.wb_economies]
+    imf_economies = IMFClient._parse_economies({'countries': fixtures.imf_countries})
+    wto_economies = [WTOClient._parse_territory(reporter) for reporter in fixtures.wto_reporters]
+    crosswalk = EconomyCrosswalk.build(wb_economies, imf_economies, wto_economies)
+
+    economy = fixtures.economies[3]
+    assert wb_economies[3].iso2code == economy['iso2']
+    assert crosswalk.key(economy['iso2'], 'ISO2') == economy['iso3']
+    assert crosswalk.key(economy['iso2']) == economy['iso3']
+    assert crosswalk.translate(economy['iso2'], 'ISO2', 'WTO') == economy['wto']
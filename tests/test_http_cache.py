@@ -0,0 +1,30 @@
+import time
+
+import requests
+
+from global_data_interface.http_cache import HTTPCache
+
+
+def response(content: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = content
+    response.url = 'https://example.org/indicator'
+    return response
+
+
+def test_ttl_is_applied_when_entries_are_read(tmp_path):
+    cache = HTTPCache(str(tmp_path))
+    key = cache.key('GET', 'https://example.org/indicator')
+    cache.set(key, response(b'[]'), ttl=3600)
+    stored_at = cache.get(key).stored_at
+
+    assert cache.get(key).fresh
+    # A client sharing the cache with a shorter TTL sees the existing entry as expired.
+    assert not cache.get(key, ttl=0).fresh
+    assert cache.get(key, ttl=60).expires_at == stored_at + 60
+
+    cache.refresh(key, ttl=60)
+    assert cache.get(key, ttl=60).stored_at >= stored_at
+    assert cache.get(key, ttl=60).expires_at <= time.time() + 60
+    cache.close()
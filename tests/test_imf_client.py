@@ -0,0 +1,35 @@
+import pytest
+
+from benchmarks.fixtures import FixtureSet
+from benchmarks.stub_server import StubServer
+from global_data_interface.imf_client import IMFAPIError, IMFClient
+
+UNLIMITED = {'rate': None, 'burst': None, 'max_concurrency': None}
+
+
+class FailingFixtures(FixtureSet):
+    '''Fixtures whose IMF API answers the data requests of one indicator with an error.'''
+
+    def __init__(self, failing: str, **kwargs):
+        super().__init__(**kwargs)
+        self.failing = failing
+
+    def imf(self, path, query):
+        if path and path[0] == self.failing:
+            return 404, {'message': 'Not found'}
+        return super().imf(path, query)
+
+
+def test_data_many_raises_when_an_indicator_fails():
+    fixtures = FailingFixtures('IMF001', sizes={'imf_countries': 5})
+    with StubServer(fixtures) as stub:
+        imf = IMFClient(rate_limit=UNLIMITED)
+        imf.BASE_URL = stub.url('imf')
+
+        columns = imf.data_many(['IMF000', 'IMF002'], years=[2000, 2001], columnar=True)
+        assert len(columns) == 2 * 5 * 2
+
+        with pytest.raises(IMFAPIError, match='IMF001'):
+            imf.data_many(['IMF000', 'IMF001', 'IMF002'], years=[2000, 2001], columnar=True)
+        with pytest.raises(IMFAPIError, match='IMF001'):
+            imf.data_many(['IMF001'], years=[2000, 2001])
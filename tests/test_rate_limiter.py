@@ -0,0 +1,139 @@
+from email.utils import formatdate
+import threading
+import time
+
+import pytest
+
+from benchmarks.fixtures import FixtureSet
+from benchmarks.stub_server import StubServer
+from global_data_interface import rate_limiter
+from global_data_interface.base_client import RateLimitError
+from global_data_interface.rate_limiter import RateLimiter, parse_retry_after
+from global_data_interface.wto_client import WTOClient
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    '''A monotonic clock which advances a second on every reading, so limiters refill without waiting.'''
+    now = [time.monotonic()]
+
+    def monotonic():
+        now[0] += 1
+        return now[0]
+
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', monotonic)
+
+
+def test_throttling_halves_the_limits_and_successes_restore_them(clock):
+    limiter = RateLimiter(rate=10, burst=10, max_concurrency=8, throttle_delay=0)
+    limiter.acquire()
+    limiter.release(throttled=True)
+    assert limiter.limit == 4
+    assert limiter.rate == 5
+    assert limiter.stats()['throttled'] == 1
+
+    limiter.acquire()
+    limiter.release(throttled=True)
+    assert limiter.limit == 2
+    assert limiter.rate == 2.5
+
+    for _ in range(200):
+        limiter.acquire()
+        limiter.release()
+    # Additive increase, capped at the configured maximums.
+    assert limiter.limit == 8
+    assert limiter.rate == 10
+
+
+def test_failed_requests_leave_the_limits_unchanged():
+    limiter = RateLimiter(rate=10, max_concurrency=4)
+    limiter.acquire()
+    limiter.release(success=False)
+    assert (limiter.limit, limiter.rate, limiter.in_flight) == (4, 10, 0)
+
+
+def test_limits_never_drop_below_their_minimums(clock):
+    limiter = RateLimiter(rate=1, max_concurrency=2, min_rate=0.5, throttle_delay=0)
+    for _ in range(5):
+        limiter.acquire()
+        limiter.release(throttled=True)
+    assert limiter.limit == 1
+    assert limiter.rate == 0.5
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('2') == 2
+    assert parse_retry_after('-1') == 0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
+    assert 8 < parse_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+    assert parse_retry_after(formatdate(time.time() - 10, usegmt=True)) == 0
+
+
+def test_retry_after_pauses_every_request():
+    limiter = RateLimiter(throttle_delay=5)
+    limiter.acquire()
+    limiter.release(throttled=True, retry_after=0.2)
+    started = time.monotonic()
+    limiter.acquire()
+    limiter.release()
+    assert time.monotonic() - started >= 0.15
+
+
+def test_unlimited_concurrency():
+    limiter = RateLimiter(rate=None, max_concurrency=None)
+    limiter.acquire()
+    limiter.release(throttled=True, retry_after=0)
+    limiter.acquire()
+    limiter.release()
+    assert limiter.stats()['concurrency'] is None
+
+    # Without a concurrency limit, any number of requests can be in flight at once.
+    started, release = threading.Barrier(20), threading.Event()
+
+    def request():
+        limiter.acquire()
+        started.wait(timeout=5)
+        release.wait(timeout=5)
+        limiter.release()
+
+    threads = [threading.Thread(target=request) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    assert limiter.in_flight == 20
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert limiter.in_flight == 0
+
+
+class ThrottlingFixtures(FixtureSet):
+    '''Fixtures whose WTO API throttles the first throttled requests to /data.'''
+
+    def __init__(self, throttled: int, **kwargs):
+        super().__init__(**kwargs)
+        self.throttled = throttled
+
+    def wto(self, method, path, query):
+        if path == ['data'] and self.throttled:
+            self.throttled -= 1
+            return 429, {'statusCode': 429, 'message': 'Rate limit is exceeded'}
+        return super().wto(method, path, query)
+
+
+@pytest.mark.parametrize('idempotent', [False, True])
+def test_throttled_posts_are_only_retried_when_idempotent(idempotent):
+    fixtures = ThrottlingFixtures(1, sizes={'wto_reporters': 12})
+    with StubServer(fixtures) as stub:
+        wto = WTOClient(rate_limiter=RateLimiter(throttle_delay=0))
+        wto.BASE_URL = stub.url('wto')
+        payload = {'i': fixtures.wto_indicators[0]['code'], 'ps': '2000'}
+
+        if idempotent:
+            assert len(wto._post(wto.BASE_URL + '/data', payload, idempotent=True).json()['Dataset']) == 12
+            assert stub.reset_counters()['requests'] == 2
+        else:
+            with pytest.raises(RateLimitError):
+                wto._post(wto.BASE_URL + '/data', payload)
+            assert stub.reset_counters()['requests'] == 1
@@ -0,0 +1,130 @@
+import random
+import threading
+import time
+
+import pytest
+import requests
+
+from benchmarks.fixtures import FixtureSet
+from benchmarks.stub_server import StubServer
+from global_data_interface.base_client import APIError
+from global_data_interface.imf_client import IMFClient
+from global_data_interface.retry_policy import RetryPolicy, quantile
+from global_data_interface.wto_client import WTOClient
+
+UNLIMITED = {'rate': None, 'burst': None, 'max_concurrency': None}
+
+
+def test_backoff_is_exponential_and_capped():
+    policy = RetryPolicy(backoff=0.5, max_backoff=3.0, jitter=False)
+    assert [policy.delay(attempt) for attempt in range(5)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+
+
+def test_jitter_spreads_the_backoff():
+    policy = RetryPolicy(backoff=1.0, max_backoff=10.0)
+    random.seed(0)
+    delays = [policy.delay(2) for _ in range(100)]
+    assert all(0 <= delay <= 4.0 for delay in delays)
+    assert len(set(delays)) == 100
+    assert max(delays) > 3.0 and min(delays) < 1.0
+
+
+def test_should_retry():
+    policy = RetryPolicy(retries=2)
+    timeout = requests.exceptions.ReadTimeout()
+    assert policy.should_retry(0, True, error=timeout)
+    assert not policy.should_retry(2, True, error=timeout)
+    # A request which may not be idempotent is only retried if it never reached the server.
+    assert not policy.should_retry(0, False, error=timeout)
+    assert policy.should_retry(0, False, error=requests.exceptions.ConnectTimeout())
+    assert policy.should_retry(1, True, status_code=502)
+    assert not policy.should_retry(0, True, status_code=404)
+    assert not policy.should_retry(0, False, status_code=500)
+
+
+def test_hedge_after():
+    latencies = [n / 100 for n in range(1, 101)]
+    assert RetryPolicy().hedge_after(latencies) is None
+    assert RetryPolicy(hedge=True, hedge_delay=0.2).hedge_after([]) == 0.2
+    assert RetryPolicy(hedge=True, hedge_min_samples=20).hedge_after(latencies[:19]) is None
+    assert RetryPolicy(hedge=True, hedge_quantile=0.95).hedge_after(latencies) == quantile(latencies, 0.95) == 0.95
+
+
+class FlakyFixtures(FixtureSet):
+    '''Fixtures whose IMF and WTO data requests fail or stall a number of times before they are answered.'''
+
+    def __init__(self, failures: int = 0, stalls: int = 0, stall: float = 1.0, **kwargs):
+        super().__init__(**kwargs)
+        self.failures, self.stalls, self.stall = failures, stalls, stall
+        self.lock = threading.Lock()
+
+    def _outcome(self):
+        with self.lock:
+            if self.failures:
+                self.failures -= 1
+                return 'fail'
+            if self.stalls:
+                self.stalls -= 1
+                return 'stall'
+
+    def imf(self, path, query):
+        if path and path[0] in self.imf_indicators:
+            outcome = self._outcome()
+            if outcome == 'fail':
+                return 500, {'message': 'Internal server error'}
+            if outcome == 'stall':
+                time.sleep(self.stall)
+        return super().imf(path, query)
+
+    def wto(self, method, path, query):
+        if path == ['data'] and self._outcome() == 'fail':
+            return 500, {'statusCode': 500, 'message': 'Internal server error'}
+        return super().wto(method, path, query)
+
+
+def imf_client(stub: StubServer, **kwargs) -> IMFClient:
+    imf = IMFClient(rate_limit=UNLIMITED, **kwargs)
+    imf.BASE_URL = stub.url('imf')
+    return imf
+
+
+def test_failed_gets_are_retried():
+    with StubServer(FlakyFixtures(failures=2, sizes={'imf_countries': 5})) as stub:
+        imf = imf_client(stub, retry_policy=RetryPolicy(retries=2, backoff=0.01))
+        assert len(imf.data('IMF000', years=[2000], columnar=True)) == 5
+        assert imf.retries == 2
+        assert stub.reset_counters()['requests'] == 3
+
+    with StubServer(FlakyFixtures(failures=2, sizes={'imf_countries': 5})) as stub:
+        imf = imf_client(stub, retry_policy=RetryPolicy(retries=1, backoff=0.01))
+        with pytest.raises(APIError, match='500'):
+            imf._get(imf._data_url('IMF000', years=[2000]))
+
+
+def test_failed_posts_are_only_retried_when_idempotent():
+    with StubServer(FlakyFixtures(failures=1, sizes={'wto_reporters': 12})) as stub:
+        wto = WTOClient(rate_limit=UNLIMITED, retry_policy=RetryPolicy(retries=2, backoff=0.01))
+        wto.BASE_URL = stub.url('wto')
+        payload = {'i': stub.fixtures.wto_indicators[0]['code'], 'ps': '2000'}
+        with pytest.raises(APIError, match='500'):
+            wto._post(wto.BASE_URL + '/data', payload)
+        assert len(wto._post(wto.BASE_URL + '/data', payload).json()['Dataset']) == 12
+
+        stub.fixtures.failures = 1
+        assert len(wto._post(wto.BASE_URL + '/data', payload, idempotent=True).json()['Dataset']) == 12
+        assert wto.retries == 1
+
+
+def test_stalled_gets_are_hedged_under_concurrent_load():
+    indicators = ['IMF000', 'IMF001', 'IMF002', 'IMF003']
+    # Every primary request stalls, while the data_many workers keep the connection pool busy.
+    with StubServer(FlakyFixtures(stalls=len(indicators), stall=2.0, sizes={'imf_countries': 5})) as stub:
+        imf = imf_client(stub, pool_maxsize=len(indicators), retry_policy=RetryPolicy(retries=0, hedge=True, hedge_delay=0.05))
+        started = time.monotonic()
+        columns = imf.data_many(indicators, years=[2000], max_workers=len(indicators), columnar=True)
+        elapsed = time.monotonic() - started
+
+        assert len(columns) == len(indicators) * 5
+        assert imf.hedged == len(indicators)
+        assert elapsed < 1.0
+        imf.close()
@@ -0,0 +1,113 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import pytest
+
+from benchmarks.fixtures import FixtureSet
+from benchmarks.stub_server import StubServer
+from global_data_interface.single_flight import SingleFlight, coalesced
+from global_data_interface.wb_client import WBClient
+
+CALLERS = 8
+UNLIMITED = {'rate': None, 'burst': None, 'max_concurrency': None}
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.005)
+
+
+def run_concurrently(flight: SingleFlight, key, function) -> list:
+    '''Calls flight.do from CALLERS threads, letting function return only once every other caller waits for it.'''
+    release = threading.Event()
+
+    def call():
+        release.wait(timeout=5)
+        return function()
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as executor:
+        futures = [executor.submit(flight.do, key, call, 'call') for _ in range(CALLERS)]
+        wait_for(lambda: flight.stats()['coalesced'] == CALLERS - 1)
+        release.set()
+    return futures
+
+
+def test_concurrent_callers_share_one_call():
+    flight, calls = SingleFlight(), []
+    futures = run_concurrently(flight, 'key', lambda: calls.append(1) or object())
+
+    results = [future.result() for future in futures]
+    assert len(calls) == 1
+    assert len({id(result) for result, _ in results}) == 1
+    assert sorted(shared for _, shared in results) == [False] + [True] * (CALLERS - 1)
+    assert flight.stats() == {'calls': CALLERS, 'coalesced': CALLERS - 1, 'in_flight': 0,
+                              'by_name': {'call': {'calls': CALLERS, 'coalesced': CALLERS - 1}}}
+
+
+def test_concurrent_callers_share_the_exception():
+    flight, calls = SingleFlight(), []
+
+    def fail():
+        calls.append(1)
+        raise RuntimeError('leader failed')
+
+    futures = run_concurrently(flight, 'key', fail)
+    errors = [future.exception() for future in futures]
+    assert len(calls) == 1
+    assert all(isinstance(error, RuntimeError) for error in errors)
+    assert len({id(error) for error in errors}) == 1
+
+    # The failed call is not remembered, the next call runs again.
+    assert flight.do('key', lambda: 'retried') == ('retried', False)
+
+
+def test_calls_which_do_not_overlap_run_again():
+    flight, calls = SingleFlight(), []
+    for _ in range(3):
+        flight.do('key', lambda: calls.append(1))
+    assert len(calls) == 3
+    assert flight.stats()['coalesced'] == 0
+
+
+class Counter:
+
+    def __init__(self):
+        self.single_flight = SingleFlight()
+        self.calls = []
+        self.release = threading.Event()
+
+    @coalesced
+    def fetch(self, codes, year=None):
+        self.calls.append((tuple(codes), year))
+        self.release.wait(timeout=5)
+        return list(codes)
+
+
+def test_coalesced_keys_calls_by_arguments():
+    counter = Counter()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(counter.fetch, ['A', 'B'], year=2000),
+            executor.submit(counter.fetch, ['A', 'B'], year=2000),
+            executor.submit(counter.fetch, ['A', 'B'], year=2001),
+            executor.submit(counter.fetch, ['B', 'A'], year=2000),
+        ]
+        wait_for(lambda: counter.single_flight.stats()['calls'] == 4)
+        counter.release.set()
+    assert [future.result() for future in futures] == [['A', 'B'], ['A', 'B'], ['A', 'B'], ['B', 'A']]
+    assert sorted(counter.calls) == [(('A', 'B'), 2000), (('A', 'B'), 2001), (('B', 'A'), 2000)]
+
+
+@pytest.mark.parametrize('coalesce', [True, False])
+def test_concurrent_catalog_calls_send_one_request(coalesce):
+    with StubServer(FixtureSet(sizes={'wb_indicators': 50}), latency=0.2) as stub:
+        wb = WBClient(rate_limit=UNLIMITED, coalesce=coalesce)
+        wb.BASE_URL = stub.url('wb')
+        with ThreadPoolExecutor(max_workers=CALLERS) as executor:
+            results = list(executor.map(lambda _: wb.indicators(), range(CALLERS)))
+
+        assert all(len(result) == 50 for result in results)
+        assert stub.reset_counters()['requests'] == (1 if coalesce else CALLERS)
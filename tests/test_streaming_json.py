@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from global_data_interface.streaming_json import iter_array_items
+
+ITEMS = [
+    {'Value': 12345.678, 'ReportingEconomy': 'Côte d\'Ivoire', 'Note': 'Quoted "value", back\\slash, tab\t and € \U0001f600'},
+    {'Value': -1e-05, 'ReportingEconomy': 'Türkiye', 'Note': None},
+    [1, [2, [3, []]], {'nested': [{'Dataset': [4]}]}],
+    'a ] in a string',
+    1234567890,
+]
+DOCUMENT = json.dumps({'Title': 'Dataset', 'Dataset': ITEMS, 'Count': 5}, ensure_ascii=False).encode()
+
+
+def chunked(content: bytes, size: int):
+    return (content[offset:offset + size] for offset in range(0, len(content), size))
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64, 100000])
+def test_items_split_across_chunks(size):
+    # Small chunks split escapes, multi-byte characters and numbers between chunks.
+    assert list(iter_array_items(chunked(DOCUMENT, size), 'Dataset')) == ITEMS
+
+
+def test_missing_key_yields_nothing():
+    assert list(iter_array_items([b'{"Other": [1, 2]}'], 'Dataset')) == []
+    assert list(iter_array_items([b'{"Dataset": null}'], 'Dataset')) == []
+
+
+def test_truncated_array_raises():
+    start = DOCUMENT.index(b'"Dataset": [') + len(b'"Dataset": ')
+    end = DOCUMENT.index(b'], "Count"')
+    for cut in range(start, end + 1):
+        with pytest.raises(ValueError):
+            list(iter_array_items(chunked(DOCUMENT[:cut], 5), 'Dataset'))
+
+
+def test_truncated_after_a_complete_item_raises():
+    items = iter_array_items([b'{"Dataset": [{"Value": 1}, {"Value": 2}'], 'Dataset')
+    assert next(items) == {'Value': 1}
+    assert next(items) == {'Value': 2}
+    with pytest.raises(ValueError, match='ended before the end'):
+        next(items)
@@ -0,0 +1,27 @@
+from benchmarks.fixtures import FixtureSet
+from benchmarks.stub_server import StubServer
+from global_data_interface.wb_client import WBClient
+
+UNLIMITED = {'rate': None, 'burst': None, 'max_concurrency': None}
+
+
+def test_indicator_sources_are_looked_up_once_per_client():
+    fixtures = FixtureSet()
+    with StubServer(fixtures) as stub:
+        wb = WBClient(rate_limit=UNLIMITED)
+        wb.BASE_URL = stub.url('wb')
+        countries = [economy['id'] for economy in fixtures.wb_economies[:5]]
+        indicators = [indicator['id'] for indicator in fixtures.wb_indicators[:40]]
+        urls = wb._plan_data_urls(countries, indicators, 2000, 2004, indicator_sources={
+            indicator['id']: indicator['source']['id'] for indicator in fixtures.wb_indicators[:40]
+        })
+
+        first = wb.data(countries, indicators, 2000, 2004, max_workers=8, columnar=True)
+        first_requests = stub.reset_counters()['requests']
+        second = wb.data(countries, indicators, 2000, 2004, max_workers=8, columnar=True)
+        second_requests = stub.reset_counters()['requests']
+
+        assert len(first) == len(second) == 5 * 40 * 5
+        # The first call also fetches each indicator's metadata, the second only the data pages.
+        assert first_requests > second_requests
+        assert second_requests == len(urls)
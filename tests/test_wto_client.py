@@ -0,0 +1,39 @@
+from benchmarks.fixtures import FixtureSet
+from benchmarks.stub_server import StubServer
+from global_data_interface.wto_client import WTOClient
+
+UNLIMITED = {'rate': None, 'burst': None, 'max_concurrency': None}
+
+
+def test_plan_queries_with_spc_counts_the_fetched_query():
+    fixtures = FixtureSet(sizes={'wto_reporters': 12})
+    with StubServer(fixtures) as stub:
+        wto = WTOClient(rate_limit=UNLIMITED)
+        wto.BASE_URL = stub.url('wto')
+        indicator = fixtures.wto_indicators[0]['code']
+
+        payload = wto._data_payload(i=indicator, ps='2000-2002', spc=True)
+        plans = wto._plan_queries(payload, max_records=1000)
+        # Every reporter has the total and two sub-products with spc, for each of the three years.
+        assert plans == [(payload, 12 * 3 * 3)]
+
+        columns = wto.data(indicator, ps='2000-2002', spc=True, paginate=True, page_size=25, columnar=True)
+        assert len(columns) == 12 * 3 * 3
+        assert len(wto.data(indicator, ps='2000-2002', spc=False, paginate=True, page_size=25, columnar=True)) == 12 * 3
+
+
+def test_query_parameters_match_the_data_payload():
+    assert WTOClient._query_parameters(i='ITS_MTV_AX', r=['840', '124'], spc=True) == {'i': 'ITS_MTV_AX', 'r': '840,124', 'spc': 'true'}
+    assert WTOClient._data_payload(i='ITS_MTV_AX', r=['840', '124'], spc=True) == {'i': 'ITS_MTV_AX', 'r': '840,124', 'spc': True}
+
+
+def test_requests_are_labelled_wto():
+    fixtures = FixtureSet(sizes={'wto_reporters': 12})
+    with StubServer(fixtures) as stub:
+        wto = WTOClient(rate_limit=UNLIMITED)
+        wto.BASE_URL = stub.url('wto')
+        events = []
+        wto.add_request_hook(on_end=events.append)
+
+        wto.data(fixtures.wto_indicators[0]['code'], ps='2000', columnar=True)
+        assert events and {event.api for event in events} == {'WTO'}